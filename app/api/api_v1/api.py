@@ -1,8 +1,10 @@
 from fastapi import APIRouter
-from app.api.api_v1.endpoints import users, auth, ai
+from app.api.api_v1.endpoints import users, auth, ai, vectors, video_generation
 
 api_router = APIRouter()
 
 api_router.include_router(auth.router, prefix="/auth", tags=["authentication"])
 api_router.include_router(users.router, prefix="/users", tags=["users"])
-api_router.include_router(ai.router, prefix="/ai", tags=["ai"]) 
\ No newline at end of file
+api_router.include_router(ai.router, prefix="/ai", tags=["ai"])
+api_router.include_router(vectors.router, prefix="/vectors", tags=["vectors"])
+api_router.include_router(video_generation.router, prefix="/video-generation", tags=["video generation"]) 
\ No newline at end of file
@@ -1,6 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException
-from pydantic import BaseModel
-from typing import Optional, Dict, Any, List
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+from typing import Optional, Dict, Any, List, AsyncIterator, Literal
+import orjson
+from app.core.config import settings
+from app.core.resilience import UpstreamUnavailableError
 from app.services.openai_service import openai_service
 from app.services.video_generation_service import video_generation_service
 
@@ -11,21 +15,20 @@ class CompletionRequest(BaseModel):
     system_prompt: Optional[str] = None
     temperature: Optional[float] = None
     max_tokens: Optional[int] = None
+    stream: bool = False
+    cache: bool = True  # Set to false to bypass the response cache
 
 class EmbeddingRequest(BaseModel):
     text: str
     model: Optional[str] = None
 
-class Scene(BaseModel):
-    scene_number: int
-    visual: str
-    caption: str
-    music_sfx: str
-    search_queries: List[str]
+class BatchEmbeddingRequest(BaseModel):
+    texts: List[str]
+    model: Optional[str] = None
 
-class VoiceoverSection(BaseModel):
-    voiceover: str
-    scenes: List[Scene]
+class BatchEmbeddingResponse(BaseModel):
+    model: str
+    embeddings: List[List[float]]
 
 class VideoScriptRequest(BaseModel):
     product_name: str
@@ -36,7 +39,10 @@ class VideoScriptRequest(BaseModel):
     brand_name: str = ""
     tone: str = "professional and inspiring"
     ad_type: str = "product showcase"
-    variations_no: int = 1
+    variations_no: int = Field(1, ge=1, le=settings.OPENAI_SCRIPT_MAX_VARIATIONS)
+    # One request per variation, or all variations as choices of one request;
+    # defaults to OPENAI_SCRIPT_GENERATION_MODE (streaming always uses parallel)
+    generation_mode: Optional[Literal["parallel", "multi_choice"]] = None
 
 class VideoScriptVariation(BaseModel):
     voiceover_sections: List[Dict[str, Any]]
@@ -52,22 +58,73 @@ class VideoGenerationRequest(BaseModel):
 class VideoGenerationResponse(BaseModel):
     enhanced_script: Dict[str, Any]
 
+def upstream_unavailable(e: UpstreamUnavailableError) -> HTTPException:
+    return HTTPException(
+        status_code=503,
+        detail=str(e),
+        headers={"Retry-After": str(int(settings.CIRCUIT_BREAKER_RESET_TIMEOUT))}
+    )
+
 @router.post("/completion", response_model=Dict[str, Any])
 async def create_completion(request: CompletionRequest):
     """
     Generate a completion using OpenAI's API
+
+    With `stream: true` the completion is sent as server-sent events: a
+    `delta` event per token delta and a final `done` event with usage and model.
+    Streamed completions are not cached.
     """
+    if request.stream:
+        return await stream_completion(request)
     try:
         response = await openai_service.generate_completion(
             prompt=request.prompt,
             system_prompt=request.system_prompt,
             temperature=request.temperature,
-            max_tokens=request.max_tokens
+            max_tokens=request.max_tokens,
+            use_cache=request.cache
         )
         return response
+    except UpstreamUnavailableError as e:
+        raise upstream_unavailable(e)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+def sse_event(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {orjson.dumps(data).decode()}\n\n"
+
+async def stream_completion(request: CompletionRequest) -> StreamingResponse:
+    events = openai_service.stream_completion(
+        prompt=request.prompt,
+        system_prompt=request.system_prompt,
+        temperature=request.temperature,
+        max_tokens=request.max_tokens
+    )
+    # Wait for the first event so upstream errors still surface as a 500
+    try:
+        first = await events.__anext__()
+    except Exception as e:
+        await events.aclose()
+        if isinstance(e, UpstreamUnavailableError):
+            raise upstream_unavailable(e)
+        raise HTTPException(status_code=500, detail=str(e))
+
+    async def body() -> AsyncIterator[str]:
+        try:
+            yield sse_event(first["type"], first)
+            async for item in events:
+                yield sse_event(item["type"], item)
+        except Exception as e:
+            yield sse_event("error", {"type": "error", "detail": str(e)})
+        finally:
+            await events.aclose()
+
+    return StreamingResponse(
+        body(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @router.post("/embeddings", response_model=List[float])
 async def create_embeddings(request: EmbeddingRequest):
     """
@@ -79,6 +136,27 @@ async def create_embeddings(request: EmbeddingRequest):
             model=request.model
         )
         return embeddings
+    except UpstreamUnavailableError as e:
+        raise upstream_unavailable(e)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/embeddings/batch", response_model=BatchEmbeddingResponse)
+async def create_embeddings_batch(request: BatchEmbeddingRequest):
+    """
+    Generate embeddings for many texts, returned in input order
+    """
+    try:
+        embeddings = await openai_service.generate_embeddings_batch(
+            texts=request.texts,
+            model=request.model
+        )
+        return BatchEmbeddingResponse(
+            model=request.model or openai_service.embedding_model,
+            embeddings=[embedding.tolist() for embedding in embeddings]
+        )
+    except UpstreamUnavailableError as e:
+        raise upstream_unavailable(e)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -97,12 +175,45 @@ async def generate_video_script(request: VideoScriptRequest):
             brand_name=request.brand_name,
             tone=request.tone,
             ad_type=request.ad_type,
-            variations_no=request.variations_no
+            variations_no=request.variations_no,
+            mode=request.generation_mode
         )
         return VideoScriptResponse(variations=variations)
+    except UpstreamUnavailableError as e:
+        raise upstream_unavailable(e)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/video-script/stream")
+async def stream_video_script(request: VideoScriptRequest):
+    """
+    Stream video script variations as NDJSON, one line per completed
+    voiceover section (tagged with its variation index) while the model is
+    still writing the rest.
+    """
+    events = openai_service.stream_video_script(
+        product_name=request.product_name,
+        product_description=request.product_description,
+        duration=request.duration,
+        target_audience=request.target_audience,
+        language=request.language,
+        brand_name=request.brand_name,
+        tone=request.tone,
+        ad_type=request.ad_type,
+        variations_no=request.variations_no
+    )
+
+    async def body() -> AsyncIterator[bytes]:
+        try:
+            async for event in events:
+                yield orjson.dumps(event) + b"\n"
+        except Exception as e:
+            yield orjson.dumps({"type": "error", "detail": str(e)}) + b"\n"
+        finally:
+            await events.aclose()
+
+    return StreamingResponse(body(), media_type="application/x-ndjson")
+
 @router.post("/generate-video", response_model=VideoGenerationResponse)
 async def generate_video(request: VideoGenerationRequest):
     """
@@ -112,4 +223,53 @@ async def generate_video(request: VideoGenerationRequest):
         result = await video_generation_service.generate_video_content(request.dict())
         return VideoGenerationResponse(**result)
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e)) 
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e)) 
+
+@router.get("/http-pool-stats", response_model=Dict[str, Any])
+async def http_pool_stats():
+    """
+    Connection pool usage for the Getty Images and Eleven Labs clients
+    """
+    return video_generation_service.pool_stats()
+
+@router.get("/footage-cache-stats", response_model=Dict[str, Any])
+async def footage_cache_stats():
+    """
+    Hit/miss counters for the stock footage search cache
+    """
+    return video_generation_service.footage_cache_stats()
+
+@router.get("/coalescing-stats", response_model=Dict[str, Any])
+async def coalescing_stats():
+    """
+    In-flight calls and how many callers shared them, per coalesced operation
+    """
+    return {
+        "video_script": openai_service.script_flight.stats(),
+        "embeddings": openai_service.embedding_flight.stats(),
+        **video_generation_service.coalescing_stats()
+    }
+
+@router.get("/script-usage-stats", response_model=Dict[str, Any])
+async def script_usage_stats():
+    """
+    Tokens spent per video script generation mode, per variation generated
+    """
+    return openai_service.script_usage_stats()
+
+@router.get("/openai-scheduler-stats", response_model=Dict[str, Any])
+async def openai_scheduler_stats():
+    """
+    Queue depth, queue wait time and remaining rate budget per OpenAI model
+    """
+    return openai_service.scheduler.stats()
+
+@router.get("/upstream-health", response_model=Dict[str, Any])
+async def upstream_health():
+    """
+    Circuit breaker state, retry and hedge counters and p95 latency per provider
+    """
+    return {
+        "openai": openai_service.resilience.stats(),
+        **video_generation_service.resilience_stats()
+    }
@@ -1,12 +1,13 @@
 from datetime import timedelta
-from typing import Any
+from typing import Any, Dict
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core import security
+from app.core.auth_cache import auth_cache
 from app.core.config import settings
-from app.core.deps import get_db
+from app.core.deps import get_async_db
 from app.schemas.token import Token
 from app.schemas.user import User, UserCreate
 from app.services.user_service import user_service
@@ -15,13 +16,13 @@ router = APIRouter()
 
 @router.post("/login", response_model=Token)
 async def login(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     form_data: OAuth2PasswordRequestForm = Depends()
 ) -> Any:
     """
     OAuth2 compatible token login, get an access token for future requests
     """
-    user = user_service.authenticate(
+    user = await user_service.authenticate(
         db, email=form_data.username, password=form_data.password
     )
     if not user:
@@ -47,19 +48,19 @@ async def login(
 @router.post("/register", response_model=User)
 async def register(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user_in: UserCreate,
 ) -> Any:
     """
     Register new user
     """
-    user = user_service.get_by_email(db, email=user_in.email)
+    user = await user_service.get_by_email(db, email=user_in.email)
     if user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="The user with this email already exists in the system",
         )
-    user = user_service.create(db, obj_in=user_in)
+    user = await user_service.create(db, obj_in=user_in)
     return user
 
 @router.post("/test-token", response_model=User)
@@ -67,4 +68,11 @@ async def test_token(current_user: User = Depends(security.get_current_user)) ->
     """
     Test access token
     """
-    return current_user 
\ No newline at end of file
+    return current_user 
+
+@router.get("/cache-stats", response_model=Dict[str, Any])
+async def cache_stats() -> Any:
+    """
+    Size and hit rates of the token and user caches behind get_current_user
+    """
+    return auth_cache.stats()
@@ -1,68 +1,144 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from typing import Optional
+import base64
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.schemas.user import User, UserCreate, UserUpdate
-from app.core.deps import get_db
+from app.core.config import settings
+from app.core.deps import get_async_db
+from app.schemas.user import (
+    User, UserBulkCreate, UserBulkCreateResult, UserCreate, UserPage, UserUpdate
+)
+from app.services.user_service import user_service
 
 router = APIRouter()
 
-@router.get("/", response_model=List[User])
-def read_users(
-    skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db)
+USER_EXISTS = "The user with this email or username already exists in the system"
+
+def encode_cursor(user_id: int) -> str:
+    return base64.urlsafe_b64encode(str(user_id).encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> int:
+    try:
+        return int(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode())
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+@router.get("/", response_model=UserPage)
+async def read_users(
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
-    Retrieve users.
+    Retrieve users, one page at a time. Pass `next_cursor` from the previous
+    page as `cursor` to continue.
     """
-    # TODO: Implement user retrieval logic
-    return []
+    after_id = decode_cursor(cursor) if cursor else None
+    users = await user_service.list(db, after_id=after_id, limit=limit)
+    next_cursor = encode_cursor(users[-1].id) if len(users) == limit else None
+    return UserPage(items=users, next_cursor=next_cursor)
 
 @router.post("/", response_model=User)
-def create_user(
+async def create_user(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user_in: UserCreate
 ):
     """
     Create new user.
     """
-    # TODO: Implement user creation logic
-    return {}
+    conflicts = await user_service.find_conflicts(db, [user_in])
+    if conflicts:
+        raise HTTPException(status_code=400, detail=USER_EXISTS)
+    try:
+        return await user_service.create(db, obj_in=user_in)
+    except IntegrityError:
+        # Taken by a concurrent request since the check
+        await db.rollback()
+        raise HTTPException(status_code=400, detail=USER_EXISTS)
+
+@router.post("/bulk", response_model=UserBulkCreateResult)
+async def create_users_bulk(
+    *,
+    db: AsyncSession = Depends(get_async_db),
+    bulk_in: UserBulkCreate
+):
+    """
+    Create many users at once. Nothing is created if any email or username
+    is duplicated or already taken.
+    """
+    if len(bulk_in.users) > settings.USERS_BULK_MAX:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.USERS_BULK_MAX} users can be created per request",
+        )
+    conflicts = await user_service.find_conflicts(db, bulk_in.users)
+    if conflicts:
+        raise HTTPException(
+            status_code=400,
+            detail={"message": "Duplicate emails or usernames", "conflicts": conflicts},
+        )
+    try:
+        ids = await user_service.bulk_create(
+            db, objs_in=bulk_in.users, batch_size=settings.USERS_BULK_BATCH_SIZE
+        )
+    except IntegrityError:
+        # Taken by a concurrent request since the check; bulk_create rolled back
+        conflicts = await user_service.find_conflicts(db, bulk_in.users)
+        raise HTTPException(
+            status_code=400,
+            detail={"message": "Duplicate emails or usernames", "conflicts": conflicts},
+        )
+    return UserBulkCreateResult(created=len(ids), ids=ids)
 
 @router.get("/{user_id}", response_model=User)
-def read_user(
+async def read_user(
     user_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get user by ID.
     """
-    # TODO: Implement user retrieval logic
-    return {}
+    user = await user_service.get(db, user_id)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    return user
 
 @router.put("/{user_id}", response_model=User)
-def update_user(
+async def update_user(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user_id: int,
     user_in: UserUpdate
 ):
     """
     Update a user.
     """
-    # TODO: Implement user update logic
-    return {}
+    user = await user_service.get(db, user_id)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    conflicts = await user_service.find_conflicts(db, [user_in], exclude_id=user_id)
+    if conflicts:
+        raise HTTPException(status_code=400, detail=USER_EXISTS)
+    try:
+        return await user_service.update(db, db_obj=user, obj_in=user_in)
+    except IntegrityError:
+        # Taken by a concurrent request since the check
+        await db.rollback()
+        raise HTTPException(status_code=400, detail=USER_EXISTS)
 
 @router.delete("/{user_id}")
-def delete_user(
+async def delete_user(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user_id: int
 ):
     """
     Delete a user.
     """
-    # TODO: Implement user deletion logic
-    return {"status": "success"} 
\ No newline at end of file
+    user = await user_service.get(db, user_id)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    await user_service.delete(db, db_obj=user)
+    return {"status": "success"}
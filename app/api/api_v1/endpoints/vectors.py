@@ -0,0 +1,113 @@
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel, Field
+from typing import Optional, Dict, Any, List
+from app.core.config import settings
+from app.services.openai_service import openai_service
+from app.services.vector_index import vector_index_service
+
+router = APIRouter()
+
+class VectorItem(BaseModel):
+    id: str
+    text: Optional[str] = None
+    vector: Optional[List[float]] = None
+    metadata: Optional[Dict[str, Any]] = None
+
+class UpsertRequest(BaseModel):
+    items: List[VectorItem]
+    model: Optional[str] = None
+
+class UpsertResponse(BaseModel):
+    upserted: int
+    added: int
+    count: int
+
+class QueryRequest(BaseModel):
+    texts: Optional[List[str]] = None
+    vectors: Optional[List[List[float]]] = None
+    top_k: int = Field(10, ge=1, le=settings.VECTOR_QUERY_MAX_TOP_K)
+    approximate: bool = False
+    nprobe: Optional[int] = Field(None, ge=1)
+    model: Optional[str] = None
+
+class QueryHit(BaseModel):
+    id: str
+    score: float
+    metadata: Optional[Dict[str, Any]] = None
+
+class QueryResponse(BaseModel):
+    results: List[List[QueryHit]]
+
+class BuildIndexRequest(BaseModel):
+    nlist: Optional[int] = None
+
+@router.post("/{collection}/upsert", response_model=UpsertResponse)
+async def upsert_vectors(collection: str, request: UpsertRequest):
+    """
+    Insert or replace items by id. Items given as text are embedded first.
+    """
+    if any(item.vector is None and item.text is None for item in request.items):
+        raise HTTPException(status_code=400, detail="Each item needs either text or vector")
+    try:
+        texts = [item.text for item in request.items if item.vector is None]
+        embedded = iter(await openai_service.generate_embeddings_batch(texts, model=request.model)) if texts else iter(())
+        vectors = [item.vector if item.vector is not None else next(embedded) for item in request.items]
+        added = await vector_index_service.upsert(
+            collection,
+            [item.id for item in request.items],
+            vectors,
+            [item.metadata for item in request.items]
+        )
+        return UpsertResponse(
+            upserted=len(request.items),
+            added=added,
+            count=vector_index_service.collection(collection).count
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/{collection}/query", response_model=QueryResponse)
+async def query_vectors(collection: str, request: QueryRequest):
+    """
+    Top-k cosine similarity search, by text or by vector
+    """
+    if bool(request.texts) == bool(request.vectors):
+        raise HTTPException(status_code=400, detail="Provide either texts or vectors")
+    try:
+        queries = request.vectors
+        if request.texts:
+            queries = await openai_service.generate_embeddings_batch(request.texts, model=request.model)
+        results = await vector_index_service.search(
+            collection,
+            [list(query) for query in queries],
+            top_k=request.top_k,
+            approximate=request.approximate,
+            nprobe=request.nprobe
+        )
+        return QueryResponse(results=results)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/{collection}/build-index", response_model=Dict[str, Any])
+async def build_index(collection: str, request: BuildIndexRequest):
+    """
+    Build the clustering used by approximate (IVF) search
+    """
+    try:
+        return await vector_index_service.build_ivf(collection, nlist=request.nlist)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/{collection}", response_model=Dict[str, Any])
+async def collection_stats(collection: str):
+    """
+    Size and index state of a collection
+    """
+    try:
+        return vector_index_service.collection(collection).stats()
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
@@ -0,0 +1,35 @@
+from fastapi import APIRouter, HTTPException, Query, status
+
+from app.core.config import settings
+from app.schemas.video_job import VideoJob, VideoJobCreate
+from app.services.video_job_service import QueueFullError, video_job_service
+
+router = APIRouter()
+
+@router.post("/jobs", response_model=VideoJob, status_code=status.HTTP_202_ACCEPTED)
+async def submit_job(job_in: VideoJobCreate):
+    """
+    Queue video generation for a script and return the job immediately
+    """
+    try:
+        return await video_job_service.submit(job_in.dict())
+    except QueueFullError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": "5"},
+        )
+
+@router.get("/jobs/{job_id}", response_model=VideoJob)
+async def read_job(
+    job_id: str,
+    wait: float = Query(0, ge=0, description="Seconds to wait for a status or progress change")
+):
+    """
+    Get job status, progress and result. With `wait`, long-poll until the
+    job changes or the timeout passes.
+    """
+    job = await video_job_service.wait(job_id, min(wait, settings.VIDEO_JOB_MAX_WAIT))
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
@@ -0,0 +1,77 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from typing import Iterator
+from app.core.auth_cache import auth_cache
+from app.core.metrics import Family, registry
+from app.services.openai_service import openai_service
+from app.services.video_generation_service import video_generation_service
+from app.services.video_job_service import video_job_service
+
+router = APIRouter()
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics():
+    """
+    Prometheus text exposition of all application metrics
+    """
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+@registry.collector
+def collect_service_stats() -> Iterator[Family]:
+    pools = video_generation_service.pool_stats()
+    yield ("upstream_pool_in_use", "gauge", "Pooled connections in use per provider",
+           [({"provider": name}, pool["in_use"]) for name, pool in pools.items()])
+    yield ("upstream_pool_waiting", "gauge", "Requests waiting for a pooled connection",
+           [({"provider": name}, pool["waiting"]) for name, pool in pools.items()])
+    yield ("upstream_pool_errors_total", "counter", "Pooled requests that failed",
+           [({"provider": name}, pool["errors"]) for name, pool in pools.items()])
+
+    providers = {"openai": openai_service.resilience.stats(), **video_generation_service.resilience_stats()}
+    yield ("upstream_circuit_open", "gauge", "1 while a provider's circuit breaker rejects calls",
+           [({"provider": name}, int(stats["state"] != "closed")) for name, stats in providers.items()])
+    yield ("upstream_retries_total", "counter", "Upstream calls retried",
+           [({"provider": name}, stats["retries"]) for name, stats in providers.items()])
+    yield ("upstream_hedges_total", "counter", "Hedged duplicate upstream requests",
+           [({"provider": name}, stats["hedges"]) for name, stats in providers.items()])
+    yield ("upstream_rejected_total", "counter", "Calls rejected by an open circuit breaker",
+           [({"provider": name}, stats["rejected"]) for name, stats in providers.items()])
+
+    flights = {
+        "video_script": openai_service.script_flight.stats(),
+        "embeddings": openai_service.embedding_flight.stats(),
+        **video_generation_service.coalescing_stats(),
+    }
+    yield ("coalesced_calls_total", "counter", "Callers that shared an identical in-flight call",
+           [({"operation": name}, stats["shared"]) for name, stats in flights.items()])
+    yield ("coalesced_cancelled_total", "counter", "In-flight calls cancelled after every caller went away",
+           [({"operation": name}, stats["cancelled"]) for name, stats in flights.items()])
+
+    scheduler = openai_service.scheduler.stats()
+    yield ("openai_scheduler_queued", "gauge", "Calls waiting for rate budget",
+           [({"model": model}, stats["queued"]) for model, stats in scheduler.items()])
+    yield ("openai_scheduler_tokens_available", "gauge", "Remaining tokens-per-minute budget",
+           [({"model": model}, stats["tokens_available"]) for model, stats in scheduler.items()])
+
+    footage = video_generation_service.footage_cache_stats()
+    if footage["enabled"]:
+        yield ("footage_cache_lookups_total", "counter", "Stock footage cache lookups by result", [
+            ({"result": "memory_hit"}, footage["memory_hits"]),
+            ({"result": "disk_hit"}, footage["disk_hits"]),
+            ({"result": "miss"}, footage["misses"]),
+        ])
+
+    yield ("auth_cache_lookups_total", "counter", "Auth cache lookups by kind and result", [
+        ({"kind": "token", "result": "hit"}, auth_cache.token_hits),
+        ({"kind": "token", "result": "miss"}, auth_cache.token_misses),
+        ({"kind": "user", "result": "hit"}, auth_cache.user_hits),
+        ({"kind": "user", "result": "miss"}, auth_cache.user_misses),
+    ])
+    auth = auth_cache.stats()
+    yield ("auth_cache_hit_ratio", "gauge", "Share of auth cache lookups that hit, by kind", [
+        ({"kind": "token"}, auth["token_hit_rate"]),
+        ({"kind": "user"}, auth["user_hit_rate"]),
+    ])
+
+    jobs = video_job_service.stats()
+    yield ("video_jobs_queued", "gauge", "Video generation jobs waiting for a worker",
+           [({}, jobs["queued"])])
@@ -0,0 +1,81 @@
+from typing import Any, Dict, Optional
+from app.core.cache import MISSING, TTLCache
+from app.core.config import settings
+
+USER_SNAPSHOT_FIELDS = (
+    "id", "email", "username", "hashed_password", "is_active", "is_superuser",
+    "created_at", "updated_at",
+)
+
+class AuthCache:
+    """
+    Short-lived cache for get_current_user: verified tokens map to a user id,
+    and user ids map to a plain snapshot of the user's columns.
+
+    Snapshots are dropped when UserService changes or removes the user. The
+    cache is per process, so AUTH_CACHE_TTL bounds how stale another worker's
+    copy can be.
+    """
+
+    def __init__(self, enabled: bool, maxsize: int, ttl: float):
+        self.enabled = enabled
+        self.ttl = ttl
+        self.tokens = TTLCache(maxsize, ttl)
+        self.users = TTLCache(maxsize, ttl)
+        self.token_hits = 0
+        self.token_misses = 0
+        self.user_hits = 0
+        self.user_misses = 0
+
+    def get_token(self, token: str) -> Optional[int]:
+        if not self.enabled:
+            return None
+        user_id = self.tokens.get(token)
+        if user_id is MISSING:
+            self.token_misses += 1
+            return None
+        self.token_hits += 1
+        return user_id
+
+    def set_token(self, token: str, user_id: int, expires_in: float) -> None:
+        if self.enabled and expires_in > 0:
+            # Never outlive the token itself
+            self.tokens.set(token, user_id, min(self.ttl, expires_in))
+
+    def get_user(self, user_id: int) -> Optional[Dict[str, Any]]:
+        if not self.enabled:
+            return None
+        snapshot = self.users.get(user_id)
+        if snapshot is MISSING:
+            self.user_misses += 1
+            return None
+        self.user_hits += 1
+        return snapshot
+
+    def set_user(self, user: Any) -> None:
+        if self.enabled:
+            self.users.set(user.id, {field: getattr(user, field) for field in USER_SNAPSHOT_FIELDS})
+
+    def invalidate_user(self, user_id: int) -> None:
+        self.users.delete(user_id)
+
+    def clear(self) -> None:
+        self.tokens.clear()
+        self.users.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        token_lookups = self.token_hits + self.token_misses
+        user_lookups = self.user_hits + self.user_misses
+        return {
+            "enabled": self.enabled,
+            "tokens": len(self.tokens),
+            "users": len(self.users),
+            "token_hit_rate": self.token_hits / token_lookups if token_lookups else 0.0,
+            "user_hit_rate": self.user_hits / user_lookups if user_lookups else 0.0,
+        }
+
+auth_cache = AuthCache(
+    enabled=settings.AUTH_CACHE_ENABLED,
+    maxsize=settings.AUTH_CACHE_MAX_ENTRIES,
+    ttl=settings.AUTH_CACHE_TTL,
+)
@@ -0,0 +1,287 @@
+from array import array
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+import numpy as np
+
+MISSING = object()
+
+class TTLCache:
+    """
+    In-memory LRU cache whose entries also expire after a time-to-live.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+
+    def get(self, key: Hashable, default: Any = MISSING) -> Any:
+        entry = self._data.get(key)
+        if entry is None:
+            return default
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            return default
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        ttl = self.ttl if ttl is None else ttl
+        self._data[key] = (time.monotonic() + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def delete(self, key: Hashable) -> None:
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+class SQLiteCache:
+    """
+    JSON values with a time-to-live in a SQLite file.
+
+    The file survives restarts and can be shared by worker processes on the
+    same host. Calls are blocking; use them from a worker thread.
+    """
+
+    def __init__(self, path: str, table: str = "cache"):
+        self.path = path
+        self.table = table
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, timeout=5.0, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.table} "
+                "(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._conn.execute(f"DELETE FROM {self.table} WHERE expires_at <= ?", (time.time(),))
+            self._conn.commit()
+        return self._conn
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            row = self._connection().execute(
+                f"SELECT value, expires_at FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None or row[1] <= time.time():
+            return MISSING
+        return json.loads(row[0])
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value), time.time() + ttl),
+            )
+            conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+class TieredCache:
+    """
+    Read-through cache for an upstream call: in-memory TTLCache in front of an
+    optional SQLiteCache. Keeps hit/miss counters and the average upstream
+    latency, from which the latency saved by hits is estimated.
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        ttl: float,
+        negative_ttl: Optional[float] = None,
+        sqlite_path: Optional[str] = None,
+        table: str = "cache"
+    ):
+        self.ttl = ttl
+        self.negative_ttl = ttl if negative_ttl is None else negative_ttl
+        self.memory = TTLCache(maxsize, ttl)
+        self.disk = SQLiteCache(sqlite_path, table) if sqlite_path else None
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.upstream_seconds = 0.0
+
+    async def get(self, key: str) -> Any:
+        value = self.memory.get(key)
+        if value is not MISSING:
+            self.memory_hits += 1
+            return value
+        if self.disk is not None:
+            value = await asyncio.to_thread(self.disk.get, key)
+            if value is not MISSING:
+                self.disk_hits += 1
+                self.memory.set(key, value, self._ttl_for(value))
+                return value
+        return MISSING
+
+    async def set(self, key: str, value: Any) -> None:
+        ttl = self._ttl_for(value)
+        self.memory.set(key, value, ttl)
+        if self.disk is not None:
+            await asyncio.to_thread(self.disk.set, key, value, ttl)
+
+    async def get_or_load(self, key: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+        value = await self.get(key)
+        if value is not MISSING:
+            return value
+        self.misses += 1
+        start = time.perf_counter()
+        value = await loader()
+        self.upstream_seconds += time.perf_counter() - start
+        await self.set(key, value)
+        return value
+
+    def _ttl_for(self, value: Any) -> float:
+        # Empty results are cached for a shorter time so new content shows up
+        return self.negative_ttl if value is None or value == [] else self.ttl
+
+    def stats(self) -> Dict[str, Any]:
+        hits = self.memory_hits + self.disk_hits
+        lookups = hits + self.misses
+        avg_upstream = self.upstream_seconds / self.misses if self.misses else 0.0
+        return {
+            "entries": len(self.memory),
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "avg_upstream_ms": avg_upstream * 1000,
+            "saved_upstream_ms": hits * avg_upstream * 1000,
+        }
+
+    def close(self) -> None:
+        if self.disk is not None:
+            self.disk.close()
+
+class EmbeddingCache:
+    """
+    Persistent embedding vectors keyed by (model, text digest), stored as
+    packed float32 blobs in a SQLite file. Calls are blocking; use them from a
+    worker thread.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, timeout=5.0, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings "
+                "(model TEXT NOT NULL, digest TEXT NOT NULL, vector BLOB NOT NULL, "
+                "PRIMARY KEY (model, digest))"
+            )
+            self._conn.commit()
+        return self._conn
+
+    def get_many(self, model: str, digests: List[str]) -> Dict[str, array]:
+        found = {}
+        with self._lock:
+            conn = self._connection()
+            # Stay well below SQLite's bound-parameter limit
+            for i in range(0, len(digests), 500):
+                chunk = digests[i:i + 500]
+                rows = conn.execute(
+                    f"SELECT digest, vector FROM embeddings WHERE model = ? "
+                    f"AND digest IN ({','.join('?' * len(chunk))})",
+                    (model, *chunk),
+                ).fetchall()
+                for digest, blob in rows:
+                    vector = array("f")
+                    vector.frombytes(blob)
+                    found[digest] = vector
+        return found
+
+    def set_many(self, model: str, vectors: Dict[str, array]) -> None:
+        with self._lock:
+            conn = self._connection()
+            conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, digest, vector) VALUES (?, ?, ?)",
+                [(model, digest, vector.tobytes()) for digest, vector in vectors.items()],
+            )
+            conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+class SemanticCache:
+    """
+    Values looked up by embedding similarity instead of exact key.
+
+    Entries are grouped by namespace (everything except the text that was
+    embedded must match exactly); a lookup returns the closest unexpired entry
+    whose cosine similarity reaches the threshold. Oldest entries are evicted
+    once a namespace holds `maxsize` entries.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, threshold: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.threshold = threshold
+        self._entries: Dict[Hashable, Tuple[np.ndarray, List[Tuple[float, Any]]]] = {}
+
+    @staticmethod
+    def _normalize(vector: Any) -> np.ndarray:
+        vector = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def get(self, namespace: Hashable, embedding: Any, default: Any = MISSING) -> Any:
+        entry = self._entries.get(namespace)
+        if entry is None:
+            return default
+        matrix, values = entry
+        scores = matrix @ self._normalize(embedding)
+        now = time.monotonic()
+        for i in np.argsort(-scores):
+            if scores[i] < self.threshold:
+                break
+            expires_at, value = values[i]
+            if expires_at > now:
+                return value
+        return default
+
+    def set(self, namespace: Hashable, embedding: Any, value: Any) -> None:
+        vector = self._normalize(embedding)[None, :]
+        now = time.monotonic()
+        matrix, values = self._entries.get(namespace, (np.empty((0, vector.shape[1]), dtype=np.float32), []))
+        # Drop expired entries, then the oldest ones beyond the size bound
+        live = [i for i, (expires_at, _) in enumerate(values) if expires_at > now]
+        live = live[max(0, len(live) - self.maxsize + 1):]
+        matrix = np.concatenate([matrix[live], vector])
+        values = [values[i] for i in live] + [(now + self.ttl, value)]
+        self._entries[namespace] = (matrix, values)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return sum(len(values) for _, values in self._entries.values())
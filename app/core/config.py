@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Dict, List, Optional
 from dotenv import load_dotenv
 import os
 
@@ -8,24 +8,120 @@ class Settings(BaseSettings):
     API_V1_STR: str = "/api/v1"
     
     # Database settings
-    DATABASE_URL: Optional[str] = "sqlite:///./sql_app.db"
+    DATABASE_URL: Optional[str] = "sqlite:///./sql_app.db"  # Postgres URLs need asyncpg installed
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_RECYCLE: int = 1800  # Seconds
+    DB_POOL_TIMEOUT: int = 30  # Seconds
+    DB_POOL_PRE_PING: bool = False
+    DB_SQLITE_BUSY_TIMEOUT: int = 5000  # Milliseconds
     
     # JWT settings
     SECRET_KEY: str = "your-secret-key-here"  # Change this in production
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    AUTH_CACHE_ENABLED: bool = True  # Cache verified tokens and user snapshots
+    AUTH_CACHE_MAX_ENTRIES: int = 10000
+    AUTH_CACHE_TTL: int = 60  # Seconds
+
+    # User management settings
+    USERS_BULK_BATCH_SIZE: int = 500  # Rows per INSERT statement
+    USERS_BULK_MAX: int = 10000  # Users accepted per bulk request
+
+    # Password hashing settings
+    BCRYPT_ROUNDS: int = 12  # Hashes below this cost are upgraded on login
+    PASSWORD_HASH_WORKERS: int = 4  # Threads reserved for bcrypt
+    PASSWORD_HASH_BULK_WORKERS: int = 2  # Separate threads for bulk user creation, so logins never queue behind it
 
     # OpenAI settings
     OPENAI_API_KEY: str
     OPENAI_MODEL: str = "gpt-4"
     OPENAI_MAX_TOKENS: int = 2000
     OPENAI_TEMPERATURE: float = 0.7
+    OPENAI_MAX_CONCURRENCY: int = 16  # Process-wide cap on in-flight OpenAI calls
+    OPENAI_SCRIPT_CONCURRENCY: int = 5  # Per-request cap for script variations
+    # "parallel" sends one request per script variation; "multi_choice" asks
+    # for all variations as choices of a single request
+    OPENAI_SCRIPT_GENERATION_MODE: str = "parallel"
+    OPENAI_SCRIPT_MAX_VARIATIONS: int = 10  # Upper bound on variations_no per request
+    # Pin prompt templates to a version, e.g. {"video_script": "1"}; unpinned
+    # templates use their latest version. Token counts are exact when
+    # tiktoken is installed and estimated otherwise.
+    OPENAI_PROMPT_VERSIONS: Dict[str, str] = {}
+    OPENAI_EMBEDDING_MODEL: str = "text-embedding-ada-002"
+    # Provider rate limits; per-model overrides as {"model": {"rpm": ..., "tpm": ...}}
+    OPENAI_RPM_LIMIT: int = 500
+    OPENAI_TPM_LIMIT: int = 200000
+    OPENAI_MODEL_RATE_LIMITS: Dict[str, Dict[str, int]] = {}
+    OPENAI_COMPLETION_TOKEN_ESTIMATE: int = 1500  # Assumed output tokens when max_tokens is unset
+    EMBEDDINGS_BATCH_SIZE: int = 256  # Inputs per upstream embeddings request
+    EMBEDDINGS_CACHE_PATH: Optional[str] = "./embeddings_cache.db"  # None disables the cache
+
+    # Completion response cache settings
+    COMPLETION_CACHE_ENABLED: bool = True
+    COMPLETION_CACHE_MAX_ENTRIES: int = 1000
+    COMPLETION_CACHE_TTL: int = 3600  # Seconds
+    COMPLETION_SEMANTIC_CACHE_ENABLED: bool = False
+    COMPLETION_SEMANTIC_CACHE_THRESHOLD: float = 0.97  # Minimum cosine similarity of prompt embeddings
+
+    # Outbound HTTP pool settings (per upstream provider)
+    HTTP_POOL_MAX_CONNECTIONS: int = 100
+    HTTP_POOL_MAX_KEEPALIVE: int = 20
+    HTTP_POOL_KEEPALIVE_EXPIRY: float = 30.0
+    HTTP_CONNECT_TIMEOUT: float = 5.0
+    HTTP_READ_TIMEOUT: float = 30.0
+    HTTP_WRITE_TIMEOUT: float = 30.0
+    HTTP_POOL_TIMEOUT: float = 10.0
+    HTTP_HTTP2: bool = False  # Requires the optional h2 package (httpx[http2])
+
+    # Upstream resilience settings (OpenAI, Getty, Eleven Labs)
+    RESILIENCE_MAX_ATTEMPTS: int = 3  # Including the first try
+    RESILIENCE_BASE_DELAY: float = 0.2  # Seconds; backoff doubles per retry, with full jitter
+    RESILIENCE_MAX_DELAY: float = 5.0
+    # Providers whose slow calls get a duplicate request after their p95 latency
+    RESILIENCE_HEDGE_PROVIDERS: List[str] = ["getty"]
+    RESILIENCE_HEDGE_MIN_SAMPLES: int = 20  # Latency samples needed before hedging starts
+    CIRCUIT_BREAKER_FAILURE_THRESHOLD: int = 5  # Consecutive failed calls before opening
+    CIRCUIT_BREAKER_RESET_TIMEOUT: float = 30.0  # Seconds before a half-open probe
+
+    # Observability settings
+    METRICS_ENABLED: bool = True  # Request metrics middleware and /metrics
+    TRACING_ENABLED: bool = False  # Log a span tree for each request
+    TRACING_MIN_DURATION_MS: float = 0.0  # Only log traces at least this slow
+
+    # Vector index settings
+    VECTOR_INDEX_DIR: str = "./vector_index"
+    VECTOR_INDEX_NPROBE: int = 8  # Clusters scanned per query in approximate mode
+    VECTOR_QUERY_MAX_TOP_K: int = 1000  # Upper bound on top_k per query
 
     # Getty Images settings
     GETTY_API_KEY: Optional[str] = None
+    GETTY_MAX_CONCURRENCY: int = 8
+    GETTY_SEARCH_PAGE_SIZE: int = 5  # Results per search, shared out so scenes avoid duplicate footage
+    # Seconds to wait on a scene's current search query before also starting
+    # the next candidate (about Getty's p95 latency is a sensible value); 0
+    # searches all candidates at once, None (the default) only moves on once
+    # a query comes back empty
+    GETTY_QUERY_HEDGE_DELAY: Optional[float] = None
+    GETTY_CACHE_ENABLED: bool = True
+    GETTY_CACHE_MAX_ENTRIES: int = 10000
+    GETTY_CACHE_TTL: int = 86400  # Seconds
+    GETTY_CACHE_NEGATIVE_TTL: int = 600  # Seconds to remember searches with no results
+    GETTY_CACHE_SQLITE_PATH: Optional[str] = None  # e.g. "./footage_cache.db"
 
     # Eleven Labs settings
     ELEVEN_LABS_API_KEY: Optional[str] = None
+    ELEVEN_LABS_MAX_CONCURRENCY: int = 4
+
+    # Video generation job settings
+    VIDEO_JOB_WORKERS: int = 4
+    VIDEO_JOB_QUEUE_SIZE: int = 100  # Submissions beyond this are rejected with 503
+    VIDEO_JOB_MAX_WAIT: int = 60  # Longest long-poll, in seconds
+
+    # Voiceover audio store settings
+    AUDIO_STORE_DIR: str = "./audio"
+    AUDIO_URL_PREFIX: str = "/audio"
+    AUDIO_STREAM_CHUNK_SIZE: int = 65536
 
     class Config:
         case_sensitive = True
@@ -0,0 +1,112 @@
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional
+import asyncio
+import time
+import httpx
+from app.core.config import settings
+
+class PooledClient:
+    """
+    Long-lived httpx.AsyncClient for one upstream provider.
+
+    Requests are admitted through a gate sized to the pool's connection limit,
+    so time spent waiting for a free connection can be measured and reported
+    by stats().
+    """
+
+    def __init__(
+        self,
+        name: str,
+        headers: Optional[Dict[str, str]] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None
+    ):
+        self.name = name
+        self.headers = headers or {}
+        self.transport = transport
+        self.max_connections = settings.HTTP_POOL_MAX_CONNECTIONS
+        self._client: Optional[httpx.AsyncClient] = None
+        self._gate = asyncio.Semaphore(self.max_connections)
+        self._in_use = 0
+        self._waiting = 0
+        self._requests = 0
+        self._errors = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                headers=self.headers,
+                http2=settings.HTTP_HTTP2,
+                transport=self.transport,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=settings.HTTP_POOL_MAX_KEEPALIVE,
+                    keepalive_expiry=settings.HTTP_POOL_KEEPALIVE_EXPIRY,
+                ),
+                timeout=httpx.Timeout(
+                    connect=settings.HTTP_CONNECT_TIMEOUT,
+                    read=settings.HTTP_READ_TIMEOUT,
+                    write=settings.HTTP_WRITE_TIMEOUT,
+                    pool=settings.HTTP_POOL_TIMEOUT,
+                ),
+            )
+        return self._client
+
+    async def open(self) -> None:
+        self.client
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    @asynccontextmanager
+    async def _slot(self) -> AsyncIterator[None]:
+        start = time.perf_counter()
+        self._waiting += 1
+        try:
+            await self._gate.acquire()
+        finally:
+            self._waiting -= 1
+        waited = time.perf_counter() - start
+        self._requests += 1
+        self._wait_total += waited
+        self._wait_max = max(self._wait_max, waited)
+        self._in_use += 1
+        try:
+            yield
+        except Exception:
+            self._errors += 1
+            raise
+        finally:
+            self._in_use -= 1
+            self._gate.release()
+
+    async def request(self, method: str, url: str, **kwargs: Any) -> httpx.Response:
+        async with self._slot():
+            return await self.client.request(method, url, **kwargs)
+
+    async def get(self, url: str, **kwargs: Any) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs: Any) -> httpx.Response:
+        return await self.request("POST", url, **kwargs)
+
+    @asynccontextmanager
+    async def stream(self, method: str, url: str, **kwargs: Any) -> AsyncIterator[httpx.Response]:
+        async with self._slot():
+            async with self.client.stream(method, url, **kwargs) as response:
+                yield response
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_connections": self.max_connections,
+            "in_use": self._in_use,
+            "waiting": self._waiting,
+            "requests": self._requests,
+            "errors": self._errors,
+            "queue_wait_avg_ms": (self._wait_total / self._requests * 1000) if self._requests else 0.0,
+            "queue_wait_max_ms": self._wait_max * 1000,
+        }
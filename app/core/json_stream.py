@@ -0,0 +1,147 @@
+from bisect import bisect_right
+from typing import Any, List, Optional
+import json
+import re
+import orjson
+
+_STRING = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"')
+_TRAILING_COMMA = re.compile(r',(?=\s*[}\]])')
+_decoder = json.JSONDecoder()
+
+def _drop_trailing_commas(text: str) -> str:
+    commas = [match.start() for match in _TRAILING_COMMA.finditer(text)]
+    if not commas:
+        return text
+    # Commas inside string values are kept
+    strings = [match.span() for match in _STRING.finditer(text)]
+    string_starts = [start for start, _ in strings]
+    pieces = []
+    last = 0
+    for comma in commas:
+        index = bisect_right(string_starts, comma) - 1
+        if index >= 0 and comma < strings[index][1]:
+            continue
+        pieces.append(text[last:comma])
+        last = comma + 1
+    pieces.append(text[last:])
+    return "".join(pieces)
+
+def extract_json(text: str) -> Any:
+    """
+    Parse the JSON object or array in a model reply.
+
+    Clean output is parsed as is, and output wrapped in markdown fences or
+    prose is parsed from its first to its last bracket. Otherwise trailing
+    commas outside strings are dropped and the first object or array is
+    decoded, ignoring anything after it.
+    """
+    try:
+        return orjson.loads(text)
+    except orjson.JSONDecodeError:
+        pass
+    # Prefer the first value after an opening fence, so brackets in prose
+    # before it are not mistaken for the start
+    fence = text.find("```") + 1
+    starts = [i for i in (text.find("{", fence), text.find("[", fence)) if i >= 0]
+    if not starts:
+        starts = [i for i in (text.find("{"), text.find("[")) if i >= 0]
+    if not starts:
+        raise ValueError("No JSON object or array found in model output")
+    start = min(starts)
+    end = text.rfind("}" if text[start] == "{" else "]")
+    if end > start:
+        try:
+            return orjson.loads(text[start:end + 1])
+        except orjson.JSONDecodeError:
+            pass
+    value, _ = _decoder.raw_decode(_drop_trailing_commas(text[start:]))
+    return value
+
+class JSONArrayStreamParser:
+    """
+    Incrementally extract the elements of one array from a JSON object that
+    is still being written, e.g. "voiceover_sections" in a streamed model reply.
+
+    feed() returns every element of `{"<key>": [ ... ]}` completed by the new
+    text. Anything before the first "{" (markdown fences, prose) is ignored.
+    """
+
+    def __init__(self, key: str):
+        self.key = json.dumps(key)
+        self._text = ""
+        self._pos = 0
+        self._depth = 0
+        self._started = False
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._last_key: Optional[str] = None
+        self._array_depth: Optional[int] = None
+        self._array_done = False
+        self._item_start: Optional[int] = None
+
+    def feed(self, text: str) -> List[Any]:
+        self._text += text
+        items = []
+        text = self._text
+        while self._pos < len(text):
+            c = text[self._pos]
+            if not self._started:
+                if c != "{":
+                    self._pos += 1
+                    continue
+                self._started = True
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+                    if self._depth == 1:
+                        self._last_key = text[self._string_start:self._pos + 1]
+            elif c == '"':
+                self._in_string = True
+                self._string_start = self._pos
+            elif c in "{[":
+                self._depth += 1
+                if (
+                    c == "["
+                    and self._depth == 2
+                    and self._array_depth is None
+                    and not self._array_done
+                    and self._last_key == self.key
+                ):
+                    self._array_depth = self._depth
+                elif self._array_depth is not None and self._depth == self._array_depth + 1:
+                    self._item_start = self._pos
+            elif c in "}]":
+                if (
+                    self._array_depth is not None
+                    and self._depth == self._array_depth + 1
+                    and self._item_start is not None
+                ):
+                    items.append(json.loads(text[self._item_start:self._pos + 1]))
+                    self._item_start = None
+                elif self._array_depth is not None and self._depth == self._array_depth:
+                    self._array_depth = None
+                    self._array_done = True
+                self._depth -= 1
+            self._pos += 1
+        self._compact()
+        return items
+
+    def _compact(self) -> None:
+        # Drop text that can no longer be part of an unfinished item or key
+        keep = [self._pos]
+        if self._item_start is not None:
+            keep.append(self._item_start)
+        if self._in_string:
+            keep.append(self._string_start)
+        cut = min(keep)
+        if cut:
+            self._text = self._text[cut:]
+            self._pos -= cut
+            self._string_start -= cut
+            if self._item_start is not None:
+                self._item_start -= cut
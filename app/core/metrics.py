@@ -0,0 +1,328 @@
+from bisect import bisect_left
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+import time
+from app.core.tracing import span
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# (labels, value) pairs of one metric family
+Samples = List[Tuple[Dict[str, Any], float]]
+# (name, type, help, samples) as produced by collectors
+Family = Tuple[str, str, str, Samples]
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _format_labels(labels: Dict[str, Any]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+class _Metric:
+    type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], Any] = {}
+
+    def _key(self, labels: Dict[str, Any]) -> Tuple[str, ...]:
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _labels(self, key: Tuple[str, ...]) -> Dict[str, str]:
+        return dict(zip(self.labelnames, key))
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+        for key, value in sorted(self._values.items()):
+            lines.extend(self._render_sample(self._labels(key), value))
+        return lines
+
+    def _render_sample(self, labels: Dict[str, str], value: Any) -> List[str]:
+        return [f"{self.name}{_format_labels(labels)} {_format_value(value)}"]
+
+class Counter(_Metric):
+    type = "counter"
+
+    def inc(self, amount: float = 1, **labels: Any) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+class Gauge(_Metric):
+    type = "gauge"
+
+    def set(self, value: float, **labels: Any) -> None:
+        self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1, **labels: Any) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels: Any) -> None:
+        self.inc(-amount, **labels)
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        state = self._values.get(key)
+        if state is None:
+            # Per-bucket (non-cumulative) counts, then sum and count
+            state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+        index = bisect_left(self.buckets, value)
+        if index < len(self.buckets):
+            state[0][index] += 1
+        state[1] += value
+        state[2] += 1
+
+    def _render_sample(self, labels: Dict[str, str], value: Any) -> List[str]:
+        counts, total, count = value
+        lines = []
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets, counts):
+            cumulative += bucket_count
+            lines.append(f"{self.name}_bucket{_format_labels({**labels, 'le': _format_value(bound)})} {cumulative}")
+        lines.append(f"{self.name}_bucket{_format_labels({**labels, 'le': '+Inf'})} {count}")
+        lines.append(f"{self.name}_sum{_format_labels(labels)} {_format_value(total)}")
+        lines.append(f"{self.name}_count{_format_labels(labels)} {count}")
+        return lines
+
+class Registry:
+    """
+    Metrics rendered in the Prometheus text exposition format.
+
+    Besides metrics updated in place, collectors are called at scrape time
+    to report state that already lives elsewhere (pool, cache and queue stats).
+    """
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+        self._collectors: List[Callable[[], Iterable[Family]]] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def collector(self, collect: Callable[[], Iterable[Family]]) -> Callable[[], Iterable[Family]]:
+        self._collectors.append(collect)
+        return collect
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for collect in self._collectors:
+            for name, metric_type, documentation, samples in collect():
+                lines.append(f"# HELP {name} {documentation}")
+                lines.append(f"# TYPE {name} {metric_type}")
+                for labels, value in samples:
+                    if value is not None:
+                        lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+registry = Registry()
+
+http_requests_total = registry.counter(
+    "http_requests_total", "HTTP requests handled", ("method", "route", "status")
+)
+http_request_duration_seconds = registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency, including streamed bodies", ("method", "route")
+)
+http_requests_in_flight = registry.gauge(
+    "http_requests_in_flight", "HTTP requests currently being handled", ("method",)
+)
+http_request_errors_total = registry.counter(
+    "http_request_errors_total", "HTTP requests that raised or returned a 5xx status", ("method", "route")
+)
+upstream_request_duration_seconds = registry.histogram(
+    "upstream_request_duration_seconds",
+    "Upstream provider call latency, including retries",
+    ("provider", "operation", "outcome")
+)
+openai_tokens_total = registry.counter(
+    "openai_tokens_total", "Tokens reported in OpenAI usage blocks", ("model", "type")
+)
+openai_prompt_tokens_total = registry.counter(
+    "openai_prompt_tokens_total",
+    "Prompt tokens by template, split into provider-cached and uncached input",
+    ("model", "template", "cache")
+)
+openai_prompt_tokens_local_total = registry.counter(
+    "openai_prompt_tokens_local_total",
+    "Prompt tokens counted locally before sending, by template",
+    ("model", "template")
+)
+script_generation_tokens_total = registry.counter(
+    "script_generation_tokens_total", "Tokens spent on video script generation by mode", ("mode", "type")
+)
+script_generation_variations_total = registry.counter(
+    "script_generation_variations_total", "Video script variations generated by mode", ("mode",)
+)
+
+@asynccontextmanager
+async def track_upstream(provider: str, operation: str) -> AsyncIterator[None]:
+    """
+    Time an upstream call into upstream_request_duration_seconds and a span
+    """
+    outcome = "error"
+    start = time.perf_counter()
+    try:
+        with span(f"{provider}.{operation}"):
+            yield
+        outcome = "ok"
+    finally:
+        upstream_request_duration_seconds.observe(
+            time.perf_counter() - start, provider=provider, operation=operation, outcome=outcome
+        )
+
+class TokenUsage:
+    """
+    Running total of OpenAI usage for one unit of work (see track_token_usage)
+    """
+
+    def __init__(self):
+        self.requests = 0
+        self.prompt_tokens = 0
+        self.cached_prompt_tokens = 0
+        self.completion_tokens = 0
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+    def add(self, other: "TokenUsage") -> None:
+        self.requests += other.requests
+        self.prompt_tokens += other.prompt_tokens
+        self.cached_prompt_tokens += other.cached_prompt_tokens
+        self.completion_tokens += other.completion_tokens
+
+    def to_dict(self) -> Dict[str, int]:
+        return {
+            "requests": self.requests,
+            "prompt_tokens": self.prompt_tokens,
+            "cached_prompt_tokens": self.cached_prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "total_tokens": self.total_tokens,
+        }
+
+_token_usage: ContextVar[Optional[TokenUsage]] = ContextVar("token_usage", default=None)
+
+@contextmanager
+def track_token_usage() -> Iterator[TokenUsage]:
+    """
+    Collect the usage of every OpenAI call made inside the block, including
+    calls in tasks it starts. Calls answered by another caller's in-flight
+    request or by a cache cost nothing and are not counted. Blocks may nest;
+    an inner block's usage also counts towards the enclosing one.
+    """
+    parent = _token_usage.get()
+    usage = TokenUsage()
+    token = _token_usage.set(usage)
+    try:
+        yield usage
+    finally:
+        _token_usage.reset(token)
+        if parent is not None:
+            parent.add(usage)
+
+def record_token_usage(model: str, usage: Any, template: Optional[str] = None) -> None:
+    """
+    Count a usage block; with a template, also split its prompt tokens into
+    the part served from the provider's prompt cache and the rest
+    """
+    if usage is None:
+        return
+    prompt_tokens = getattr(usage, "prompt_tokens", 0) or 0
+    completion_tokens = getattr(usage, "completion_tokens", 0) or 0
+    # Only reported by models and endpoints that support prompt caching
+    details = getattr(usage, "prompt_tokens_details", None)
+    cached_tokens = getattr(details, "cached_tokens", 0) or 0
+    openai_tokens_total.inc(prompt_tokens, model=model, type="prompt")
+    openai_tokens_total.inc(completion_tokens, model=model, type="completion")
+    if template is not None:
+        openai_prompt_tokens_total.inc(cached_tokens, model=model, template=template, cache="cached")
+        openai_prompt_tokens_total.inc(prompt_tokens - cached_tokens, model=model, template=template, cache="uncached")
+    current = _token_usage.get()
+    if current is not None:
+        current.requests += 1
+        current.prompt_tokens += prompt_tokens
+        current.cached_prompt_tokens += cached_tokens
+        current.completion_tokens += completion_tokens
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording per-route latency, in-flight requests and
+    errors, and opening the root span of each request. Routes are labelled
+    by their path template so path parameters do not explode cardinality.
+    """
+
+    def __init__(self, app: Callable):
+        self.app = app
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message: Dict[str, Any]) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        # The route is only known once the router has matched, so the
+        # in-flight gauge is labelled by method alone
+        http_requests_in_flight.inc(method=method)
+        try:
+            with span("http", method=method, path=scope["path"]) as root:
+                try:
+                    await self.app(scope, receive, send_wrapper)
+                finally:
+                    if root is not None:
+                        root.attributes["status"] = status
+        finally:
+            http_requests_in_flight.dec(method=method)
+            route = scope.get("route")
+            route = getattr(route, "path", None) or ("unmatched" if status == 404 else "other")
+            http_request_duration_seconds.observe(time.perf_counter() - start, method=method, route=route)
+            http_requests_total.inc(method=method, route=route, status=status)
+            if status >= 500:
+                http_request_errors_total.inc(method=method, route=route)
@@ -0,0 +1,138 @@
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import asyncio
+import heapq
+import itertools
+import time
+
+# Lower runs first
+PRIORITY_INTERACTIVE = 0
+PRIORITY_STANDARD = 1
+PRIORITY_BATCH = 2
+
+class TokenBucket:
+    """
+    Refills continuously at `per_minute` units per minute up to one minute's
+    worth. The level may go negative when actual usage exceeds an estimate.
+    """
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def time_until(self, amount: float) -> float:
+        return max(0.0, (amount - self.level) / self.rate)
+
+class Reservation:
+    def __init__(self, limiter: "ModelLimiter", tokens: int):
+        self.limiter = limiter
+        self.tokens = tokens
+
+    def settle(self, actual_tokens: Optional[int]) -> None:
+        """
+        Charge the difference between the estimate and actual usage
+        """
+        if actual_tokens is None:
+            return
+        self.limiter.tokens.refill(time.monotonic())
+        self.limiter.tokens.level -= actual_tokens - self.tokens
+        self.tokens = actual_tokens
+
+class ModelLimiter:
+    def __init__(self, rpm: int, tpm: int):
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.waiters: List[Tuple[int, int, int, asyncio.Future]] = []
+        self.timer: Optional[asyncio.TimerHandle] = None
+        self.granted = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+class RateScheduler:
+    """
+    Admits upstream calls under per-model requests-per-minute and
+    tokens-per-minute budgets.
+
+    Callers reserve an estimated token cost; when the budget is exhausted
+    they queue, and waiting calls are admitted strictly by priority, then in
+    arrival order.
+    """
+
+    def __init__(self, limits_for: Callable[[str], Tuple[int, int]]):
+        self.limits_for = limits_for
+        self._limiters: Dict[str, ModelLimiter] = {}
+        self._seq = itertools.count()
+
+    def _limiter(self, model: str) -> ModelLimiter:
+        limiter = self._limiters.get(model)
+        if limiter is None:
+            limiter = self._limiters[model] = ModelLimiter(*self.limits_for(model))
+        return limiter
+
+    async def acquire(self, model: str, tokens: int, priority: int = PRIORITY_STANDARD) -> Reservation:
+        limiter = self._limiter(model)
+        # A single call larger than the whole budget would otherwise never run
+        tokens = int(min(tokens, limiter.tokens.capacity))
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(limiter.waiters, (priority, next(self._seq), tokens, future))
+        start = time.monotonic()
+        self._pump(limiter)
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Granted just as we were cancelled; give the budget back
+                limiter.requests.level += 1
+                limiter.tokens.level += tokens
+            self._pump(limiter)
+            raise
+        waited = time.monotonic() - start
+        limiter.granted += 1
+        limiter.wait_total += waited
+        limiter.wait_max = max(limiter.wait_max, waited)
+        return Reservation(limiter, tokens)
+
+    def _pump(self, limiter: ModelLimiter) -> None:
+        if limiter.timer is not None:
+            limiter.timer.cancel()
+            limiter.timer = None
+        now = time.monotonic()
+        limiter.requests.refill(now)
+        limiter.tokens.refill(now)
+        while limiter.waiters:
+            _, _, tokens, future = limiter.waiters[0]
+            if future.done():
+                heapq.heappop(limiter.waiters)
+                continue
+            delay = max(limiter.requests.time_until(1), limiter.tokens.time_until(tokens))
+            if delay > 0:
+                limiter.timer = asyncio.get_running_loop().call_later(delay, self._pump, limiter)
+                return
+            heapq.heappop(limiter.waiters)
+            limiter.requests.level -= 1
+            limiter.tokens.level -= tokens
+            future.set_result(None)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            model: {
+                "queued": sum(1 for *_, future in limiter.waiters if not future.done()),
+                "granted": limiter.granted,
+                "queue_wait_avg_ms": limiter.wait_total / limiter.granted * 1000 if limiter.granted else 0.0,
+                "queue_wait_max_ms": limiter.wait_max * 1000,
+                "requests_available": limiter.requests.level,
+                "tokens_available": limiter.tokens.level,
+            }
+            for model, limiter in self._limiters.items()
+        }
+
+def estimate_tokens(text: str) -> int:
+    """
+    Rough token count (about four characters per token for English text)
+    """
+    return len(text) // 4 + 1
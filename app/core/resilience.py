@@ -0,0 +1,238 @@
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, TypeVar
+import asyncio
+import random
+import time
+import httpx
+import openai
+from app.core.config import settings
+
+T = TypeVar("T")
+
+RETRYABLE_STATUS_CODES = {408, 425, 429, 500, 502, 503, 504}
+
+class UpstreamUnavailableError(Exception):
+    """
+    Raised without calling the provider while its circuit breaker is open
+    """
+
+    def __init__(self, provider: str):
+        super().__init__(f"{provider} is temporarily unavailable")
+        self.provider = provider
+
+def is_retryable(exc: BaseException) -> bool:
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code in RETRYABLE_STATUS_CODES
+    if isinstance(exc, httpx.TransportError):
+        return True
+    if isinstance(exc, openai.APIStatusError):
+        return exc.status_code in RETRYABLE_STATUS_CODES
+    if isinstance(exc, openai.APIConnectionError):
+        return True
+    return False
+
+def retry_after(exc: BaseException) -> Optional[float]:
+    response = getattr(exc, "response", None)
+    value = response.headers.get("retry-after") if response is not None else None
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+class LatencyTracker:
+    """
+    Rolling window of recent successful call latencies
+    """
+
+    def __init__(self, window: int = 200):
+        self.samples: Deque[float] = deque(maxlen=window)
+
+    def record(self, seconds: float) -> None:
+        self.samples.append(seconds)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failures and rejects calls
+    for `reset_timeout` seconds; then lets one probe through (half-open) and
+    closes again if it succeeds.
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+
+    def allow(self) -> bool:
+        if self.state == "closed":
+            return True
+        if self.state == "open" and time.monotonic() - self.opened_at >= self.reset_timeout:
+            self.state = "half_open"
+            self._probing = False
+        if self.state == "half_open" and not self._probing:
+            self._probing = True
+            return True
+        return False
+
+    def rejecting(self) -> bool:
+        """
+        Whether allow() would refuse a call right now, without claiming the
+        half-open probe
+        """
+        if self.state == "open":
+            return time.monotonic() - self.opened_at < self.reset_timeout
+        return self.state == "half_open" and self._probing
+
+    def record_success(self) -> None:
+        self.state = "closed"
+        self.failures = 0
+        self._probing = False
+
+    def release(self) -> None:
+        """
+        Free the half-open probe slot without recording an outcome, for calls
+        that were cancelled or failed for reasons unrelated to the provider
+        """
+        self._probing = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.state == "half_open" or self.failures >= self.failure_threshold:
+            self.state = "open"
+            self.opened_at = time.monotonic()
+            self._probing = False
+
+class Resilience:
+    """
+    Retry, hedging and circuit breaking for one upstream provider.
+
+    Retryable failures (429, 5xx, timeouts, connection errors) are retried
+    with full-jitter exponential backoff. With hedging on, an attempt that
+    runs past the provider's recent p95 latency gets a duplicate request and
+    the first to succeed wins. Failures that survive all retries count
+    towards the circuit breaker.
+    """
+
+    def __init__(
+        self,
+        provider: str,
+        max_attempts: int,
+        base_delay: float,
+        max_delay: float,
+        hedge: bool,
+        hedge_min_samples: int,
+        failure_threshold: int,
+        reset_timeout: float
+    ):
+        self.provider = provider
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.hedge = hedge
+        self.hedge_min_samples = hedge_min_samples
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self.latency = LatencyTracker()
+        self.retries = 0
+        self.hedges = 0
+        self.rejected = 0
+
+    def check(self) -> None:
+        """
+        Raise UpstreamUnavailableError while the breaker rejects calls, so
+        callers can skip work (such as reserving rate budget) before call()
+        """
+        if self.breaker.rejecting():
+            self.rejected += 1
+            raise UpstreamUnavailableError(self.provider)
+
+    async def call(self, fn: Callable[[], Awaitable[T]]) -> T:
+        if not self.breaker.allow():
+            self.rejected += 1
+            raise UpstreamUnavailableError(self.provider)
+        settled = False
+        try:
+            for attempt in range(self.max_attempts):
+                try:
+                    result = await self._attempt(fn)
+                except Exception as e:
+                    if not is_retryable(e):
+                        # Neither an outage nor a sign of health
+                        raise
+                    if attempt + 1 >= self.max_attempts:
+                        settled = True
+                        self.breaker.record_failure()
+                        raise
+                    self.retries += 1
+                    delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+                    await asyncio.sleep(max(delay, min(retry_after(e) or 0.0, self.max_delay)))
+                else:
+                    settled = True
+                    self.breaker.record_success()
+                    return result
+        finally:
+            if not settled:
+                # Cancelled or a non-retryable error: a half-open probe must
+                # not hold its slot forever
+                self.breaker.release()
+
+    async def _timed(self, fn: Callable[[], Awaitable[T]]) -> T:
+        start = time.perf_counter()
+        result = await fn()
+        self.latency.record(time.perf_counter() - start)
+        return result
+
+    async def _attempt(self, fn: Callable[[], Awaitable[T]]) -> T:
+        threshold = self.latency.percentile(95)
+        if not self.hedge or threshold is None or len(self.latency.samples) < self.hedge_min_samples:
+            return await self._timed(fn)
+
+        tasks = {asyncio.create_task(self._timed(fn))}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=threshold)
+            if not done:
+                self.hedges += 1
+                tasks.add(asyncio.create_task(self._timed(fn)))
+            error: Optional[BaseException] = None
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    def stats(self) -> Dict[str, Any]:
+        p95 = self.latency.percentile(95)
+        return {
+            "state": self.breaker.state,
+            "consecutive_failures": self.breaker.failures,
+            "retries": self.retries,
+            "hedges": self.hedges,
+            "rejected": self.rejected,
+            "p95_ms": p95 * 1000 if p95 is not None else None,
+        }
+
+def provider_resilience(provider: str) -> Resilience:
+    return Resilience(
+        provider,
+        max_attempts=settings.RESILIENCE_MAX_ATTEMPTS,
+        base_delay=settings.RESILIENCE_BASE_DELAY,
+        max_delay=settings.RESILIENCE_MAX_DELAY,
+        hedge=provider in settings.RESILIENCE_HEDGE_PROVIDERS,
+        hedge_min_samples=settings.RESILIENCE_HEDGE_MIN_SAMPLES,
+        failure_threshold=settings.CIRCUIT_BREAKER_FAILURE_THRESHOLD,
+        reset_timeout=settings.CIRCUIT_BREAKER_RESET_TIMEOUT,
+    )
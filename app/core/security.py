@@ -1,11 +1,30 @@
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Any, Union
+from typing import Any, List, Optional, Tuple, Union
+import asyncio
+import time
 from jose import jwt
 from passlib.context import CryptContext
 from app.core.config import settings
 from app.schemas.token import TokenPayload
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+)
+
+# bcrypt is CPU bound and releases the GIL; run it here, never on the event loop
+password_hash_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    thread_name_prefix="password-hash",
+)
+# Bulk user creation hashes on its own threads so logins never wait behind it
+bulk_password_hash_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_BULK_WORKERS,
+    thread_name_prefix="password-hash-bulk",
+)
 
 def create_access_token(
     subject: Union[str, Any], expires_delta: timedelta = None
@@ -28,12 +47,39 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
+async def verify_and_update_password(
+    plain_password: str, hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+    """
+    Verify a password and, if its hash uses an outdated cost, return a new
+    hash to store in its place
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        password_hash_executor, pwd_context.verify_and_update, plain_password, hashed_password
+    )
+
+async def get_password_hash_async(password: str) -> str:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(password_hash_executor, pwd_context.hash, password)
+
+async def get_password_hashes_bulk(passwords: List[str]) -> List[str]:
+    """
+    Hash many passwords on the bulk executor, in input order
+    """
+    loop = asyncio.get_running_loop()
+    return list(await asyncio.gather(
+        *(loop.run_in_executor(bulk_password_hash_executor, pwd_context.hash, password) for password in passwords)
+    ))
+
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
+from app.core.auth_cache import auth_cache
 from app.core.config import settings
-from app.core.deps import get_db
+from app.core.deps import get_async_db
 from app.models.user import User
 from app.schemas.token import TokenPayload
 
@@ -42,7 +88,7 @@ oauth2_scheme = OAuth2PasswordBearer(
 )
 
 async def get_current_user(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     token: str = Depends(oauth2_scheme)
 ) -> User:
     credentials_exception = HTTPException(
@@ -50,15 +96,30 @@ async def get_current_user(
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    try:
-        payload = jwt.decode(
-            token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
-        )
-        token_data = TokenPayload(**payload)
-    except JWTError:
-        raise credentials_exception
-    
-    user = db.query(User).filter(User.id == token_data.sub).first()
+    user_id = auth_cache.get_token(token)
+    if user_id is None:
+        try:
+            payload = jwt.decode(
+                token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
+            )
+            token_data = TokenPayload(**payload)
+        except JWTError:
+            raise credentials_exception
+        if token_data.sub is None:
+            raise credentials_exception
+        user_id = token_data.sub
+        auth_cache.set_token(token, user_id, payload.get("exp", 0) - time.time())
+
+    # On a hit, return a detached copy and skip the database entirely. It
+    # keeps the row's identity, so adding it to a session updates the row.
+    snapshot = auth_cache.get_user(user_id)
+    if snapshot is not None:
+        user = User(**snapshot)
+        make_transient_to_detached(user)
+        return user
+
+    user = await db.get(User, user_id)
     if not user:
         raise credentials_exception
-    return user 
\ No newline at end of file
+    auth_cache.set_user(user)
+    return user
\ No newline at end of file
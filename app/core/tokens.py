@@ -0,0 +1,33 @@
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+from app.core.rate_limiter import estimate_tokens
+
+try:
+    import tiktoken
+except ImportError:  # Optional; counts fall back to the character heuristic
+    tiktoken = None
+
+# Per-message framing tokens added by the chat format
+MESSAGE_OVERHEAD_TOKENS = 4
+
+@lru_cache(maxsize=32)
+def _encoding(model: Optional[str]) -> Any:
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.encoding_for_model(model or "")
+    except KeyError:
+        # Unknown or newer model names: use the current default encoding
+        return tiktoken.get_encoding("o200k_base")
+
+def count_tokens(text: str, model: Optional[str] = None) -> int:
+    """
+    Count tokens locally with tiktoken when it is installed, otherwise estimate
+    """
+    encoding = _encoding(model)
+    if encoding is None:
+        return estimate_tokens(text)
+    return len(encoding.encode(text, disallowed_special=()))
+
+def count_message_tokens(messages: List[Dict[str, str]], model: Optional[str] = None) -> int:
+    return sum(count_tokens(message["content"], model) + MESSAGE_OVERHEAD_TOKENS for message in messages)
@@ -0,0 +1,97 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional
+import itertools
+import logging
+import time
+import uuid
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_current_span: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+_span_ids = itertools.count(1)
+
+class Span:
+    """
+    One timed step of a request. Spans started while another is current
+    become its children, including spans in tasks created under it.
+    """
+
+    __slots__ = ("id", "name", "attributes", "parent", "trace_id", "spans", "start", "end", "error")
+
+    def __init__(self, name: str, parent: Optional["Span"], attributes: Dict[str, Any]):
+        self.id = next(_span_ids)
+        self.name = name
+        self.attributes = attributes
+        self.parent = parent
+        self.trace_id = parent.trace_id if parent else uuid.uuid4().hex[:16]
+        # Every span of the trace, shared with the root
+        self.spans: List["Span"] = parent.spans if parent else []
+        self.spans.append(self)
+        self.start = time.perf_counter()
+        self.end: Optional[float] = None
+        self.error: Optional[str] = None
+
+    @property
+    def duration_ms(self) -> float:
+        return ((self.end or time.perf_counter()) - self.start) * 1000
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Optional[Span]]:
+    """
+    Time a block as a span of the current trace; a span with no parent
+    starts a new trace, which is logged when it ends. No-op unless
+    TRACING_ENABLED is set.
+    """
+    if not settings.TRACING_ENABLED:
+        yield None
+        return
+    parent = _current_span.get()
+    current = Span(name, parent, attributes)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.error = type(e).__name__
+        raise
+    finally:
+        current.end = time.perf_counter()
+        _current_span.reset(token)
+        if parent is None and current.duration_ms >= settings.TRACING_MIN_DURATION_MS:
+            log_trace(current)
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+def log_trace(root: Span) -> None:
+    children: Dict[int, List[Span]] = {}
+    for item in root.spans:
+        if item.parent is not None:
+            children.setdefault(item.parent.id, []).append(item)
+
+    lines = [f"trace {root.trace_id}"]
+
+    def walk(item: Span, depth: int) -> None:
+        attributes = " ".join(f"{key}={value}" for key, value in item.attributes.items())
+        offset = (item.start - root.start) * 1000
+        status = f" error={item.error}" if item.error else ""
+        unfinished = "" if item.end is not None else " (unfinished)"
+        lines.append(
+            f"{'  ' * depth}{item.name} +{offset:.1f}ms {item.duration_ms:.1f}ms"
+            f"{' ' + attributes if attributes else ''}{status}{unfinished}"
+        )
+        for child in sorted(children.get(item.id, []), key=lambda c: c.start):
+            walk(child, depth + 1)
+
+    walk(root, 0)
+    logger.info("\n".join(lines))
+
+def configure_logging() -> None:
+    """
+    Make span logs visible when tracing is on and nothing else has
+    configured the logger
+    """
+    if settings.TRACING_ENABLED and not logger.handlers:
+        logger.addHandler(logging.StreamHandler())
+        logger.setLevel(logging.INFO)
@@ -0,0 +1,16 @@
+from sqlalchemy import Column, String, Integer, Text, DateTime
+from uuid import uuid4
+from .base import BaseModel
+
+class VideoJob(BaseModel):
+    __tablename__ = "video_jobs"
+
+    id = Column(String(32), primary_key=True, index=True, default=lambda: uuid4().hex)
+    status = Column(String(16), index=True, nullable=False, default="queued")
+    script = Column(Text, nullable=False)  # JSON encoded VideoGenerationRequest
+    result = Column(Text, nullable=True)  # JSON encoded enhanced script
+    error = Column(Text, nullable=True)
+    total_scenes = Column(Integer, nullable=False, default=0)
+    completed_scenes = Column(Integer, nullable=False, default=0)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
@@ -0,0 +1,19 @@
+from pydantic import BaseModel
+from typing import Optional, Dict, Any, List
+from datetime import datetime
+
+class VideoJobCreate(BaseModel):
+    voiceover_sections: List[Dict[str, Any]]
+    stock_footage_keywords: List[str]
+
+class VideoJob(BaseModel):
+    id: str
+    status: str
+    total_scenes: int
+    completed_scenes: int
+    error: Optional[str] = None
+    result: Optional[Dict[str, Any]] = None
+    created_at: datetime
+    updated_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
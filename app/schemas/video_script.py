@@ -0,0 +1,21 @@
+from pydantic import BaseModel, TypeAdapter
+from typing import List
+
+class Scene(BaseModel):
+    scene_number: int
+    visual: str
+    caption: str
+    music_sfx: str
+    search_queries: List[str]
+
+class VoiceoverSection(BaseModel):
+    voiceover: str
+    scenes: List[Scene]
+
+class VideoScriptContent(BaseModel):
+    voiceover_sections: List[VoiceoverSection]
+
+# Built once at import and reused to validate every model reply
+video_script_adapter = TypeAdapter(VideoScriptContent)
+voiceover_section_adapter = TypeAdapter(VoiceoverSection)
+keywords_adapter = TypeAdapter(List[str])
@@ -0,0 +1,62 @@
+from typing import Any, AsyncIterator, Dict
+import asyncio
+import hashlib
+import json
+import os
+import uuid
+
+class AudioStore:
+    """
+    Content-addressed store for synthesized voiceover audio on local disk.
+
+    Files are named after a stable digest of everything that determines the
+    audio, so identical narration maps to the same file in every process.
+    """
+
+    def __init__(self, directory: str, url_prefix: str = "/audio", chunk_size: int = 65536):
+        self.directory = directory
+        self.url_prefix = url_prefix.rstrip("/")
+        self.chunk_size = chunk_size
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def digest(text: str, voice_id: str, model_id: str, voice_settings: Dict[str, Any]) -> str:
+        canonical = json.dumps(
+            {
+                "text": text,
+                "voice_id": voice_id,
+                "model_id": model_id,
+                "voice_settings": voice_settings,
+            },
+            sort_keys=True,
+            separators=(",", ":"),
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def path(self, digest: str) -> str:
+        return os.path.join(self.directory, f"{digest}.mp3")
+
+    def url(self, digest: str) -> str:
+        return f"{self.url_prefix}/{digest}.mp3"
+
+    def exists(self, digest: str) -> bool:
+        return os.path.exists(self.path(digest))
+
+    async def write_stream(self, digest: str, chunks: AsyncIterator[bytes]) -> str:
+        """
+        Write audio chunks to a temporary file and atomically move it into place
+        """
+        tmp_path = os.path.join(self.directory, f".{digest}.{uuid.uuid4().hex}.tmp")
+        f = await asyncio.to_thread(open, tmp_path, "wb")
+        try:
+            async for chunk in chunks:
+                await asyncio.to_thread(f.write, chunk)
+            await asyncio.to_thread(f.close)
+            os.replace(tmp_path, self.path(digest))
+        except BaseException:
+            f.close()
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return self.path(digest)
@@ -1,35 +1,254 @@
+from array import array
+from contextlib import aclosing
 from openai import AsyncOpenAI
+from app.core.cache import MISSING, EmbeddingCache, SemanticCache, TTLCache
 from app.core.config import settings
-from typing import Optional, List, Dict, Any
-import json
+from app.core.json_stream import JSONArrayStreamParser, extract_json
+from app.core.metrics import (
+    TokenUsage, openai_prompt_tokens_local_total, record_token_usage, script_generation_tokens_total,
+    script_generation_variations_total, track_token_usage, track_upstream
+)
+from app.core.rate_limiter import (
+    PRIORITY_BATCH, PRIORITY_INTERACTIVE, PRIORITY_STANDARD, RateScheduler, Reservation
+)
+from app.core.resilience import UpstreamUnavailableError, provider_resilience
+from app.core.singleflight import SingleFlight, canonical_key
+from app.core.tokens import count_message_tokens, count_tokens
+from app.schemas.video_script import keywords_adapter, video_script_adapter, voiceover_section_adapter
+from app.services.prompts import PromptTemplate, prompts
+from pydantic import ValidationError
+from typing import Optional, List, Dict, Any, AsyncIterator, Awaitable, Callable, Tuple
+import asyncio
+import hashlib
+
+SCRIPT_MODE_PARALLEL = "parallel"
+SCRIPT_MODE_MULTI_CHOICE = "multi_choice"
+SCRIPT_MODES = (SCRIPT_MODE_PARALLEL, SCRIPT_MODE_MULTI_CHOICE)
 
 class OpenAIService:
     def __init__(self):
-        self.client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
+        # Retries are handled by self.resilience so they share its backoff and breaker
+        self.client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY, max_retries=0)
         self.model = settings.OPENAI_MODEL
         self.max_tokens = settings.OPENAI_MAX_TOKENS
         self.temperature = settings.OPENAI_TEMPERATURE
+        self.script_concurrency = settings.OPENAI_SCRIPT_CONCURRENCY
+        self.script_generation_mode = settings.OPENAI_SCRIPT_GENERATION_MODE
+        self._script_usage = {mode: TokenUsage() for mode in SCRIPT_MODES}
+        self._script_variations = dict.fromkeys(SCRIPT_MODES, 0)
+        self.embedding_model = settings.OPENAI_EMBEDDING_MODEL
+        self.embeddings_batch_size = settings.EMBEDDINGS_BATCH_SIZE
+        self.embedding_cache = (
+            EmbeddingCache(settings.EMBEDDINGS_CACHE_PATH)
+            if settings.EMBEDDINGS_CACHE_PATH else None
+        )
+        self.completion_cache = TTLCache(
+            settings.COMPLETION_CACHE_MAX_ENTRIES, settings.COMPLETION_CACHE_TTL
+        ) if settings.COMPLETION_CACHE_ENABLED else None
+        self.semantic_cache = SemanticCache(
+            settings.COMPLETION_CACHE_MAX_ENTRIES,
+            settings.COMPLETION_CACHE_TTL,
+            settings.COMPLETION_SEMANTIC_CACHE_THRESHOLD
+        ) if settings.COMPLETION_CACHE_ENABLED and settings.COMPLETION_SEMANTIC_CACHE_ENABLED else None
+        # Shared by every request in this process
+        self._semaphore = asyncio.Semaphore(settings.OPENAI_MAX_CONCURRENCY)
+        self.scheduler = RateScheduler(self._rate_limits)
+        self.resilience = provider_resilience("openai")
+        self.script_flight = SingleFlight()
+        self.embedding_flight = SingleFlight()
+
+    @staticmethod
+    def _rate_limits(model: str) -> Tuple[int, int]:
+        limits = settings.OPENAI_MODEL_RATE_LIMITS.get(model, {})
+        return (
+            limits.get("rpm", settings.OPENAI_RPM_LIMIT),
+            limits.get("tpm", settings.OPENAI_TPM_LIMIT),
+        )
+
+    @staticmethod
+    def _prompt_tokens(messages: List[Dict[str, str]], model: str, template: Optional[str]) -> int:
+        prompt_tokens = count_message_tokens(messages, model)
+        if template is not None:
+            openai_prompt_tokens_local_total.inc(prompt_tokens, model=model, template=template)
+        return prompt_tokens
+
+    @staticmethod
+    def _completion_budget(max_tokens: Optional[int], n: int = 1) -> int:
+        return n * (max_tokens or settings.OPENAI_COMPLETION_TOKEN_ESTIMATE)
+
+    async def startup(self) -> None:
+        """
+        Validate the prompt templates and count their static prefixes (called
+        from the app lifespan) so a broken template fails at boot
+        """
+        prompts.compile()
+
+    async def _chat(self, *, priority: int, template: Optional[str] = None, **kwargs: Any) -> Any:
+        """
+        Every non-streaming chat.completions call goes through the rate
+        scheduler and the process-wide concurrency cap. `template` is the id
+        of the prompt template the messages came from, for token accounting.
+        """
+        estimated = (
+            self._prompt_tokens(kwargs["messages"], kwargs["model"], template)
+            + self._completion_budget(kwargs.get("max_tokens"), kwargs.get("n", 1))
+        )
+        reservation, response = await self._upstream(
+            f"chat:{kwargs['model']}", kwargs["model"], estimated, priority,
+            lambda: self._limited(self.client.chat.completions.create, **kwargs)
+        )
+        reservation.settle(response.usage.total_tokens if response.usage else None)
+        record_token_usage(kwargs["model"], response.usage, template)
+        return response
+
+    async def _chat_stream(self, *, priority: int, template: Optional[str] = None, **kwargs: Any) -> AsyncIterator[Any]:
+        """
+        Streaming counterpart of _chat; yields the raw chunks. Close it (e.g.
+        with aclosing) when stopping early so the upstream response is closed.
+        """
+        estimated = (
+            self._prompt_tokens(kwargs["messages"], kwargs["model"], template)
+            + self._completion_budget(kwargs.get("max_tokens"))
+        )
+
+        async def open_stream() -> Any:
+            # Each attempt takes a concurrency slot, so none is held during
+            # retry backoff; the winning attempt keeps it until the stream ends
+            await self._semaphore.acquire()
+            try:
+                return await self.client.chat.completions.create(
+                    stream=True,
+                    stream_options={"include_usage": True},
+                    **kwargs
+                )
+            except BaseException:
+                self._semaphore.release()
+                raise
+
+        # Only opening the stream is retried (and timed); a failure
+        # mid-stream propagates
+        reservation, stream = await self._upstream(
+            f"chat_stream:{kwargs['model']}", kwargs["model"], estimated, priority, open_stream
+        )
+        try:
+            async for chunk in stream:
+                if chunk.usage is not None:
+                    reservation.settle(chunk.usage.total_tokens)
+                    record_token_usage(kwargs["model"], chunk.usage, template)
+                yield chunk
+        finally:
+            # Closing the response stops generation (and billing) when the
+            # consumer goes away early
+            await stream.close()
+            self._semaphore.release()
+
+    async def _embed(self, *, priority: int, model: str, input: List[str]) -> Any:
+        estimated = sum(count_tokens(text, model) for text in input)
+        reservation, response = await self._upstream(
+            f"embeddings:{model}", model, estimated, priority,
+            lambda: self._limited(self.client.embeddings.create, model=model, input=input)
+        )
+        reservation.settle(response.usage.total_tokens if response.usage else None)
+        record_token_usage(model, response.usage)
+        return response
+
+    async def _upstream(
+        self,
+        operation: str,
+        model: str,
+        estimated: int,
+        priority: int,
+        fn: Callable[[], Awaitable[Any]]
+    ) -> Tuple[Reservation, Any]:
+        """
+        Call `fn` with retries and hedging, reserving rate budget for every
+        upstream attempt: retries and hedges are requests the provider counts
+        too. Returns the reservation of the attempt that succeeded, to settle
+        against its actual usage.
+        """
+        # An open breaker fails fast instead of queueing for budget first
+        self.resilience.check()
+        first = [await self.scheduler.acquire(model, estimated, priority)]
+
+        async def attempt() -> Tuple[Reservation, Any]:
+            reservation = first.pop() if first else await self.scheduler.acquire(model, estimated, priority)
+            return reservation, await fn()
+
+        async with track_upstream("openai", operation):
+            return await self.resilience.call(attempt)
+
+    async def _limited(self, func, **kwargs: Any) -> Any:
+        # Backoff sleeps between retries happen outside the concurrency cap
+        async with self._semaphore:
+            return await func(**kwargs)
+
+    async def shutdown(self) -> None:
+        """
+        Release resources held by the service (called from the app lifespan)
+        """
+        if self.embedding_cache is not None:
+            self.embedding_cache.close()
 
     async def generate_completion(
         self,
         prompt: str,
         system_prompt: Optional[str] = None,
         temperature: Optional[float] = None,
-        max_tokens: Optional[int] = None
+        max_tokens: Optional[int] = None,
+        use_cache: bool = True
     ) -> Dict[str, Any]:
         """
         Generate a completion using OpenAI's API
+
+        Responses are cached on (model, system_prompt, prompt, temperature,
+        max_tokens); with the semantic tier enabled, a cached answer is also
+        reused for a prompt whose embedding is close enough. The "cache" field
+        of the result is "exact", "semantic", "miss" or "bypass".
         """
-        messages = []
-        if system_prompt:
-            messages.append({"role": "system", "content": system_prompt})
-        messages.append({"role": "user", "content": prompt})
+        temperature = temperature or self.temperature
+        max_tokens = max_tokens or self.max_tokens
+        if not use_cache or self.completion_cache is None:
+            return {**await self._create_completion(prompt, system_prompt, temperature, max_tokens), "cache": "bypass"}
+
+        namespace = (self.model, system_prompt, temperature, max_tokens)
+        key = (*namespace, prompt)
+        cached = self.completion_cache.get(key)
+        if cached is not MISSING:
+            return {**cached, "cache": "exact"}
+
+        embedding = None
+        if self.semantic_cache is not None:
+            try:
+                embedding = (await self.generate_embeddings_batch([prompt]))[0]
+            except Exception:
+                # The semantic tier is best effort; fall through to the model
+                embedding = None
+            if embedding is not None:
+                cached = self.semantic_cache.get(namespace, embedding)
+                if cached is not MISSING:
+                    return {**cached, "cache": "semantic"}
+
+        result = await self._create_completion(prompt, system_prompt, temperature, max_tokens)
+        self.completion_cache.set(key, result)
+        if embedding is not None:
+            self.semantic_cache.set(namespace, embedding, result)
+        return {**result, "cache": "miss"}
+
+    async def _create_completion(
+        self,
+        prompt: str,
+        system_prompt: Optional[str],
+        temperature: float,
+        max_tokens: int
+    ) -> Dict[str, Any]:
+        messages = self._build_messages(prompt, system_prompt)
 
-        response = await self.client.chat.completions.create(
+        response = await self._chat(
+            priority=PRIORITY_INTERACTIVE,
             model=self.model,
             messages=messages,
-            temperature=temperature or self.temperature,
-            max_tokens=max_tokens or self.max_tokens
+            temperature=temperature,
+            max_tokens=max_tokens
         )
 
         return {
@@ -38,19 +257,108 @@ class OpenAIService:
             "model": response.model
         }
 
+    async def stream_completion(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream a completion as it is generated.
+
+        Yields {"type": "delta", "content": ...} for each token delta, then a
+        final {"type": "done", "usage": ..., "model": ...} event.
+        """
+        messages = self._build_messages(prompt, system_prompt)
+
+        model = self.model
+        usage = None
+        # aclosing: closing this generator must close the upstream stream too
+        async with aclosing(self._chat_stream(
+            priority=PRIORITY_INTERACTIVE,
+            model=self.model,
+            messages=messages,
+            temperature=temperature or self.temperature,
+            max_tokens=max_tokens or self.max_tokens
+        )) as chunks:
+            async for chunk in chunks:
+                model = chunk.model or model
+                if chunk.usage is not None:
+                    usage = chunk.usage.dict()
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield {"type": "delta", "content": chunk.choices[0].delta.content}
+
+        yield {"type": "done", "usage": usage, "model": model}
+
+    @staticmethod
+    def _build_messages(prompt: str, system_prompt: Optional[str] = None) -> List[Dict[str, str]]:
+        messages = []
+        if system_prompt:
+            messages.append({"role": "system", "content": system_prompt})
+        messages.append({"role": "user", "content": prompt})
+        return messages
+
     async def generate_embeddings(
         self,
         text: str,
-        model: str = "text-embedding-ada-002"
+        model: Optional[str] = None
     ) -> List[float]:
         """
         Generate embeddings for the given text
         """
-        response = await self.client.embeddings.create(
-            model=model,
-            input=text
+        model = model or self.embedding_model
+        embeddings = await self.embedding_flight.do(
+            canonical_key("embedding", model, text),
+            lambda: self.generate_embeddings_batch([text], model=model)
         )
-        return response.data[0].embedding
+        return embeddings[0].tolist()
+
+    async def generate_embeddings_batch(
+        self,
+        texts: List[str],
+        model: Optional[str] = None
+    ) -> List[array]:
+        """
+        Generate embeddings for many texts, returned as float32 arrays in input order.
+
+        Duplicate texts are embedded once, cached vectors are reused, and only the
+        misses are sent upstream in chunks of EMBEDDINGS_BATCH_SIZE.
+        """
+        model = model or self.embedding_model
+        digests = [hashlib.sha256(text.encode("utf-8")).hexdigest() for text in texts]
+        unique = dict(zip(digests, texts))
+
+        vectors: Dict[str, array] = {}
+        if self.embedding_cache is not None:
+            vectors = await asyncio.to_thread(self.embedding_cache.get_many, model, list(unique))
+
+        misses = [digest for digest in unique if digest not in vectors]
+        chunks = [
+            misses[i:i + self.embeddings_batch_size]
+            for i in range(0, len(misses), self.embeddings_batch_size)
+        ]
+
+        async def embed(chunk: List[str]) -> Dict[str, array]:
+            response = await self._embed(
+                priority=PRIORITY_STANDARD,
+                model=model,
+                input=[unique[digest] for digest in chunk]
+            )
+            # Results carry their input index; don't rely on response ordering
+            return {
+                chunk[item.index]: array("f", item.embedding)
+                for item in response.data
+            }
+
+        fetched: Dict[str, array] = {}
+        for result in await asyncio.gather(*(embed(chunk) for chunk in chunks)):
+            fetched.update(result)
+        if fetched and self.embedding_cache is not None:
+            await asyncio.to_thread(self.embedding_cache.set_many, model, fetched)
+        vectors.update(fetched)
+
+        return [vectors[digest] for digest in digests]
 
     async def generate_video_script(
         self,
@@ -63,145 +371,327 @@ class OpenAIService:
         tone: str = "professional and inspiring",
         ad_type: str = "product showcase",
         variations_no: int = 1,
-        model: Optional[str] = "gpt-4.1-nano"
+        model: Optional[str] = "gpt-4.1-nano",
+        concurrency: Optional[int] = None,
+        mode: Optional[str] = None
     ) -> List[Dict[str, Any]]:
         """
         Generate multiple variations of structured video scripts in JSON format using OpenAI.
-        """
-        script_prompt = f"""
-You're a professional video scriptwriter specializing in product marketing.
-
-Generate a complete video script in JSON format for a {duration} {ad_type} promotional video about {product_name}.
-Product Description: {product_description}
-Target Audience: {target_audience}
-Language: {language}
-Brand Name: {brand_name}
-Tone: {tone}
-Ad Type: {ad_type}
-
-The script should be organized into voiceover sections, where each section can have multiple scenes.
-Each voiceover section should include:
-- voiceover (the narration text)
-- scenes (array of scenes that play during this voiceover)
-
-Each scene should include:
-- scene_number (sequential number across all scenes)
-- visual (visual description of the scene)
-- caption (on-screen text in {language})
-- music_sfx (background music or sound effects)
-- search_queries (array of 3-5 specific search queries for finding stock footage for this scene)
-
-Guidelines for scenes:
-1. Each voiceover section can have 1-3 scenes
-2. Scenes should flow naturally with the voiceover
-3. Use visual transitions between scenes
-4. Consider timing and pacing
-5. Ensure scenes support the voiceover message
-
-Guidelines for search_queries:
-1. Each query should be specific to the scene's visual needs
-2. Include both broad and specific terms
-3. Consider camera angles and movements
-4. Include relevant props or elements
-5. Consider lighting and atmosphere
-6. Use terms commonly found in stock footage websites
-
-Example structure:
-{{
-    "voiceover_sections": [
-        {{
-            "voiceover": "Welcome to the future of home living",
-            "scenes": [
-                {{
-                    "scene_number": 1,
-                    "visual": "Wide shot of modern home exterior",
-                    "caption": "SmartHome Hub",
-                    "music_sfx": "Modern, tech-inspired background music",
-                    "search_queries": ["modern home exterior", "contemporary architecture", "smart home"]
-                }},
-                {{
-                    "scene_number": 2,
-                    "visual": "Close-up of smart door lock",
-                    "caption": "Secure & Connected",
-                    "music_sfx": "Continuing background music",
-                    "search_queries": ["smart door lock", "security technology", "home automation"]
-                }}
-            ]
-        }}
-    ]
-}}
 
-Return the result as a valid JSON object with voiceover_sections array.
-Ensure the output is directly parseable JSON.
+        In "parallel" mode all variations and the keywords prompt are requested
+        concurrently, at most `concurrency` at a time (defaults to
+        OPENAI_SCRIPT_CONCURRENCY). In "multi_choice" mode the variations are
+        the choices of a single request, so the script prompt is sent and
+        billed once. `mode` defaults to OPENAI_SCRIPT_GENERATION_MODE.
+        Variations that fail are dropped; an error is raised only if none succeed.
+
+        Identical requests made while one is in flight share its result.
         """
+        mode = mode or self.script_generation_mode
+        if mode not in SCRIPT_MODES:
+            raise ValueError(f"Unknown script generation mode: {mode}")
+        if variations_no < 1:
+            raise ValueError("variations_no must be at least 1")
+        inputs = (
+            product_name, product_description, duration, target_audience,
+            language, brand_name, tone, ad_type
+        )
+        key = canonical_key("video_script", *inputs, variations_no, model, mode)
+        return await self.script_flight.do(
+            key, lambda: self._generate_video_script(*inputs, variations_no, model, concurrency, mode)
+        )
 
-        keywords_prompt = f"""
-Based on the following product information, generate at least 4 relevant keywords for stock footage selection:
+    async def _generate_video_script(
+        self,
+        product_name: str,
+        product_description: str,
+        duration: str,
+        target_audience: str,
+        language: str,
+        brand_name: str,
+        tone: str,
+        ad_type: str,
+        variations_no: int,
+        model: Optional[str],
+        concurrency: Optional[int],
+        mode: str
+    ) -> List[Dict[str, Any]]:
+        with track_token_usage() as usage:
+            results = await self._generate_script_variations(
+                product_name, product_description, duration, target_audience, language,
+                brand_name, tone, ad_type, variations_no, model, concurrency, mode
+            )
+        script_generation_tokens_total.inc(usage.prompt_tokens, mode=mode, type="prompt")
+        script_generation_tokens_total.inc(usage.completion_tokens, mode=mode, type="completion")
+        script_generation_variations_total.inc(len(results), mode=mode)
+        self._script_usage[mode].add(usage)
+        self._script_variations[mode] += len(results)
+        return results
+
+    def script_usage_stats(self) -> Dict[str, Any]:
+        """
+        Token usage of script generation per mode, to compare their cost
+        """
+        return {
+            mode: {
+                **usage.to_dict(),
+                "variations": self._script_variations[mode],
+                "tokens_per_variation": (
+                    usage.total_tokens / self._script_variations[mode] if self._script_variations[mode] else 0.0
+                ),
+            }
+            for mode, usage in self._script_usage.items()
+        }
 
-Product: {product_name}
-Description: {product_description}
-Target Audience: {target_audience}
-Tone: {tone}
+    async def _generate_script_variations(
+        self,
+        product_name: str,
+        product_description: str,
+        duration: str,
+        target_audience: str,
+        language: str,
+        brand_name: str,
+        tone: str,
+        ad_type: str,
+        variations_no: int,
+        model: Optional[str],
+        concurrency: Optional[int],
+        mode: str
+    ) -> List[Dict[str, Any]]:
+        script_template = prompts.get("video_script")
+        keywords_template = prompts.get("video_keywords")
+        fields = self._video_script_fields(
+            product_name, product_description, duration, target_audience,
+            language, brand_name, tone, ad_type
+        )
+        script_messages = script_template.messages(**fields)
 
-The keywords should be:
-1. Specific and relevant to the product
-2. Useful for finding stock footage
-3. Include both product-specific and emotional/atmospheric terms
-4. Be in {language}
+        request_semaphore = asyncio.Semaphore(max(1, concurrency or self.script_concurrency))
 
-Return the keywords as a JSON array of strings.
-        """
+        async def create(template: PromptTemplate, messages: List[Dict[str, str]], temperature: float, n: int = 1):
+            async with request_semaphore:
+                return await self._chat(
+                    priority=PRIORITY_BATCH,
+                    template=template.id,
+                    model=model,
+                    messages=messages,
+                    temperature=temperature,
+                    **template.request_options(),
+                    **({"n": n} if n > 1 else {})
+                )
 
-        try:
-            # Generate multiple variations concurrently
-            script_tasks = []
-            for i in range(variations_no):
-                # Add variation number to prompt for diversity
-                variation_prompt = f"{script_prompt}\n\nThis is variation {i+1} of {variations_no}. Please ensure this variation is unique and different from other variations."
-                script_tasks.append(
-                    self.client.chat.completions.create(
-                        model=model,
-                        messages=[{"role": "user", "content": variation_prompt}],
-                        temperature=0.7 + (i * 0.1)  # Increase temperature for each variation
-                    )
+        # Keywords are shared across variations, so they are requested once
+        # alongside every variation instead of ahead of them.
+        keywords_task = create(keywords_template, keywords_template.messages(**fields), 0.7)
+        if mode == SCRIPT_MODE_MULTI_CHOICE:
+            # One prompt, N sampled completions; choices differ through
+            # sampling rather than a per-variation prompt suffix
+            temperature = sum(self._variation_temperature(i) for i in range(variations_no)) / variations_no
+            script_tasks = [create(script_template, script_messages, temperature, n=variations_no)]
+        else:
+            script_tasks = [
+                create(
+                    script_template,
+                    self._variation_messages(script_messages, i, variations_no),
+                    self._variation_temperature(i)
                 )
+                for i in range(variations_no)
+            ]
 
-            # Generate keywords once as they can be shared across variations
-            keywords_response = await self.client.chat.completions.create(
-                model=model,
-                messages=[{"role": "user", "content": keywords_prompt}],
-                temperature=0.7
-            )
-            keywords_content = keywords_response.choices[0].message.content.strip()
-
-            # Parse keywords
-            if keywords_content.startswith("```json"):
-                keywords_content = keywords_content.split("```json")[1].split("```")[0].strip()
-            elif keywords_content.startswith("```"):
-                keywords_content = keywords_content.split("```")[1].split("```")[0].strip()
-            keywords = json.loads(keywords_content)
-
-            # Process all script variations
-            results = []
-            for script_task in script_tasks:
-                script_response = await script_task
-                script_content = script_response.choices[0].message.content.strip()
-
-                # Parse script
-                if script_content.startswith("```json"):
-                    script_content = script_content.split("```json")[1].split("```")[0].strip()
-                elif script_content.startswith("```"):
-                    script_content = script_content.split("```")[1].split("```")[0].strip()
-                script_data = json.loads(script_content)
+        keywords_response, *script_responses = await asyncio.gather(
+            keywords_task, *script_tasks, return_exceptions=True
+        )
+
+        try:
+            if isinstance(keywords_response, Exception):
+                raise keywords_response
+            keywords = self._parse_keywords(keywords_response.choices[0].message.content)
+        except UpstreamUnavailableError:
+            raise
+        except Exception as e:
+            raise Exception(f"Error generating video scripts: {str(e)}")
 
+        # Keep every variation that succeeded; a single failed or malformed
+        # variation should not discard the others.
+        results = []
+        errors = []
+        contents = []
+        for script_response in script_responses:
+            if isinstance(script_response, Exception):
+                errors.append(str(script_response))
+            else:
+                contents.extend(choice.message.content for choice in script_response.choices)
+        for content in contents:
+            try:
                 results.append({
-                    "voiceover_sections": script_data["voiceover_sections"],
+                    "voiceover_sections": self._parse_script(content),
                     "stock_footage_keywords": keywords
                 })
+            except Exception as e:
+                errors.append(str(e))
 
-            return results
+        if not results:
+            raise Exception(f"Error generating video scripts: {'; '.join(errors)}")
 
-        except Exception as e:
-            raise Exception(f"Error generating video scripts: {str(e)}")
+        return results
+
+    async def stream_video_script(
+        self,
+        product_name: str,
+        product_description: str,
+        duration: str = "60 seconds",
+        target_audience: str = "general audience",
+        language: str = "English",
+        brand_name: str = "",
+        tone: str = "professional and inspiring",
+        ad_type: str = "product showcase",
+        variations_no: int = 1,
+        model: Optional[str] = "gpt-4.1-nano",
+        concurrency: Optional[int] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream video script variations section by section.
+
+        The model output of every variation is parsed incrementally, and each
+        completed voiceover section is yielded as soon as it is closed:
+        {"type": "section", "variation": i, "section_index": k, "voiceover_section": {...}}.
+        Also yields one "keywords" event, a "variation_done" or "variation_error"
+        event per variation, and a final "done" event.
+        """
+        script_template = prompts.get("video_script")
+        keywords_template = prompts.get("video_keywords")
+        fields = self._video_script_fields(
+            product_name, product_description, duration, target_audience,
+            language, brand_name, tone, ad_type
+        )
+        script_messages = script_template.messages(**fields)
+        request_semaphore = asyncio.Semaphore(max(1, concurrency or self.script_concurrency))
+        queue: asyncio.Queue = asyncio.Queue()
+
+        async def keywords_producer() -> None:
+            try:
+                async with request_semaphore:
+                    response = await self._chat(
+                        priority=PRIORITY_BATCH,
+                        template=keywords_template.id,
+                        model=model,
+                        messages=keywords_template.messages(**fields),
+                        temperature=0.7,
+                        **keywords_template.request_options()
+                    )
+                keywords = self._parse_keywords(response.choices[0].message.content)
+                await queue.put({"type": "keywords", "stock_footage_keywords": keywords})
+            except Exception as e:
+                await queue.put({"type": "keywords_error", "detail": str(e)})
+
+        async def variation_producer(index: int) -> None:
+            parser = JSONArrayStreamParser("voiceover_sections")
+            section_index = 0
+            try:
+                # aclosing: a cancelled producer must close its upstream stream
+                async with request_semaphore, aclosing(self._chat_stream(
+                    priority=PRIORITY_BATCH,
+                    template=script_template.id,
+                    model=model,
+                    messages=self._variation_messages(script_messages, index, variations_no),
+                    temperature=self._variation_temperature(index),
+                    **script_template.request_options()
+                )) as chunks:
+                    async for chunk in chunks:
+                        if not chunk.choices or not chunk.choices[0].delta.content:
+                            continue
+                        for section in parser.feed(chunk.choices[0].delta.content):
+                            await queue.put({
+                                "type": "section",
+                                "variation": index,
+                                "section_index": section_index,
+                                "voiceover_section": voiceover_section_adapter.dump_python(
+                                    voiceover_section_adapter.validate_python(section)
+                                )
+                            })
+                            section_index += 1
+                if not section_index:
+                    raise ValueError("No voiceover sections found in model output")
+                await queue.put({"type": "variation_done", "variation": index, "sections": section_index})
+            except Exception as e:
+                await queue.put({"type": "variation_error", "variation": index, "detail": str(e)})
+
+        tasks = [asyncio.create_task(keywords_producer())]
+        tasks += [asyncio.create_task(variation_producer(i)) for i in range(variations_no)]
+        try:
+            completed = 0
+            pending = len(tasks)
+            while pending:
+                event = await queue.get()
+                if event["type"] in ("keywords", "keywords_error", "variation_error"):
+                    pending -= 1
+                elif event["type"] == "variation_done":
+                    pending -= 1
+                    completed += 1
+                yield event
+            yield {"type": "done", "variations": completed}
+        finally:
+            for task in tasks:
+                task.cancel()
+            # Let cancelled producers close their upstream streams
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    @staticmethod
+    def _video_script_fields(
+        product_name: str,
+        product_description: str,
+        duration: str,
+        target_audience: str,
+        language: str,
+        brand_name: str,
+        tone: str,
+        ad_type: str
+    ) -> Dict[str, str]:
+        """
+        Request fields for the video_script and video_keywords templates
+        """
+        return {
+            "product_name": product_name,
+            "product_description": product_description,
+            "duration": duration,
+            "target_audience": target_audience,
+            "language": language,
+            "brand_name": brand_name,
+            "tone": tone,
+            "ad_type": ad_type,
+        }
+
+    @staticmethod
+    def _variation_messages(messages: List[Dict[str, str]], index: int, variations_no: int) -> List[Dict[str, str]]:
+        # Add variation number to the end of the prompt for diversity; the
+        # shared prefix stays identical across variations
+        *head, last = messages
+        suffix = f"\n\nThis is variation {index+1} of {variations_no}. Please ensure this variation is unique and different from other variations."
+        return [*head, {**last, "content": last["content"] + suffix}]
+
+    @staticmethod
+    def _variation_temperature(index: int) -> float:
+        # Increase temperature for each variation
+        return 0.7 + (index * 0.1)
+
+    @staticmethod
+    def _parse_script(content: str) -> List[Dict[str, Any]]:
+        """
+        Validate a script reply into voiceover sections; clean JSON is parsed
+        and validated in one step, anything else goes through extract_json
+        """
+        try:
+            script = video_script_adapter.validate_json(content)
+        except ValidationError:
+            script = video_script_adapter.validate_python(extract_json(content))
+        return video_script_adapter.dump_python(script)["voiceover_sections"]
+
+    @staticmethod
+    def _parse_keywords(content: str) -> List[str]:
+        # A bare array, or {"keywords": [...]} from templates using JSON mode
+        keywords = extract_json(content)
+        if isinstance(keywords, dict):
+            keywords = keywords.get("keywords")
+        return keywords_adapter.validate_python(keywords)
 
 openai_service = OpenAIService() 
\ No newline at end of file
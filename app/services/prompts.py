@@ -0,0 +1,276 @@
+from string import Formatter
+from typing import Any, Dict, List, Optional, Tuple
+from app.core.config import settings
+from app.core.tokens import count_tokens
+
+class PromptTemplate:
+    """
+    A versioned chat prompt: a static system message followed by a user
+    message rendered from request fields. Templates whose reply is a JSON
+    object request the provider's JSON mode.
+
+    Keeping everything that does not vary per request in the system message
+    gives every request the same prefix, which the provider can cache.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        version: str,
+        user: str,
+        system: Optional[str] = None,
+        json_object: bool = False
+    ):
+        self.name = name
+        self.version = version
+        self.json_object = json_object
+        self.system = system.strip() if system else None
+        self.user = user.strip()
+        self.fields = frozenset(field for _, field, _, _ in Formatter().parse(self.user) if field)
+        self.prefix_tokens: Optional[int] = None
+
+    @property
+    def id(self) -> str:
+        return f"{self.name}@{self.version}"
+
+    def compile(self) -> None:
+        # Validates the template and counts the shared prefix once
+        self.user.format(**dict.fromkeys(self.fields, ""))
+        self.prefix_tokens = count_tokens(self.system) if self.system else 0
+
+    def request_options(self) -> Dict[str, Any]:
+        """
+        Extra chat.completions arguments for requests using this template
+        """
+        return {"response_format": {"type": "json_object"}} if self.json_object else {}
+
+    def messages(self, **fields: str) -> List[Dict[str, str]]:
+        messages = [{"role": "system", "content": self.system}] if self.system else []
+        messages.append({"role": "user", "content": self.user.format(**fields)})
+        return messages
+
+class PromptRegistry:
+    def __init__(self, templates: List[PromptTemplate]):
+        self._templates: Dict[Tuple[str, str], PromptTemplate] = {
+            (template.name, template.version): template for template in templates
+        }
+
+    def get(self, name: str) -> PromptTemplate:
+        """
+        The version pinned in OPENAI_PROMPT_VERSIONS, else the latest
+        """
+        version = settings.OPENAI_PROMPT_VERSIONS.get(name)
+        if version is None:
+            version = max((v for n, v in self._templates if n == name), key=int)
+        return self._templates[(name, version)]
+
+    def compile(self) -> Dict[str, int]:
+        """
+        Compile every template (called at startup); returns prefix token counts
+        """
+        for template in self._templates.values():
+            template.compile()
+        return {template.id: template.prefix_tokens for template in self._templates.values()}
+
+# Version 1: the original single-message layout, product fields first
+VIDEO_SCRIPT_V1 = PromptTemplate("video_script", "1", user="""
+You're a professional video scriptwriter specializing in product marketing.
+
+Generate a complete video script in JSON format for a {duration} {ad_type} promotional video about {product_name}.
+Product Description: {product_description}
+Target Audience: {target_audience}
+Language: {language}
+Brand Name: {brand_name}
+Tone: {tone}
+Ad Type: {ad_type}
+
+The script should be organized into voiceover sections, where each section can have multiple scenes.
+Each voiceover section should include:
+- voiceover (the narration text)
+- scenes (array of scenes that play during this voiceover)
+
+Each scene should include:
+- scene_number (sequential number across all scenes)
+- visual (visual description of the scene)
+- caption (on-screen text in {language})
+- music_sfx (background music or sound effects)
+- search_queries (array of 3-5 specific search queries for finding stock footage for this scene)
+
+Guidelines for scenes:
+1. Each voiceover section can have 1-3 scenes
+2. Scenes should flow naturally with the voiceover
+3. Use visual transitions between scenes
+4. Consider timing and pacing
+5. Ensure scenes support the voiceover message
+
+Guidelines for search_queries:
+1. Each query should be specific to the scene's visual needs
+2. Include both broad and specific terms
+3. Consider camera angles and movements
+4. Include relevant props or elements
+5. Consider lighting and atmosphere
+6. Use terms commonly found in stock footage websites
+
+Example structure:
+{{
+    "voiceover_sections": [
+        {{
+            "voiceover": "Welcome to the future of home living",
+            "scenes": [
+                {{
+                    "scene_number": 1,
+                    "visual": "Wide shot of modern home exterior",
+                    "caption": "SmartHome Hub",
+                    "music_sfx": "Modern, tech-inspired background music",
+                    "search_queries": ["modern home exterior", "contemporary architecture", "smart home"]
+                }},
+                {{
+                    "scene_number": 2,
+                    "visual": "Close-up of smart door lock",
+                    "caption": "Secure & Connected",
+                    "music_sfx": "Continuing background music",
+                    "search_queries": ["smart door lock", "security technology", "home automation"]
+                }}
+            ]
+        }}
+    ]
+}}
+
+Return the result as a valid JSON object with voiceover_sections array.
+Ensure the output is directly parseable JSON.
+""")
+
+# Version 2: instructions, schema and example as a static system prefix;
+# only the product fields vary
+VIDEO_SCRIPT_V2 = PromptTemplate("video_script", "2", system="""
+You're a professional video scriptwriter specializing in product marketing.
+
+You write complete video scripts in JSON format for promotional videos. The
+product, duration, ad type, language and tone are given in the user message.
+
+The script should be organized into voiceover sections, where each section can have multiple scenes.
+Each voiceover section should include:
+- voiceover (the narration text)
+- scenes (array of scenes that play during this voiceover)
+
+Each scene should include:
+- scene_number (sequential number across all scenes)
+- visual (visual description of the scene)
+- caption (on-screen text in the requested language)
+- music_sfx (background music or sound effects)
+- search_queries (array of 3-5 specific search queries for finding stock footage for this scene)
+
+Guidelines for scenes:
+1. Each voiceover section can have 1-3 scenes
+2. Scenes should flow naturally with the voiceover
+3. Use visual transitions between scenes
+4. Consider timing and pacing
+5. Ensure scenes support the voiceover message
+
+Guidelines for search_queries:
+1. Each query should be specific to the scene's visual needs
+2. Include both broad and specific terms
+3. Consider camera angles and movements
+4. Include relevant props or elements
+5. Consider lighting and atmosphere
+6. Use terms commonly found in stock footage websites
+
+Example structure:
+{
+    "voiceover_sections": [
+        {
+            "voiceover": "Welcome to the future of home living",
+            "scenes": [
+                {
+                    "scene_number": 1,
+                    "visual": "Wide shot of modern home exterior",
+                    "caption": "SmartHome Hub",
+                    "music_sfx": "Modern, tech-inspired background music",
+                    "search_queries": ["modern home exterior", "contemporary architecture", "smart home"]
+                },
+                {
+                    "scene_number": 2,
+                    "visual": "Close-up of smart door lock",
+                    "caption": "Secure & Connected",
+                    "music_sfx": "Continuing background music",
+                    "search_queries": ["smart door lock", "security technology", "home automation"]
+                }
+            ]
+        }
+    ]
+}
+
+Return the result as a valid JSON object with voiceover_sections array.
+Ensure the output is directly parseable JSON.
+""", user="""
+Generate a complete video script for a {duration} {ad_type} promotional video about {product_name}.
+Product Description: {product_description}
+Target Audience: {target_audience}
+Language: {language}
+Brand Name: {brand_name}
+Tone: {tone}
+Ad Type: {ad_type}
+""")
+
+VIDEO_KEYWORDS_V1 = PromptTemplate("video_keywords", "1", user="""
+Based on the following product information, generate at least 4 relevant keywords for stock footage selection:
+
+Product: {product_name}
+Description: {product_description}
+Target Audience: {target_audience}
+Tone: {tone}
+
+The keywords should be:
+1. Specific and relevant to the product
+2. Useful for finding stock footage
+3. Include both product-specific and emotional/atmospheric terms
+4. Be in {language}
+
+Return the keywords as a JSON array of strings.
+""")
+
+VIDEO_KEYWORDS_V2 = PromptTemplate("video_keywords", "2", system="""
+Based on the product information in the user message, generate at least 4 relevant keywords for stock footage selection.
+
+The keywords should be:
+1. Specific and relevant to the product
+2. Useful for finding stock footage
+3. Include both product-specific and emotional/atmospheric terms
+4. Be in the language given with the product information
+
+Return the keywords as a JSON array of strings.
+""", user="""
+Product: {product_name}
+Description: {product_description}
+Target Audience: {target_audience}
+Tone: {tone}
+Language: {language}
+""")
+
+# Version 3: version 2 with the provider's JSON mode
+VIDEO_SCRIPT_V3 = PromptTemplate(
+    "video_script", "3", system=VIDEO_SCRIPT_V2.system, user=VIDEO_SCRIPT_V2.user, json_object=True
+)
+
+# Version 3: an object instead of a bare array, so JSON mode can be used
+VIDEO_KEYWORDS_V3 = PromptTemplate("video_keywords", "3", system="""
+Based on the product information in the user message, generate at least 4 relevant keywords for stock footage selection.
+
+The keywords should be:
+1. Specific and relevant to the product
+2. Useful for finding stock footage
+3. Include both product-specific and emotional/atmospheric terms
+4. Be in the language given with the product information
+
+Return a JSON object with a "keywords" field holding the keywords as strings.
+""", json_object=True, user="""
+Product: {product_name}
+Description: {product_description}
+Target Audience: {target_audience}
+Tone: {tone}
+Language: {language}
+""")
+
+prompts = PromptRegistry([
+    VIDEO_SCRIPT_V1, VIDEO_SCRIPT_V2, VIDEO_SCRIPT_V3, VIDEO_KEYWORDS_V1, VIDEO_KEYWORDS_V2, VIDEO_KEYWORDS_V3
+])
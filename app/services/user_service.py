@@ -1,50 +1,142 @@
-from typing import Optional
-from sqlalchemy.orm import Session
-from app.core.security import get_password_hash, verify_password
+from typing import Dict, List, Optional, Union
+from sqlalchemy import insert, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.auth_cache import auth_cache
+from app.core.security import get_password_hash_async, get_password_hashes_bulk, verify_and_update_password
 from app.models.user import User
 from app.schemas.user import UserCreate, UserUpdate
 
 class UserService:
-    def get(self, db: Session, id: int) -> Optional[User]:
-        return db.query(User).filter(User.id == id).first()
+    async def get(self, db: AsyncSession, id: int) -> Optional[User]:
+        return await db.get(User, id)
 
-    def get_by_email(self, db: Session, email: str) -> Optional[User]:
-        return db.query(User).filter(User.email == email).first()
+    async def get_by_email(self, db: AsyncSession, email: str) -> Optional[User]:
+        result = await db.execute(select(User).where(User.email == email))
+        return result.scalars().first()
 
-    def authenticate(self, db: Session, *, email: str, password: str) -> Optional[User]:
-        user = self.get_by_email(db, email=email)
+    async def list(
+        self, db: AsyncSession, *, after_id: Optional[int] = None, limit: int = 100
+    ) -> List[User]:
+        """
+        One page of users ordered by id, starting after `after_id` (keyset
+        pagination, so every page costs the same regardless of depth)
+        """
+        query = select(User).order_by(User.id).limit(limit)
+        if after_id is not None:
+            query = query.where(User.id > after_id)
+        result = await db.execute(query)
+        return list(result.scalars().all())
+
+    async def authenticate(self, db: AsyncSession, *, email: str, password: str) -> Optional[User]:
+        user = await self.get_by_email(db, email=email)
         if not user:
             return None
-        if not verify_password(password, user.hashed_password):
+        # Don't hold a pooled connection while the hash is checked
+        await db.commit()
+        verified, new_hash = await verify_and_update_password(password, user.hashed_password)
+        if not verified:
             return None
+        if new_hash:
+            # Transparently upgrade hashes made with an outdated bcrypt cost
+            user.hashed_password = new_hash
+            await db.commit()
+            auth_cache.invalidate_user(user.id)
         return user
 
-    def create(self, db: Session, *, obj_in: UserCreate) -> User:
+    async def create(self, db: AsyncSession, *, obj_in: UserCreate) -> User:
         db_obj = User(
             email=obj_in.email,
             username=obj_in.username,
-            hashed_password=get_password_hash(obj_in.password),
+            hashed_password=await get_password_hash_async(obj_in.password),
             is_active=True,
             is_superuser=False,
         )
         db.add(db_obj)
-        db.commit()
-        db.refresh(db_obj)
+        await db.commit()
+        await db.refresh(db_obj)
         return db_obj
 
-    def update(
-        self, db: Session, *, db_obj: User, obj_in: UserUpdate
+    async def update(
+        self, db: AsyncSession, *, db_obj: User, obj_in: UserUpdate
     ) -> User:
         update_data = obj_in.dict(exclude_unset=True)
         if update_data.get("password"):
-            hashed_password = get_password_hash(update_data["password"])
+            hashed_password = await get_password_hash_async(update_data["password"])
             del update_data["password"]
             update_data["hashed_password"] = hashed_password
         for field in update_data:
             setattr(db_obj, field, update_data[field])
         db.add(db_obj)
-        db.commit()
-        db.refresh(db_obj)
+        await db.commit()
+        await db.refresh(db_obj)
+        auth_cache.invalidate_user(db_obj.id)
         return db_obj
 
-user_service = UserService() 
\ No newline at end of file
+    async def delete(self, db: AsyncSession, *, db_obj: User) -> None:
+        await db.delete(db_obj)
+        await db.commit()
+        auth_cache.invalidate_user(db_obj.id)
+
+    async def find_conflicts(
+        self, db: AsyncSession, objs_in: List[Union[UserCreate, UserUpdate]], *, exclude_id: Optional[int] = None
+    ) -> List[str]:
+        """
+        Emails and usernames that appear twice in `objs_in` or already belong
+        to a user other than `exclude_id`
+        """
+        conflicts = []
+        seen = set()
+        for obj_in in objs_in:
+            for value in (obj_in.email, obj_in.username):
+                if value in seen:
+                    conflicts.append(value)
+                seen.add(value)
+        emails = [obj_in.email for obj_in in objs_in]
+        usernames = [obj_in.username for obj_in in objs_in]
+        for i in range(0, len(objs_in), 500):
+            query = select(User.email, User.username).where(
+                or_(User.email.in_(emails[i:i + 500]), User.username.in_(usernames[i:i + 500]))
+            )
+            if exclude_id is not None:
+                query = query.where(User.id != exclude_id)
+            result = await db.execute(query)
+            for email, username in result:
+                conflicts.extend(value for value in (email, username) if value in seen)
+        await db.commit()
+        return sorted(set(conflicts))
+
+    async def bulk_create(
+        self, db: AsyncSession, *, objs_in: List[UserCreate], batch_size: int = 500
+    ) -> List[int]:
+        """
+        Create many users: passwords are hashed in parallel on the bulk
+        hashing pool, then rows are inserted `batch_size` at a time in a
+        single transaction, so either every user is created or none is.
+        Returns the new ids in input order.
+        """
+        hashes = await get_password_hashes_bulk([obj_in.password for obj_in in objs_in])
+        rows: List[Dict] = [
+            {
+                "email": obj_in.email,
+                "username": obj_in.username,
+                "hashed_password": hashed_password,
+                "is_active": True,
+                "is_superuser": False,
+            }
+            for obj_in, hashed_password in zip(objs_in, hashes)
+        ]
+        ids = []
+        try:
+            for i in range(0, len(rows), batch_size):
+                result = await db.execute(
+                    insert(User).returning(User.id, sort_by_parameter_order=True),
+                    rows[i:i + batch_size]
+                )
+                ids.extend(result.scalars().all())
+            await db.commit()
+        except BaseException:
+            await db.rollback()
+            raise
+        return ids
+
+user_service = UserService()
@@ -0,0 +1,375 @@
+from typing import Any, Dict, List, Optional, Tuple
+import asyncio
+import json
+import os
+import re
+import sqlite3
+import threading
+import numpy as np
+from app.core.config import settings
+
+COLLECTION_NAME = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+class VectorIndex:
+    """
+    One collection of unit-normalized float32 vectors.
+
+    Vectors live in a memory-mapped matrix file, so search never materializes
+    them as Python objects; ids and metadata live in a SQLite table keyed by
+    matrix row. Exact search is a blocked matrix product with a running top-k.
+    The optional approximate (IVF) mode clusters rows around k-means centroids
+    and only scans the `nprobe` closest clusters, plus rows added since the
+    clustering was built.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(
+            os.path.join(directory, "ids.db"), timeout=5.0, check_same_thread=False
+        )
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS items "
+            "(row INTEGER PRIMARY KEY, id TEXT UNIQUE NOT NULL, metadata TEXT)"
+        )
+        self._db.commit()
+
+        self.dim: Optional[int] = None
+        self.count = 0
+        self.capacity = 0
+        self.ivf: Optional[Dict[str, Any]] = None
+        self._matrix: Optional[np.memmap] = None
+        self._centroids: Optional[np.ndarray] = None
+        self._ivf_order: Optional[np.ndarray] = None
+        self._ivf_offsets: Optional[np.ndarray] = None
+
+        meta_path = self._path("meta.json")
+        if os.path.exists(meta_path):
+            with open(meta_path) as f:
+                meta = json.load(f)
+            self.dim = meta["dim"]
+            self.count = meta["count"]
+            self.capacity = meta["capacity"]
+            self.ivf = meta.get("ivf")
+            self._matrix = np.memmap(
+                self._path("vectors.f32"), dtype=np.float32, mode="r+",
+                shape=(self.capacity, self.dim)
+            )
+            if self.ivf:
+                self._centroids = np.load(self._path("ivf_centroids.npy"))
+                self._ivf_order = np.load(self._path("ivf_order.npy"), mmap_mode="r")
+                self._ivf_offsets = np.load(self._path("ivf_offsets.npy"))
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def _save_meta(self) -> None:
+        tmp_path = self._path("meta.json.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump({
+                "dim": self.dim,
+                "count": self.count,
+                "capacity": self.capacity,
+                "ivf": self.ivf,
+            }, f)
+        os.replace(tmp_path, self._path("meta.json"))
+
+    def _reserve(self, rows: int) -> None:
+        if rows <= self.capacity:
+            return
+        capacity = max(rows, self.capacity * 2, 1024)
+        if self._matrix is not None:
+            self._matrix.flush()
+        with open(self._path("vectors.f32"), "ab") as f:
+            f.truncate(capacity * self.dim * 4)
+        # Searches holding the previous mapping keep working: the file only grows
+        self._matrix = np.memmap(
+            self._path("vectors.f32"), dtype=np.float32, mode="r+",
+            shape=(capacity, self.dim)
+        )
+        self.capacity = capacity
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    def upsert(
+        self,
+        ids: List[str],
+        vectors: np.ndarray,
+        metadata: Optional[List[Optional[Dict[str, Any]]]] = None
+    ) -> int:
+        """
+        Insert or replace vectors by id. Returns the number of new rows.
+        """
+        if len(vectors) != len(ids):
+            raise ValueError("Expected one vector per id")
+        if len({len(vector) for vector in vectors}) > 1:
+            raise ValueError("All vectors must have the same dimension")
+        vectors = self._normalize(np.asarray(vectors, dtype=np.float32).reshape(len(ids), -1))
+        metadata = metadata or [None] * len(ids)
+        with self._lock:
+            if self.dim is None:
+                self.dim = vectors.shape[1]
+            elif vectors.shape[1] != self.dim:
+                raise ValueError(f"Expected vectors of dimension {self.dim}, got {vectors.shape[1]}")
+
+            # The last occurrence of a repeated id wins
+            latest = {id_: i for i, id_ in enumerate(ids)}
+            existing = self._rows_for_ids(list(latest))
+            rows = {}
+            next_row = self.count
+            for id_ in latest:
+                if id_ in existing:
+                    rows[id_] = existing[id_]
+                else:
+                    rows[id_] = next_row
+                    next_row += 1
+
+            self._reserve(next_row)
+            order = list(latest)
+            row_index = np.fromiter((rows[id_] for id_ in order), dtype=np.int64, count=len(order))
+            self._matrix[row_index] = vectors[[latest[id_] for id_ in order]]
+            self._matrix.flush()
+
+            self._db.executemany(
+                "INSERT OR REPLACE INTO items (row, id, metadata) VALUES (?, ?, ?)",
+                [
+                    (rows[id_], id_, json.dumps(metadata[latest[id_]]) if metadata[latest[id_]] is not None else None)
+                    for id_ in order
+                ],
+            )
+            self._db.commit()
+            added = next_row - self.count
+            self.count = next_row
+            self._save_meta()
+            return added
+
+    def _rows_for_ids(self, ids: List[str]) -> Dict[str, int]:
+        found = {}
+        for i in range(0, len(ids), 500):
+            chunk = ids[i:i + 500]
+            for row, id_ in self._db.execute(
+                f"SELECT row, id FROM items WHERE id IN ({','.join('?' * len(chunk))})", chunk
+            ):
+                found[id_] = row
+        return found
+
+    def _items_for_rows(self, rows: List[int]) -> Dict[int, Tuple[str, Any]]:
+        found = {}
+        for i in range(0, len(rows), 500):
+            chunk = rows[i:i + 500]
+            for row, id_, metadata in self._db.execute(
+                f"SELECT row, id, metadata FROM items WHERE row IN ({','.join('?' * len(chunk))})", chunk
+            ):
+                found[row] = (id_, json.loads(metadata) if metadata else None)
+        return found
+
+    @staticmethod
+    def _merge_topk(
+        best_scores: np.ndarray,
+        best_rows: np.ndarray,
+        scores: np.ndarray,
+        rows: np.ndarray,
+        k: int
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        scores = np.concatenate([best_scores, scores], axis=1)
+        rows = np.concatenate([best_rows, np.broadcast_to(rows, (scores.shape[0], rows.shape[-1]))], axis=1)
+        if scores.shape[1] > k:
+            part = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+            scores = np.take_along_axis(scores, part, axis=1)
+            rows = np.take_along_axis(rows, part, axis=1)
+        return scores, rows
+
+    def search(
+        self,
+        queries: np.ndarray,
+        top_k: int = 10,
+        approximate: bool = False,
+        nprobe: Optional[int] = None
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Top-k cosine similarity search for a batch of query vectors
+        """
+        if top_k < 1:
+            raise ValueError("top_k must be at least 1")
+        with self._lock:
+            matrix, count, dim = self._matrix, self.count, self.dim
+            centroids, order, offsets = self._centroids, self._ivf_order, self._ivf_offsets
+            indexed = self.ivf["indexed_count"] if self.ivf else 0
+        if not count:
+            return [[] for _ in range(len(queries))]
+        for query in queries:
+            if len(query) != dim:
+                raise ValueError(f"Expected query vectors of dimension {dim}, got {len(query)}")
+
+        queries = self._normalize(np.asarray(queries, dtype=np.float32).reshape(-1, dim))
+        k = min(top_k, count)
+        if approximate and centroids is not None:
+            best_scores, best_rows = self._search_ivf(
+                queries, k, matrix, count, centroids, order, offsets, indexed,
+                nprobe or settings.VECTOR_INDEX_NPROBE
+            )
+        else:
+            best_scores, best_rows = self._search_exact(queries, k, matrix, 0, count)
+
+        ranking = np.argsort(-best_scores, axis=1)
+        best_scores = np.take_along_axis(best_scores, ranking, axis=1)
+        best_rows = np.take_along_axis(best_rows, ranking, axis=1)
+        with self._lock:
+            items = self._items_for_rows(sorted({int(r) for r in best_rows.ravel() if r >= 0}))
+
+        results = []
+        for scores, rows in zip(best_scores, best_rows):
+            hits = []
+            for score, row in zip(scores, rows):
+                if row < 0 or int(row) not in items:
+                    continue
+                id_, metadata = items[int(row)]
+                hits.append({"id": id_, "score": float(score), "metadata": metadata})
+            results.append(hits)
+        return results
+
+    def _search_exact(
+        self,
+        queries: np.ndarray,
+        k: int,
+        matrix: np.ndarray,
+        start: int,
+        stop: int
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        best_scores = np.full((len(queries), 0), -np.inf, dtype=np.float32)
+        best_rows = np.full((len(queries), 0), -1, dtype=np.int64)
+        # Blocks of roughly 64 MB keep the working set bounded
+        block = max(1024, (1 << 24) // matrix.shape[1])
+        for offset in range(start, stop, block):
+            end = min(offset + block, stop)
+            scores = queries @ matrix[offset:end].T
+            best_scores, best_rows = self._merge_topk(
+                best_scores, best_rows, scores, np.arange(offset, end)[None, :], k
+            )
+        return best_scores, best_rows
+
+    def _search_ivf(
+        self,
+        queries: np.ndarray,
+        k: int,
+        matrix: np.ndarray,
+        count: int,
+        centroids: np.ndarray,
+        order: np.ndarray,
+        offsets: np.ndarray,
+        indexed: int,
+        nprobe: int
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        nprobe = min(nprobe, len(centroids))
+        probes = np.argpartition(-(queries @ centroids.T), nprobe - 1, axis=1)[:, :nprobe]
+        all_scores, all_rows = [], []
+        for query, lists in zip(queries, probes):
+            candidates = np.concatenate(
+                [order[offsets[c]:offsets[c + 1]] for c in lists] + [np.arange(indexed, count)]
+            )
+            candidates.sort()
+            best_scores = np.full((1, 0), -np.inf, dtype=np.float32)
+            best_rows = np.full((1, 0), -1, dtype=np.int64)
+            if len(candidates):
+                scores = (matrix[candidates] @ query)[None, :]
+                best_scores, best_rows = self._merge_topk(
+                    best_scores, best_rows, scores, candidates[None, :], k
+                )
+            # Pad so every query has exactly k slots
+            pad = k - best_scores.shape[1]
+            all_scores.append(np.pad(best_scores[0], (0, pad), constant_values=-np.inf))
+            all_rows.append(np.pad(best_rows[0], (0, pad), constant_values=-1))
+        return np.stack(all_scores), np.stack(all_rows)
+
+    def build_ivf(self, nlist: Optional[int] = None, iterations: int = 10, seed: int = 0) -> Dict[str, Any]:
+        """
+        Cluster the current rows for approximate search (spherical k-means)
+        """
+        with self._lock:
+            matrix, count = self._matrix, self.count
+        if not count:
+            raise ValueError("Collection is empty")
+        nlist = min(nlist or max(1, int(np.sqrt(count))), count)
+        rng = np.random.default_rng(seed)
+        sample_rows = np.sort(rng.choice(count, size=min(count, nlist * 64), replace=False))
+        sample = np.asarray(matrix[sample_rows])
+        centroids = sample[rng.choice(len(sample), size=nlist, replace=False)].copy()
+        for _ in range(iterations):
+            assignment = np.argmax(sample @ centroids.T, axis=1)
+            for c in range(nlist):
+                members = sample[assignment == c]
+                if len(members):
+                    centroids[c] = members.sum(axis=0)
+            centroids = self._normalize(centroids)
+
+        assignment = np.empty(count, dtype=np.int32)
+        block = max(1024, (1 << 24) // matrix.shape[1])
+        for offset in range(0, count, block):
+            end = min(offset + block, count)
+            assignment[offset:end] = np.argmax(matrix[offset:end] @ centroids.T, axis=1)
+        order = np.argsort(assignment, kind="stable").astype(np.int64)
+        offsets = np.concatenate([[0], np.cumsum(np.bincount(assignment, minlength=nlist))]).astype(np.int64)
+
+        with self._lock:
+            np.save(self._path("ivf_centroids.npy"), centroids)
+            np.save(self._path("ivf_order.npy"), order)
+            np.save(self._path("ivf_offsets.npy"), offsets)
+            self._centroids = centroids
+            self._ivf_order = order
+            self._ivf_offsets = offsets
+            self.ivf = {"nlist": nlist, "indexed_count": count}
+            self._save_meta()
+            return dict(self.ivf)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"dim": self.dim, "count": self.count, "capacity": self.capacity, "ivf": self.ivf}
+
+class VectorIndexService:
+    """
+    Named vector collections under VECTOR_INDEX_DIR. Index work is CPU bound
+    and runs in worker threads so it doesn't block the event loop.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._collections: Dict[str, VectorIndex] = {}
+        self._lock = threading.Lock()
+
+    def collection(self, name: str) -> VectorIndex:
+        if not COLLECTION_NAME.match(name):
+            raise ValueError("Collection names may only contain letters, digits, '_' and '-'")
+        with self._lock:
+            index = self._collections.get(name)
+            if index is None:
+                index = self._collections[name] = VectorIndex(os.path.join(self.directory, name))
+            return index
+
+    async def upsert(
+        self,
+        name: str,
+        ids: List[str],
+        vectors: Any,
+        metadata: Optional[List[Optional[Dict[str, Any]]]] = None
+    ) -> int:
+        return await asyncio.to_thread(self.collection(name).upsert, ids, vectors, metadata)
+
+    async def search(
+        self,
+        name: str,
+        queries: Any,
+        top_k: int = 10,
+        approximate: bool = False,
+        nprobe: Optional[int] = None
+    ) -> List[List[Dict[str, Any]]]:
+        return await asyncio.to_thread(self.collection(name).search, queries, top_k, approximate, nprobe)
+
+    async def build_ivf(self, name: str, nlist: Optional[int] = None) -> Dict[str, Any]:
+        return await asyncio.to_thread(self.collection(name).build_ivf, nlist)
+
+vector_index_service = VectorIndexService(settings.VECTOR_INDEX_DIR)
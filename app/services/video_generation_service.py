@@ -1,57 +1,191 @@
-from typing import Dict, Any, List
-import httpx
+from typing import Dict, Any, List, Optional, Callable, Awaitable
+import asyncio
+from app.core.cache import TieredCache
 from app.core.config import settings
+from app.core.http import PooledClient
+from app.core.metrics import track_upstream
+from app.core.resilience import UpstreamUnavailableError, provider_resilience
+from app.core.singleflight import SingleFlight
+from app.core.tracing import span
+from app.services.audio_store import AudioStore
 import json
 
+# Placeholder assets used when a provider is not configured or is down
+DEMO_FOOTAGE_URL = "https://d25u9hypq51glx.cloudfront.net/arole/3cb7e03d-a95c-4102-86b8-20c5bc8630ed/video/d0b41e2b-76a0-4be6-8bfa-1115b3707f9f/video.mp4"
+DEMO_VOICEOVER_URL = "https://d25u9hypq51glx.cloudfront.net/audio_projects/whisper/3cb7e03d-a95c-4102-86b8-20c5bc8630ed/848380575464/audio.mp3"
+
 class VideoGenerationService:
     def __init__(self):
         self.getty_api_key = settings.GETTY_API_KEY
         self.eleven_labs_api_key = settings.ELEVEN_LABS_API_KEY
         self.getty_base_url = "https://api.gettyimages.com/v3/search/images"
         self.eleven_labs_base_url = "https://api.elevenlabs.io/v1/text-to-speech"
+        self.getty_client = PooledClient("getty")
+        self.eleven_labs_client = PooledClient("eleven_labs")
+        self.audio_store = AudioStore(
+            settings.AUDIO_STORE_DIR,
+            url_prefix=settings.AUDIO_URL_PREFIX,
+            chunk_size=settings.AUDIO_STREAM_CHUNK_SIZE
+        )
+        self.query_hedge_delay = settings.GETTY_QUERY_HEDGE_DELAY
+        self.search_page_size = max(1, settings.GETTY_SEARCH_PAGE_SIZE)
+        self.footage_cache = TieredCache(
+            maxsize=settings.GETTY_CACHE_MAX_ENTRIES,
+            ttl=settings.GETTY_CACHE_TTL,
+            negative_ttl=settings.GETTY_CACHE_NEGATIVE_TTL,
+            sqlite_path=settings.GETTY_CACHE_SQLITE_PATH,
+            table="getty_search"
+        ) if settings.GETTY_CACHE_ENABLED else None
+        # Per-provider caps shared by every request in this process
+        self._getty_semaphore = asyncio.Semaphore(settings.GETTY_MAX_CONCURRENCY)
+        self._eleven_labs_semaphore = asyncio.Semaphore(settings.ELEVEN_LABS_MAX_CONCURRENCY)
+        self.getty_resilience = provider_resilience("getty")
+        self.eleven_labs_resilience = provider_resilience("eleven_labs")
+        # Identical searches and narrations in flight share one upstream call
+        self.footage_flight = SingleFlight()
+        self.voiceover_flight = SingleFlight()
+
+    async def startup(self) -> None:
+        """
+        Open the pooled upstream clients (called from the app lifespan)
+        """
+        await self.getty_client.open()
+        await self.eleven_labs_client.open()
+
+    async def shutdown(self) -> None:
+        """
+        Close the pooled upstream clients and their keep-alive connections
+        """
+        await self.getty_client.aclose()
+        await self.eleven_labs_client.aclose()
+        if self.footage_cache is not None:
+            self.footage_cache.close()
+
+    def pool_stats(self) -> Dict[str, Any]:
+        return {
+            "getty": self.getty_client.stats(),
+            "eleven_labs": self.eleven_labs_client.stats()
+        }
+
+    def resilience_stats(self) -> Dict[str, Any]:
+        return {
+            "getty": self.getty_resilience.stats(),
+            "eleven_labs": self.eleven_labs_resilience.stats()
+        }
 
-    async def get_stock_footage(self, query: str) -> Dict[str, Any]:
+    def coalescing_stats(self) -> Dict[str, Any]:
+        return {
+            "getty": self.footage_flight.stats(),
+            "eleven_labs": self.voiceover_flight.stats()
+        }
+
+    def footage_cache_stats(self) -> Dict[str, Any]:
+        if self.footage_cache is None:
+            return {"enabled": False}
+        return {"enabled": True, **self.footage_cache.stats()}
+
+    async def get_stock_footage(self, query: str) -> Optional[Dict[str, Any]]:
         """
         Search for stock footage using Getty Images API
         """
+        results = await self.search_stock_footage(query)
+        return results[0] if results else None
+
+    async def search_stock_footage(self, query: str) -> List[Dict[str, Any]]:
+        """
+        Return up to GETTY_SEARCH_PAGE_SIZE results for a query, best match first
+        """
         if not self.getty_api_key:
-            return {
-                "id": "demo",
-                "title": "Demo Footage",
-                "preview_url": "https://d25u9hypq51glx.cloudfront.net/arole/3cb7e03d-a95c-4102-86b8-20c5bc8630ed/video/d0b41e2b-76a0-4be6-8bfa-1115b3707f9f/video.mp4",
-                "download_url": "https://d25u9hypq51glx.cloudfront.net/arole/3cb7e03d-a95c-4102-86b8-20c5bc8630ed/video/d0b41e2b-76a0-4be6-8bfa-1115b3707f9f/video.mp4",
-                "note": "Getty Images API key not configured"
-            }
+            return [self._demo_footage("Getty Images API key not configured")]
 
-        headers = {
-            "Api-Key": self.getty_api_key,
-            "Accept": "application/json"
-        }
         params = {
             "phrase": query,
             "fields": "id,title,display_sizes,preview",
             "sort_order": "best_match",
-            "page_size": 1
+            "page_size": self.search_page_size
         }
+        # Normalize the phrase so trivially different spellings share an entry
+        key_params = {**params, "phrase": self._normalize_query(query)}
+        key = json.dumps(key_params, sort_keys=True)
+        try:
+            if self.footage_cache is None:
+                return await self.footage_flight.do(key, lambda: self._search_getty(params))
+            return await self.footage_flight.do(
+                key, lambda: self.footage_cache.get_or_load(key, lambda: self._search_getty(params))
+            )
+        except UpstreamUnavailableError:
+            # Raised outside the cache loader so the placeholder is never cached
+            return [self._demo_footage("Getty Images is temporarily unavailable")]
+
+    @staticmethod
+    def _normalize_query(query: str) -> str:
+        return " ".join(query.lower().split())
+
+    @classmethod
+    def _plan_searches(cls, scenes: List[Dict[str, Any]]) -> List[List[str]]:
+        """
+        Each scene's queries normalized and deduplicated, in priority order
+        """
+        return [
+            list(dict.fromkeys(cls._normalize_query(query) for query in scene["search_queries"] if query.strip()))
+            for scene in scenes
+        ]
+
+    def _script_search(self) -> Callable[[str], Awaitable[List[Dict[str, Any]]]]:
+        """
+        Search function shared by the scenes of one script: each unique query
+        is searched at most once and its results reused by every scene that
+        reaches it. A search every scene has stopped waiting for (a hedge
+        that lost) is cancelled.
+        """
+        flight = SingleFlight()
+        results: Dict[str, List[Dict[str, Any]]] = {}
+
+        async def search(query: str) -> List[Dict[str, Any]]:
+            if query not in results:
+                results[query] = await flight.do(query, lambda: self.search_stock_footage(query))
+            return results[query]
 
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
+        return search
+
+    @staticmethod
+    def _demo_footage(note: str) -> Dict[str, Any]:
+        return {
+            "id": "demo",
+            "title": "Demo Footage",
+            "preview_url": DEMO_FOOTAGE_URL,
+            "download_url": DEMO_FOOTAGE_URL,
+            "note": note
+        }
+
+    async def _search_getty(self, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        headers = {
+            "Api-Key": self.getty_api_key,
+            "Accept": "application/json"
+        }
+
+        async def search():
+            response = await self.getty_client.get(
                 self.getty_base_url,
                 headers=headers,
                 params=params
             )
             response.raise_for_status()
-            data = response.json()
-            
-            if data.get("images"):
-                image = data["images"][0]
-                return {
-                    "id": image["id"],
-                    "title": image["title"],
-                    "preview_url": image["display_sizes"][0]["uri"],
-                    "download_url": image["display_sizes"][-1]["uri"]
-                }
-            return None
+            return response
+
+        async with track_upstream("getty", "search"):
+            response = await self.getty_resilience.call(lambda: self._limited(self._getty_semaphore, search))
+        data = response.json()
+
+        return [
+            {
+                "id": image["id"],
+                "title": image["title"],
+                "preview_url": image["display_sizes"][0]["uri"],
+                "download_url": image["display_sizes"][-1]["uri"]
+            }
+            for image in data.get("images") or []
+        ]
 
     async def generate_voiceover(self, text: str, voice_id: str = "21m00Tcm4TlvDq8ikWAM") -> Dict[str, Any]:
         """
@@ -59,85 +193,235 @@ class VideoGenerationService:
         """
         if not self.eleven_labs_api_key:
             return {
-                "url": "https://d25u9hypq51glx.cloudfront.net/audio_projects/whisper/3cb7e03d-a95c-4102-86b8-20c5bc8630ed/848380575464/audio.mp3",
+                "url": DEMO_VOICEOVER_URL,
                 "text": text,
                 "note": "Eleven Labs API key not configured"
             }
 
+        model_id = "eleven_monolingual_v1"
+        voice_settings = {
+            "stability": 0.5,
+            "similarity_boost": 0.75
+        }
+        digest = self.audio_store.digest(text, voice_id, model_id, voice_settings)
+        result = {
+            "url": self.audio_store.url(digest),
+            "text": text
+        }
+
+        # Identical narration is served from the store without another TTS call,
+        # and concurrent requests for it wait on the one synthesis in flight
+        if self.audio_store.exists(digest):
+            return result
+        try:
+            await self.voiceover_flight.do(
+                digest, lambda: self._store_voiceover(text, voice_id, model_id, voice_settings, digest)
+            )
+        except UpstreamUnavailableError:
+            return {
+                "url": DEMO_VOICEOVER_URL,
+                "text": text,
+                "note": "Eleven Labs is temporarily unavailable"
+            }
+        return result
+
+    async def _store_voiceover(
+        self,
+        text: str,
+        voice_id: str,
+        model_id: str,
+        voice_settings: Dict[str, Any],
+        digest: str
+    ) -> None:
+        if self.audio_store.exists(digest):
+            return
+        # Each attempt restarts the download; write_stream only publishes
+        # the file once it is complete
+        async with track_upstream("eleven_labs", "tts"):
+            await self.eleven_labs_resilience.call(lambda: self._limited(
+                self._eleven_labs_semaphore, self._synthesize, text, voice_id, model_id, voice_settings, digest
+            ))
+
+    async def _synthesize(
+        self,
+        text: str,
+        voice_id: str,
+        model_id: str,
+        voice_settings: Dict[str, Any],
+        digest: str
+    ) -> None:
         headers = {
             "xi-api-key": self.eleven_labs_api_key,
             "Content-Type": "application/json"
         }
         data = {
             "text": text,
-            "model_id": "eleven_monolingual_v1",
-            "voice_settings": {
-                "stability": 0.5,
-                "similarity_boost": 0.75
-            }
+            "model_id": model_id,
+            "voice_settings": voice_settings
         }
 
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{self.eleven_labs_base_url}/{voice_id}",
-                headers=headers,
-                json=data
-            )
+        # Stream the audio to disk instead of buffering the whole file
+        # In a production environment, you'd want to save this to a cloud storage service
+        async with self.eleven_labs_client.stream(
+            "POST",
+            f"{self.eleven_labs_base_url}/{voice_id}",
+            headers=headers,
+            json=data
+        ) as response:
+            if response.is_error:
+                await response.aread()
             response.raise_for_status()
-            
-            # Save the audio file and return the URL
-            # In a production environment, you'd want to save this to a cloud storage service
-            audio_url = f"/audio/{voice_id}_{hash(text)}.mp3"
-            return {
-                "url": audio_url,
-                "text": text
-            }
+            await self.audio_store.write_stream(
+                digest, response.aiter_bytes(self.audio_store.chunk_size)
+            )
+
+    async def _limited(self, semaphore: asyncio.Semaphore, func, *args):
+        # Held only around the upstream call itself, not cache hits, shared
+        # in-flight results or retry backoff
+        async with semaphore:
+            return await func(*args)
+
+    async def find_scene_footage(self, queries: List[str]) -> Optional[Dict[str, Any]]:
+        """
+        Return the footage for the highest-priority query that has a match
+        """
+        candidates = await self._scene_candidates(queries, self.search_stock_footage)
+        return candidates[0] if candidates else None
+
+    async def _scene_candidates(
+        self,
+        queries: List[str],
+        search: Callable[[str], Awaitable[List[Dict[str, Any]]]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Return the results of the highest-priority query that has any.
 
-    async def generate_video_content(self, script: Dict[str, Any]) -> Dict[str, Any]:
+        Queries are searched in priority order; with GETTY_QUERY_HEDGE_DELAY
+        set, the next candidates are also started while the current one is
+        outstanding, but a lower-priority hit is only used once every query
+        ahead of it has come back empty.
+        """
+        tasks: List[asyncio.Task] = []
+
+        def launch() -> None:
+            query = queries[len(tasks)]
+            tasks.append(asyncio.create_task(search(query)))
+
+        try:
+            for i in range(len(queries)):
+                while len(tasks) <= i:
+                    launch()
+                # Hedge: while the current query is outstanding, keep starting
+                # the next candidates every hedge delay.
+                while not tasks[i].done() and len(tasks) < len(queries):
+                    await asyncio.wait({tasks[i]}, timeout=self.query_hedge_delay)
+                    if not tasks[i].done():
+                        launch()
+                results = await tasks[i]
+                if results:
+                    return results
+            return []
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+                elif not task.cancelled():
+                    # Mark errors of abandoned candidates as retrieved
+                    task.exception()
+
+    async def _scene_footage(
+        self,
+        scene: Dict[str, Any],
+        queries: List[str],
+        search: Callable[[str], Awaitable[List[Dict[str, Any]]]],
+        on_scene_done: Optional[Callable[[Dict[str, Any]], Awaitable[None]]]
+    ) -> List[Dict[str, Any]]:
+        with span("scene", queries=len(queries)):
+            candidates = await self._scene_candidates(queries, search)
+        if on_scene_done is not None:
+            await on_scene_done(scene)
+        return candidates
+
+    @staticmethod
+    def _assign_footage(candidate_lists: List[List[Dict[str, Any]]]) -> List[Optional[Dict[str, Any]]]:
+        """
+        Give each scene, in script order, its best candidate not already used
+        by an earlier scene, reusing footage only when nothing else matched
+        """
+        used = set()
+        assigned = []
+        for candidates in candidate_lists:
+            footage = next(
+                (candidate for candidate in candidates if candidate["id"] not in used),
+                candidates[0] if candidates else None
+            )
+            if footage is not None:
+                used.add(footage["id"])
+            assigned.append(footage)
+        return assigned
+
+    async def _voiceover(self, text: str) -> Dict[str, Any]:
+        with span("voiceover", chars=len(text)):
+            return await self.generate_voiceover(text)
+
+    async def generate_video_content(
+        self,
+        script: Dict[str, Any],
+        on_scene_done: Optional[Callable[[Dict[str, Any]], Awaitable[None]]] = None
+    ) -> Dict[str, Any]:
         """
         Generate video content from script using Getty Images and Eleven Labs
+
+        Footage searches are planned across the whole script: every scene
+        starts with its best query, each unique query is searched once, and
+        a scene only moves on to lower-ranked queries while it is still
+        unfilled. Voiceovers and scene searches run concurrently; sections
+        and scenes keep the order of the input script. Each search returns a
+        page of results that are shared out so scenes get distinct footage
+        where alternatives exist. `on_scene_done` is awaited with each
+        scene once its footage search is resolved.
         """
         try:
-            enhanced_sections = []
-            
-            for section in script["voiceover_sections"]:
-                # Generate voiceover
-                voiceover = await self.generate_voiceover(section["voiceover"])
-                background_music = {
-                    "url": "https://d25u9hypq51glx.cloudfront.net/image_projects/3cb7e03d-a95c-4102-86b8-20c5bc8630ed/assets/audio/13592a75-3fa1-42f8-8b21-cc72b3bd54ef/audio.mp3",
-                    "text": "Background Music",
-                    "note": "Eleven Labs API key not configured"
-                }
-                # Get footage for each scene
-                enhanced_scenes = []
-                for scene in section["scenes"]:
-                    # Try each search query until we find a match
-                    footage = None
-                    for query in scene["search_queries"]:
-                        footage = await self.get_stock_footage(query)
-                        if footage:
-                            break
-                    
-                    enhanced_scenes.append({
-                        **scene,
-                        "footage": footage
-                    })
-                
-                enhanced_sections.append({
+            sections = script["voiceover_sections"]
+            scenes = [scene for section in sections for scene in section["scenes"]]
+            plan = self._plan_searches(scenes)
+            search = self._script_search()
+            distinct = len({query for queries in plan for query in queries})
+            with span("generate_video_content", sections=len(sections), scenes=len(scenes), queries=distinct):
+                results = await asyncio.gather(
+                    *(self._voiceover(section["voiceover"]) for section in sections),
+                    *(self._scene_footage(scene, queries, search, on_scene_done) for scene, queries in zip(scenes, plan))
+                )
+            voiceovers = results[:len(sections)]
+            footages = iter(self._assign_footage(results[len(sections):]))
+
+            background_music = {
+                "url": "https://d25u9hypq51glx.cloudfront.net/image_projects/3cb7e03d-a95c-4102-86b8-20c5bc8630ed/assets/audio/13592a75-3fa1-42f8-8b21-cc72b3bd54ef/audio.mp3",
+                "text": "Background Music",
+                "note": "Eleven Labs API key not configured"
+            }
+            enhanced_sections = [
+                {
                     "voiceover": voiceover,
-                    "scenes": enhanced_scenes,
-                      "background_music": background_music
-                })
+                    "scenes": [
+                        {
+                            **scene,
+                            "footage": next(footages)
+                        }
+                        for scene in section["scenes"]
+                    ],
+                    "background_music": background_music
+                }
+                for section, voiceover in zip(sections, voiceovers)
+            ]
 
-              
-            
             return {
                 "enhanced_script": {
                     "voiceover_sections": enhanced_sections,
                     "stock_footage_keywords": script["stock_footage_keywords"]
                 }
             }
-            
+
         except Exception as e:
             raise Exception(f"Error generating video content: {str(e)}")
 
@@ -0,0 +1,249 @@
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+import asyncio
+import json
+import logging
+import time
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.video_job import VideoJob
+from app.services.video_generation_service import video_generation_service
+
+TERMINAL_STATUSES = ("succeeded", "failed")
+
+logger = logging.getLogger(__name__)
+
+class QueueFullError(Exception):
+    pass
+
+class VideoJobService:
+    """
+    Runs generate_video_content in the background for submitted scripts.
+
+    Jobs are stored in the database and executed by a fixed number of async
+    workers fed from a bounded queue. On startup, jobs left queued or running
+    by a previous process are queued again, so only one process per database
+    should run workers (set VIDEO_JOB_WORKERS=0 on the others).
+    """
+
+    def __init__(self):
+        self.workers = settings.VIDEO_JOB_WORKERS
+        self.queue_size = settings.VIDEO_JOB_QUEUE_SIZE
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._changed: Dict[str, asyncio.Event] = {}
+
+    async def startup(self) -> None:
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        if not self.workers:
+            return
+        pending = await asyncio.to_thread(self._recover)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        if pending:
+            self._tasks.append(asyncio.create_task(self._requeue(pending)))
+
+    async def shutdown(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "queue_size": self.queue_size,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+        }
+
+    async def submit(self, script: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Store a new job and queue it. Raises QueueFullError when the queue is
+        at capacity so callers can push back instead of piling up work.
+        """
+        if self._queue is None or not self.workers:
+            raise QueueFullError("Video generation workers are not running")
+        if self._queue.full():
+            raise QueueFullError("Video generation queue is full")
+        total_scenes = sum(len(section.get("scenes", [])) for section in script["voiceover_sections"])
+        job = await asyncio.to_thread(self._create, script, total_scenes)
+        try:
+            self._queue.put_nowait(job["id"])
+        except asyncio.QueueFull:
+            await asyncio.to_thread(self._delete, job["id"])
+            raise QueueFullError("Video generation queue is full")
+        return job
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return await asyncio.to_thread(self._get, job_id)
+
+    async def wait(self, job_id: str, timeout: float) -> Optional[Dict[str, Any]]:
+        """
+        Long-poll: return once the job's status or progress changes, it
+        finishes, or `timeout` seconds pass.
+        """
+        job = await self.get(job_id)
+        if job is None or job["status"] in TERMINAL_STATUSES:
+            self._notify(job_id)
+            return job
+        if timeout <= 0:
+            return job
+        # Only live jobs get an event; _notify drops it on the next change
+        event = self._changed.setdefault(job_id, asyncio.Event())
+        seen = (job["status"], job["completed_scenes"])
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return job
+            try:
+                # Re-read periodically so jobs run by another process are noticed too
+                await asyncio.wait_for(event.wait(), min(remaining, 1.0))
+            except asyncio.TimeoutError:
+                pass
+            job = await self.get(job_id)
+            if job is None or job["status"] in TERMINAL_STATUSES:
+                self._notify(job_id)
+                return job
+            if (job["status"], job["completed_scenes"]) != seen:
+                return job
+            event = self._changed.setdefault(job_id, asyncio.Event())
+
+    def _notify(self, job_id: str) -> None:
+        event = self._changed.pop(job_id, None)
+        if event is not None:
+            event.set()
+
+    async def _requeue(self, job_ids: List[str]) -> None:
+        for job_id in job_ids:
+            await self._queue.put(job_id)
+
+    async def _worker(self) -> None:
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._run(job_id)
+            except Exception as e:
+                # Keep the worker alive; the job must not be left running
+                logger.exception("Video job %s crashed", job_id)
+                try:
+                    await asyncio.to_thread(
+                        self._update, job_id,
+                        status="failed",
+                        error=str(e),
+                        finished_at=datetime.utcnow()
+                    )
+                except Exception:
+                    logger.exception("Could not mark video job %s failed", job_id)
+                self._notify(job_id)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job_id: str) -> None:
+        script = await asyncio.to_thread(self._start, job_id)
+        if script is None:
+            return
+        self._notify(job_id)
+        completed = 0
+
+        async def on_scene_done(scene: Dict[str, Any]) -> None:
+            nonlocal completed
+            completed += 1
+            await asyncio.to_thread(self._update_progress, job_id, completed)
+            self._notify(job_id)
+
+        try:
+            result = await video_generation_service.generate_video_content(script, on_scene_done=on_scene_done)
+            await asyncio.to_thread(
+                self._update, job_id,
+                status="succeeded",
+                result=json.dumps(result),
+                finished_at=datetime.utcnow()
+            )
+        except Exception as e:
+            await asyncio.to_thread(
+                self._update, job_id,
+                status="failed",
+                error=str(e),
+                finished_at=datetime.utcnow()
+            )
+        self._notify(job_id)
+
+    # Blocking database helpers, run in worker threads
+
+    @staticmethod
+    def _to_dict(job: VideoJob) -> Dict[str, Any]:
+        return {
+            "id": job.id,
+            "status": job.status,
+            "total_scenes": job.total_scenes,
+            "completed_scenes": job.completed_scenes,
+            "error": job.error,
+            "result": json.loads(job.result) if job.result else None,
+            "created_at": job.created_at,
+            "updated_at": job.updated_at,
+            "started_at": job.started_at,
+            "finished_at": job.finished_at,
+        }
+
+    def _create(self, script: Dict[str, Any], total_scenes: int) -> Dict[str, Any]:
+        with SessionLocal() as db:
+            job = VideoJob(script=json.dumps(script), total_scenes=total_scenes)
+            db.add(job)
+            db.commit()
+            db.refresh(job)
+            return self._to_dict(job)
+
+    def _delete(self, job_id: str) -> None:
+        with SessionLocal() as db:
+            db.query(VideoJob).filter(VideoJob.id == job_id).delete()
+            db.commit()
+
+    def _get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with SessionLocal() as db:
+            job = db.get(VideoJob, job_id)
+            return self._to_dict(job) if job else None
+
+    def _start(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with SessionLocal() as db:
+            # Only claim jobs that are still queued
+            claimed = db.query(VideoJob).filter(
+                VideoJob.id == job_id, VideoJob.status == "queued"
+            ).update(
+                {"status": "running", "started_at": datetime.utcnow(), "completed_scenes": 0},
+                synchronize_session=False
+            )
+            db.commit()
+            if not claimed:
+                return None
+            return json.loads(db.get(VideoJob, job_id).script)
+
+    def _update(self, job_id: str, **values: Any) -> None:
+        with SessionLocal() as db:
+            db.query(VideoJob).filter(VideoJob.id == job_id).update(
+                {**values, "updated_at": datetime.utcnow()}, synchronize_session=False
+            )
+            db.commit()
+
+    def _update_progress(self, job_id: str, completed_scenes: int) -> None:
+        with SessionLocal() as db:
+            # Progress writes may land out of order; never move backwards
+            db.query(VideoJob).filter(
+                VideoJob.id == job_id, VideoJob.completed_scenes < completed_scenes
+            ).update(
+                {"completed_scenes": completed_scenes, "updated_at": datetime.utcnow()},
+                synchronize_session=False
+            )
+            db.commit()
+
+    def _recover(self) -> List[str]:
+        with SessionLocal() as db:
+            db.query(VideoJob).filter(VideoJob.status == "running").update(
+                {"status": "queued"}, synchronize_session=False
+            )
+            db.commit()
+            rows = db.query(VideoJob.id).filter(
+                VideoJob.status == "queued"
+            ).order_by(VideoJob.created_at).all()
+            return [row.id for row in rows]
+
+video_job_service = VideoJobService()
@@ -1,56 +1,213 @@
-import openai
+"""
+Video script generation outside the HTTP API.
 
-# Replace with your actual API key
-openai.api_key = "YOUR_API_KEY"
+Batch mode reads product rows from a JSONL or CSV file and writes one JSON
+line per product to the output file as each script completes:
+
+    python -m app.third_party.open_ai.scriptGeneration products.csv -o scripts.jsonl --concurrency 8
+
+Rows need `product_name` (or `topic`) and may set `id`, `product_description`,
+`duration`, `target_audience`, `language`, `brand_name`, `tone`, `ad_type`
+and `variations_no`; rows without an `id` are identified by their position.
+Rerunning with the same output file skips every id already written
+successfully, so an interrupted run resumes where it stopped.
+"""
+from typing import Any, Dict, Iterator, Optional, Set, Tuple
+import argparse
+import asyncio
+import csv
+import json
+import os
+import sys
+import time
+from app.core.metrics import TokenUsage, track_token_usage
+from app.services.openai_service import SCRIPT_MODES, openai_service
+
+SCRIPT_FIELDS = (
+    "product_description", "duration", "target_audience", "language",
+    "brand_name", "tone", "ad_type"
+)
 
 def generate_video_script_json(topic: str, duration: str = "60 seconds", tone: str = "professional and inspiring") -> list:
     """
     Generate a structured video script in JSON format using OpenAI.
 
+    Blocking wrapper around OpenAIService.generate_video_script for
+    synchronous callers; it runs its own event loop, so do not call it from
+    async code.
+
     Args:
         topic (str): The topic or product the video is about.
         duration (str): Length of the video (e.g., "60 seconds").
         tone (str): Tone of the video (e.g., "professional and inspiring").
 
     Returns:
-        list: A list of scene objects in JSON-like Python dicts.
+        list: The script's voiceover sections, each with its scenes.
+    """
+    try:
+        variations = asyncio.run(openai_service.generate_video_script(
+            product_name=topic,
+            product_description=topic,
+            duration=duration,
+            tone=tone
+        ))
+        return variations[0]["voiceover_sections"]
+
+    except Exception as e:
+        print("Error generating video script:", e)
+        return []
+
+def read_rows(path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Yield product rows from a .csv file or a JSONL file, one at a time
     """
-    prompt = f"""
-You're a professional video scriptwriter.
+    with open(path, newline="", encoding="utf-8") as f:
+        if path.lower().endswith(".csv"):
+            rows = csv.DictReader(f)
+        else:
+            rows = (json.loads(line) for line in f if line.strip())
+        for position, row in enumerate(rows, start=1):
+            row = {key: value for key, value in row.items() if value not in (None, "")}
+            row.setdefault("id", str(position))
+            yield row
 
-Generate a complete video script in JSON format for a {duration} promotional video about {topic}.
-The tone should be {tone}.
+def completed_ids(path: str) -> Set[str]:
+    """
+    Ids already written successfully to an output file; failed rows and a
+    line cut short by an interruption are retried
+    """
+    done: Set[str] = set()
+    if not os.path.exists(path):
+        return done
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if "error" not in record:
+                done.add(str(record["id"]))
+    return done
 
-Each scene should include the following fields:
-- scene (number)
-- visual (visual description of the scene)
-- narration (voiceover line)
-- caption (on-screen text)
-- music_sfx (background music or sound effects)
+async def generate_row(
+    row: Dict[str, Any],
+    concurrency: Optional[int],
+    mode: Optional[str] = None
+) -> Tuple[Dict[str, Any], TokenUsage]:
+    start = time.perf_counter()
+    record: Dict[str, Any] = {"id": str(row["id"])}
+    with track_token_usage() as usage:
+        try:
+            product_name = row.get("product_name") or row["topic"]
+            kwargs = {field: row[field] for field in SCRIPT_FIELDS if field in row}
+            kwargs.setdefault("product_description", product_name)
+            record["variations"] = await openai_service.generate_video_script(
+                product_name=product_name,
+                variations_no=int(row.get("variations_no", 1)),
+                concurrency=concurrency,
+                mode=mode,
+                **kwargs
+            )
+        except Exception as e:
+            record["error"] = str(e)
+    record["usage"] = usage.to_dict()
+    record["elapsed_ms"] = (time.perf_counter() - start) * 1000
+    return record, usage
 
-Return the result as a valid JSON array of scene objects.
-Ensure the output is directly parseable JSON.
+async def run_batch(
+    input_path: str,
+    output_path: str,
+    concurrency: int,
+    variation_concurrency: Optional[int] = None,
+    progress_every: int = 100,
+    mode: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Generate scripts for every row not already in the output file, at most
+    `concurrency` products at a time, appending results as they complete.
     """
+    done = completed_ids(output_path)
+    queue: asyncio.Queue = asyncio.Queue(maxsize=concurrency * 2)
+    totals = TokenUsage()
+    counts = {"succeeded": 0, "failed": 0, "skipped": 0}
+    start = time.perf_counter()
+
+    # Start on a fresh line if the last run was cut off mid-write
+    if os.path.exists(output_path) and os.path.getsize(output_path):
+        with open(output_path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            needs_newline = f.read(1) != b"\n"
+    else:
+        needs_newline = False
+    output = open(output_path, "a", encoding="utf-8")
+    if needs_newline:
+        output.write("\n")
+
+    async def produce() -> None:
+        for row in read_rows(input_path):
+            if str(row["id"]) in done:
+                counts["skipped"] += 1
+                continue
+            await queue.put(row)
+        for _ in range(concurrency):
+            await queue.put(None)
+
+    async def work() -> None:
+        while True:
+            row = await queue.get()
+            if row is None:
+                return
+            record, usage = await generate_row(row, variation_concurrency, mode)
+            # One complete line per product, flushed so progress survives a crash
+            output.write(json.dumps(record, ensure_ascii=False) + "\n")
+            output.flush()
+            counts["failed" if "error" in record else "succeeded"] += 1
+            totals.add(usage)
+            processed = counts["succeeded"] + counts["failed"]
+            if progress_every and processed % progress_every == 0:
+                elapsed = time.perf_counter() - start
+                print(
+                    f"{processed} done ({counts['failed']} failed), "
+                    f"{processed / elapsed:.2f} products/s, {totals.total_tokens} tokens",
+                    file=sys.stderr
+                )
 
     try:
-        response = openai.ChatCompletion.create(
-            model="gpt-4",
-            messages=[
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.7
-        )
-
-        content = response['choices'][0]['message']['content'].strip()
-
-        # Try to parse the content safely
-        import json
-        # Fix triple backticks if any
-        if content.startswith("```json"):
-            content = content.split("```json")[1].split("```")[0].strip()
-        script_json = json.loads(content)
-        return script_json
+        await asyncio.gather(produce(), *(work() for _ in range(concurrency)))
+    finally:
+        output.close()
+        await openai_service.shutdown()
 
-    except Exception as e:
-        print("Error generating video script:", e)
-        return []
+    elapsed = time.perf_counter() - start
+    processed = counts["succeeded"] + counts["failed"]
+    return {
+        **counts,
+        "elapsed_s": elapsed,
+        "products_per_s": processed / elapsed if elapsed else 0.0,
+        "usage": totals.to_dict(),
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Generate video scripts for a file of products")
+    parser.add_argument("input", help="products as .jsonl or .csv")
+    parser.add_argument("-o", "--output", required=True, help="results .jsonl; appended to and used to resume")
+    parser.add_argument("--concurrency", type=int, default=8, help="products generated at once")
+    parser.add_argument("--variation-concurrency", type=int, default=None,
+                        help="per-product cap on concurrent variation requests")
+    parser.add_argument("--mode", choices=SCRIPT_MODES, default=None,
+                        help="variation generation mode (defaults to OPENAI_SCRIPT_GENERATION_MODE)")
+    parser.add_argument("--progress-every", type=int, default=100, help="print progress every N products")
+    args = parser.parse_args()
+
+    summary = asyncio.run(run_batch(
+        args.input,
+        args.output,
+        max(1, args.concurrency),
+        args.variation_concurrency,
+        args.progress_every,
+        args.mode
+    ))
+    print(json.dumps(summary, indent=2))
+
+if __name__ == "__main__":
+    main()
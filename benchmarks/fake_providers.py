@@ -0,0 +1,276 @@
+"""
+In-process stand-ins for the OpenAI, Getty Images and Eleven Labs APIs.
+
+Each fake is a small ASGI app with its own latency distribution and error
+rate, meant to be mounted with httpx.ASGITransport so benchmarks exercise
+the real clients, pools, retries and caches without network calls or cost.
+
+    fakes = FakeProviders.from_specs(latency=["openai=800:0.5"], errors=["getty=0.02"])
+    fakes.install()  # points the service singletons at the fakes
+"""
+import asyncio
+import hashlib
+import json
+import math
+import random
+import time
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Dict, List, Optional
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import StreamingResponse
+
+@dataclass
+class ProviderProfile:
+    """
+    Latency is log-normal around `median_ms` with shape `sigma` (0 gives a
+    constant delay); `error_rate` of requests fail with `error_status`.
+    """
+    median_ms: float = 50.0
+    sigma: float = 0.0
+    error_rate: float = 0.0
+    error_status: int = 503
+    requests: int = 0
+    errors: int = 0
+    rng: random.Random = field(default_factory=lambda: random.Random(0), repr=False)
+
+    async def delay(self) -> Optional[Response]:
+        self.requests += 1
+        seconds = self.median_ms / 1000 * math.exp(self.rng.gauss(0, self.sigma) if self.sigma else 0)
+        await asyncio.sleep(seconds)
+        if self.error_rate and self.rng.random() < self.error_rate:
+            self.errors += 1
+            return Response(
+                json.dumps({"error": {"message": "injected failure", "type": "server_error"}}),
+                status_code=self.error_status,
+                media_type="application/json"
+            )
+        return None
+
+    def stats(self) -> Dict[str, int]:
+        return {"requests": self.requests, "errors": self.errors}
+
+def default_profiles() -> Dict[str, ProviderProfile]:
+    return {
+        "openai": ProviderProfile(median_ms=400, sigma=0.4),
+        "getty": ProviderProfile(median_ms=120, sigma=0.5),
+        "eleven_labs": ProviderProfile(median_ms=300, sigma=0.3),
+    }
+
+def _tokens(text: str) -> int:
+    return len(text) // 4 + 1
+
+def fake_script(prompt: str, sections: int, scenes: int) -> Dict[str, object]:
+    seed = hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:8]
+    scene_number = 0
+    voiceover_sections = []
+    for i in range(sections):
+        section_scenes = []
+        for _ in range(scenes):
+            scene_number += 1
+            section_scenes.append({
+                "scene_number": scene_number,
+                "visual": f"Shot {scene_number} of product {seed}",
+                "caption": f"Caption {scene_number}",
+                "music_sfx": "Upbeat background music",
+                "search_queries": [f"{seed} scene {scene_number} option {q}" for q in range(3)],
+            })
+        voiceover_sections.append({"voiceover": f"Section {i + 1} narration for {seed}.", "scenes": section_scenes})
+    return {"voiceover_sections": voiceover_sections}
+
+async def _stream_chunks(
+    model: str, content: str, n: int, usage: Optional[Dict[str, object]], piece_chars: int = 16
+) -> AsyncIterator[bytes]:
+    """
+    Server-sent `chat.completion.chunk` frames for `content`: the role, the
+    content in small deltas, the finish reason, then the usage chunk (when
+    requested) and [DONE], as the API sends them with `stream: true`
+    """
+    created = int(time.time())
+
+    def frame(choices: List[Dict[str, object]], **extra: object) -> bytes:
+        chunk = {"id": "chatcmpl-fake", "object": "chat.completion.chunk", "created": created,
+                 "model": model, "choices": choices, **extra}
+        return b"data: " + json.dumps(chunk).encode("utf-8") + b"\n\n"
+
+    for i in range(n):
+        yield frame([{"index": i, "delta": {"role": "assistant", "content": ""}, "finish_reason": None}])
+    for start in range(0, len(content), piece_chars):
+        piece = content[start:start + piece_chars]
+        for i in range(n):
+            yield frame([{"index": i, "delta": {"content": piece}, "finish_reason": None}])
+        # Let other requests run between deltas, as with a real token stream
+        await asyncio.sleep(0)
+    for i in range(n):
+        yield frame([{"index": i, "delta": {}, "finish_reason": "stop"}])
+    if usage is not None:
+        yield frame([], usage=usage)
+    yield b"data: [DONE]\n\n"
+
+def openai_app(profile: ProviderProfile, sections: int = 3, scenes: int = 2, dimensions: int = 1536) -> FastAPI:
+    app = FastAPI()
+    # System prompts seen so far; a repeated one is reported as cached input,
+    # like the provider's prefix cache (without its minimum length)
+    seen_prefixes = set()
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        failure = await profile.delay()
+        if failure is not None:
+            return failure
+        prompt = "\n".join(message["content"] for message in body["messages"])
+        last = body["messages"][-1]["content"]
+        if "voiceover_sections" in prompt:
+            content = json.dumps(fake_script(last, sections, scenes))
+        elif "keywords" in prompt:
+            keywords = ["modern lifestyle", "happy customers", "technology", "close-up product"]
+            content = json.dumps(keywords if "JSON array" in prompt else {"keywords": keywords})
+        else:
+            words = max(1, min(body.get("max_tokens") or 200, 200))
+            content = " ".join(["lorem"] * words)
+        n = body.get("n") or 1
+        completion_tokens = _tokens(content) * n
+        cached_tokens = 0
+        first = body["messages"][0]
+        if first["role"] == "system":
+            if first["content"] in seen_prefixes:
+                cached_tokens = _tokens(first["content"])
+            seen_prefixes.add(first["content"])
+        usage = {
+            "prompt_tokens": _tokens(prompt),
+            "completion_tokens": completion_tokens,
+            "total_tokens": _tokens(prompt) + completion_tokens,
+            "prompt_tokens_details": {"cached_tokens": cached_tokens},
+        }
+        if body.get("stream"):
+            include_usage = (body.get("stream_options") or {}).get("include_usage", False)
+            return StreamingResponse(
+                _stream_chunks(body["model"], content, n, usage if include_usage else None),
+                media_type="text/event-stream"
+            )
+        return {
+            "id": "chatcmpl-fake",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body["model"],
+            "choices": [
+                {"index": i, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}
+                for i in range(n)
+            ],
+            "usage": usage,
+        }
+
+    @app.post("/v1/embeddings")
+    async def embeddings(request: Request):
+        body = await request.json()
+        failure = await profile.delay()
+        if failure is not None:
+            return failure
+        inputs = body["input"] if isinstance(body["input"], list) else [body["input"]]
+        data = []
+        for i, text in enumerate(inputs):
+            rng = random.Random(hashlib.sha256(text.encode("utf-8")).digest())
+            data.append({"object": "embedding", "index": i, "embedding": [rng.uniform(-1, 1) for _ in range(dimensions)]})
+        tokens = sum(_tokens(text) for text in inputs)
+        return {
+            "object": "list",
+            "data": data,
+            "model": body["model"],
+            "usage": {"prompt_tokens": tokens, "total_tokens": tokens},
+        }
+
+    return app
+
+def getty_app(profile: ProviderProfile) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/v3/search/images")
+    async def search(phrase: str, page_size: int = 1):
+        failure = await profile.delay()
+        if failure is not None:
+            return failure
+        digest = hashlib.sha256(phrase.encode("utf-8")).hexdigest()[:12]
+        return {
+            "result_count": page_size,
+            "images": [
+                {
+                    "id": f"{digest}-{i}",
+                    "title": f"{phrase} #{i}",
+                    "display_sizes": [
+                        {"name": "preview", "uri": f"https://fake-getty.local/{digest}/{i}/preview.jpg"},
+                        {"name": "comp", "uri": f"https://fake-getty.local/{digest}/{i}/comp.jpg"},
+                    ],
+                }
+                for i in range(page_size)
+            ],
+        }
+
+    return app
+
+def eleven_labs_app(profile: ProviderProfile, audio_bytes: int = 32 * 1024) -> FastAPI:
+    app = FastAPI()
+    audio = b"\xff\xfb" + b"\x00" * (audio_bytes - 2)
+
+    @app.post("/v1/text-to-speech/{voice_id}")
+    async def text_to_speech(voice_id: str, request: Request):
+        await request.body()
+        failure = await profile.delay()
+        if failure is not None:
+            return failure
+        return Response(audio, media_type="audio/mpeg")
+
+    return app
+
+class FakeProviders:
+    def __init__(self, profiles: Optional[Dict[str, ProviderProfile]] = None):
+        self.profiles = {**default_profiles(), **(profiles or {})}
+
+    @classmethod
+    def from_specs(cls, latency: List[str] = (), errors: List[str] = ()) -> "FakeProviders":
+        """
+        Build from CLI-style specs: latency "provider=median_ms[:sigma]",
+        errors "provider=rate[:status]"
+        """
+        fakes = cls()
+        for spec in latency:
+            name, value = spec.split("=", 1)
+            median, _, sigma = value.partition(":")
+            fakes.profiles[name].median_ms = float(median)
+            fakes.profiles[name].sigma = float(sigma or 0)
+        for spec in errors:
+            name, value = spec.split("=", 1)
+            rate, _, status = value.partition(":")
+            fakes.profiles[name].error_rate = float(rate)
+            if status:
+                fakes.profiles[name].error_status = int(status)
+        return fakes
+
+    def install(self) -> None:
+        """
+        Point the OpenAI, Getty and Eleven Labs service singletons at the fakes
+        """
+        import httpx
+        from openai import AsyncOpenAI
+        from app.core.http import PooledClient
+        from app.services.openai_service import openai_service
+        from app.services.video_generation_service import video_generation_service as video
+
+        openai_service.client = AsyncOpenAI(
+            api_key="benchmark",
+            base_url="http://fake-openai/v1",
+            max_retries=0,
+            http_client=httpx.AsyncClient(transport=httpx.ASGITransport(app=openai_app(self.profiles["openai"]))),
+        )
+        video.getty_api_key = video.getty_api_key or "benchmark"
+        video.eleven_labs_api_key = video.eleven_labs_api_key or "benchmark"
+        video.getty_base_url = "http://fake-getty/v3/search/images"
+        video.eleven_labs_base_url = "http://fake-eleven-labs/v1/text-to-speech"
+        video.getty_client = PooledClient(
+            "getty", transport=httpx.ASGITransport(app=getty_app(self.profiles["getty"]))
+        )
+        video.eleven_labs_client = PooledClient(
+            "eleven_labs", transport=httpx.ASGITransport(app=eleven_labs_app(self.profiles["eleven_labs"]))
+        )
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        return {name: profile.stats() for name, profile in self.profiles.items()}
@@ -0,0 +1,105 @@
+"""
+Parsing and serialization cost of video script payloads.
+
+Times the previous fence-splitting json.loads parser against extract_json
+and the full parse-and-validate path on model replies of realistic sizes
+(clean, fenced, and with leading prose and trailing commas), then
+json.dumps against orjson for VideoScriptResponse-shaped bodies. Prints a
+JSON report of microseconds per operation.
+
+    python -m benchmarks.json_benchmark --sections 3,6,12 --variations 5
+"""
+import argparse
+import json
+import re
+import time
+from typing import Any, Callable, Dict
+import orjson
+from benchmarks.fake_providers import fake_script
+
+def legacy_parse(content: str) -> Any:
+    # The parser extract_json replaced
+    content = content.strip()
+    if content.startswith("```json"):
+        content = content.split("```json")[1].split("```")[0].strip()
+    elif content.startswith("```"):
+        content = content.split("```")[1].split("```")[0].strip()
+    return json.loads(content)
+
+def replies(sections: int, scenes: int) -> Dict[str, str]:
+    clean = json.dumps(fake_script(f"benchmark {sections}", sections, scenes), indent=2)
+    return {
+        "clean": clean,
+        "fenced": f"```json\n{clean}\n```",
+        "prose_trailing_commas": "Here is your script:\n" + re.sub(r"(\]|\"|\})(\n\s*[\]}])", r"\1,\2", clean),
+    }
+
+def time_per_call(fn: Callable[[], Any], min_seconds: float) -> float:
+    """
+    Microseconds per call, repeating until at least `min_seconds` elapsed
+    """
+    calls = 0
+    start = time.perf_counter()
+    while True:
+        fn()
+        calls += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_seconds:
+            return elapsed / calls * 1e6
+
+def run(sections_list, scenes: int, variations: int, min_seconds: float) -> Dict[str, Any]:
+    from app.core.json_stream import extract_json
+    from app.services.openai_service import OpenAIService
+
+    parsing: Dict[str, Any] = {}
+    serialization: Dict[str, Any] = {}
+    for sections in sections_list:
+        level: Dict[str, Any] = {}
+        for kind, content in replies(sections, scenes).items():
+            def legacy() -> Any:
+                return legacy_parse(content)
+            try:
+                legacy()
+                legacy_us = time_per_call(legacy, min_seconds)
+            except ValueError:
+                legacy_us = None  # The old parser rejects this reply outright
+            level[kind] = {
+                "bytes": len(content),
+                "legacy_us": legacy_us,
+                "extract_json_us": time_per_call(lambda: extract_json(content), min_seconds),
+                "parse_and_validate_us": time_per_call(lambda: OpenAIService._parse_script(content), min_seconds),
+            }
+        parsing[str(sections)] = level
+
+        script = fake_script(f"benchmark {sections}", sections, scenes)
+        body = {"variations": [
+            {**script, "stock_footage_keywords": ["modern lifestyle", "technology"]} for _ in range(variations)
+        ]}
+        serialization[str(sections)] = {
+            "bytes": len(orjson.dumps(body)),
+            # What JSONResponse.render does
+            "json_dumps_us": time_per_call(
+                lambda: json.dumps(body, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8"),
+                min_seconds
+            ),
+            "orjson_us": time_per_call(lambda: orjson.dumps(body), min_seconds),
+        }
+
+    return {
+        "config": {"scenes_per_section": scenes, "variations": variations},
+        "parsing": parsing,
+        "serialization": serialization,
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sections", type=lambda s: [int(n) for n in s.split(",")], default=[3, 6, 12],
+                        help="voiceover sections per script")
+    parser.add_argument("--scenes", type=int, default=2, help="scenes per voiceover section")
+    parser.add_argument("--variations", type=int, default=5, help="variations per serialized response")
+    parser.add_argument("--min-seconds", type=float, default=0.2, help="time spent on each measurement")
+    args = parser.parse_args()
+    print(json.dumps(run(args.sections, args.scenes, args.variations, args.min_seconds), indent=2))
+
+if __name__ == "__main__":
+    main()
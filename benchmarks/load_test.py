@@ -0,0 +1,209 @@
+"""
+Offline load test of the main endpoints against fake upstream providers.
+
+Runs the app in-process with a throwaway database, replaces OpenAI, Getty
+and Eleven Labs with the stand-ins from benchmarks.fake_providers, and drives
+each scenario at every concurrency level. Prints (and optionally writes) a
+JSON report; with --baseline, compares against a stored report and exits
+non-zero when throughput or p95 latency regress by more than
+--max-regression percent.
+
+    python -m benchmarks.load_test --concurrency 1,8,32 --requests 64 --output bench.json
+    python -m benchmarks.load_test --baseline bench.json --latency openai=800:0.6 --errors getty=0.05
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List
+from benchmarks.fake_providers import FakeProviders, fake_script
+from benchmarks.login_benchmark import measure_loop_lag, percentile
+
+SCENARIOS = ("completion", "video-script", "generate-video", "login")
+PASSWORD = "correct horse battery staple"
+
+def build_requests(users: int) -> Dict[str, Callable[[int], Dict[str, Any]]]:
+    """
+    Per-scenario request factories; inputs vary with the request index so
+    caches and request coalescing do not flatter the numbers
+    """
+    return {
+        "completion": lambda i: {
+            "method": "POST", "url": "/api/v1/ai/completion",
+            "json": {"prompt": f"Write a tagline for product #{i}", "max_tokens": 100},
+        },
+        "video-script": lambda i: {
+            "method": "POST", "url": "/api/v1/ai/video-script",
+            "json": {"product_name": f"Product {i}", "product_description": "A benchmark product", "variations_no": 2},
+        },
+        "generate-video": lambda i: {
+            "method": "POST", "url": "/api/v1/ai/generate-video",
+            "json": {**fake_script(f"benchmark video {i}", 3, 2), "stock_footage_keywords": ["benchmark"]},
+        },
+        "login": lambda i: {
+            "method": "POST", "url": "/api/v1/auth/login",
+            "data": {"username": f"user{i % users}@example.com", "password": PASSWORD},
+        },
+    }
+
+async def run_level(
+    client,
+    factory: Callable[[int], Dict[str, Any]],
+    concurrency: int,
+    requests: int,
+    offset: int = 0
+) -> Dict[str, Any]:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    statuses: Dict[str, int] = {}
+
+    async def one(i: int) -> None:
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                response = await client.request(**factory(offset + i))
+                status = str(response.status_code)
+            except Exception as e:
+                status = type(e).__name__
+            latencies.append(time.perf_counter() - start)
+            statuses[status] = statuses.get(status, 0) + 1
+
+    lag_samples: List[float] = []
+    stop = asyncio.Event()
+    ticker = asyncio.create_task(measure_loop_lag(stop, lag_samples))
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await ticker
+
+    return {
+        "requests": requests,
+        "errors": sum(count for status, count in statuses.items() if not status.startswith("2")),
+        "statuses": statuses,
+        "elapsed_s": elapsed,
+        "throughput_rps": requests / elapsed,
+        "latency_ms": {
+            "mean": statistics.fmean(latencies) * 1000,
+            "p50": percentile(latencies, 50) * 1000,
+            "p95": percentile(latencies, 95) * 1000,
+            "p99": percentile(latencies, 99) * 1000,
+        },
+        "loop_lag_p99_ms": percentile(lag_samples, 99) * 1000,
+    }
+
+async def run(args: argparse.Namespace, fakes: FakeProviders) -> Dict[str, Any]:
+    import httpx
+    from main import app
+
+    fakes.install()
+    factories = build_requests(args.users)
+    results: Dict[str, Dict[str, Any]] = {}
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            if "login" in args.scenarios:
+                for i in range(args.users):
+                    response = await client.post("/api/v1/auth/register", json={
+                        "email": f"user{i}@example.com", "username": f"user{i}", "password": PASSWORD,
+                    })
+                    response.raise_for_status()
+            for scenario in args.scenarios:
+                results[scenario] = {}
+                for level, concurrency in enumerate(args.concurrency):
+                    # Each level gets fresh inputs so it cannot hit entries cached by the last
+                    results[scenario][str(concurrency)] = await run_level(
+                        client, factories[scenario], concurrency, args.requests, offset=level * args.requests
+                    )
+
+    return {
+        "config": {
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "providers": {
+                name: {"median_ms": p.median_ms, "sigma": p.sigma, "error_rate": p.error_rate}
+                for name, p in fakes.profiles.items()
+            },
+        },
+        "upstream_requests": fakes.stats(),
+        "results": results,
+    }
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], max_regression: float) -> Dict[str, Any]:
+    """
+    Percent change per scenario and concurrency level against the baseline
+    """
+    comparison: Dict[str, Any] = {}
+    regressions: List[str] = []
+    for scenario, levels in report["results"].items():
+        for level, current in levels.items():
+            previous = baseline.get("results", {}).get(scenario, {}).get(level)
+            if previous is None:
+                continue
+
+            def change(new: float, old: float) -> float:
+                return (new - old) / old * 100 if old else 0.0
+
+            entry = {
+                "throughput_pct": change(current["throughput_rps"], previous["throughput_rps"]),
+                **{
+                    f"{key}_pct": change(current["latency_ms"][key], previous["latency_ms"][key])
+                    for key in ("p50", "p95", "p99")
+                },
+            }
+            comparison.setdefault(scenario, {})[level] = entry
+            if entry["p95_pct"] > max_regression or entry["throughput_pct"] < -max_regression:
+                regressions.append(f"{scenario}@{level}")
+    return {"max_regression_pct": max_regression, "regressions": regressions, "levels": comparison}
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scenarios", type=lambda s: s.split(","), default=list(SCENARIOS),
+                        help=f"comma-separated subset of {','.join(SCENARIOS)}")
+    parser.add_argument("--concurrency", type=lambda s: [int(c) for c in s.split(",")], default=[1, 8, 32])
+    parser.add_argument("--requests", type=int, default=64, help="requests per scenario and concurrency level")
+    parser.add_argument("--users", type=int, default=8, help="accounts cycled through by the login scenario")
+    parser.add_argument("--latency", action="append", default=[], metavar="PROVIDER=MEDIAN_MS[:SIGMA]",
+                        help="fake provider latency (openai, getty, eleven_labs)")
+    parser.add_argument("--errors", action="append", default=[], metavar="PROVIDER=RATE[:STATUS]",
+                        help="fraction of fake provider requests that fail")
+    parser.add_argument("--rounds", type=int, default=None, help="bcrypt cost (defaults to BCRYPT_ROUNDS)")
+    parser.add_argument("--output", help="write the report to this file")
+    parser.add_argument("--baseline", help="report to compare against")
+    parser.add_argument("--max-regression", type=float, default=10.0, help="allowed regression in percent")
+    args = parser.parse_args()
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    # Everything the app writes goes to a throwaway directory
+    work_dir = tempfile.mkdtemp(prefix="load-test-")
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(work_dir, 'bench.db')}"
+    os.environ["EMBEDDINGS_CACHE_PATH"] = os.path.join(work_dir, "embeddings_cache.db")
+    os.environ["AUDIO_STORE_DIR"] = os.path.join(work_dir, "audio")
+    os.environ["VECTOR_INDEX_DIR"] = os.path.join(work_dir, "vector_index")
+    os.environ["VIDEO_JOB_WORKERS"] = "0"
+    os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+    os.environ.setdefault("GETTY_API_KEY", "benchmark")
+    os.environ.setdefault("ELEVEN_LABS_API_KEY", "benchmark")
+    if args.rounds is not None:
+        os.environ["BCRYPT_ROUNDS"] = str(args.rounds)
+
+    fakes = FakeProviders.from_specs(args.latency, args.errors)
+    report = asyncio.run(run(args, fakes))
+    if args.baseline:
+        with open(args.baseline) as f:
+            report["comparison"] = compare(report, json.load(f), args.max_regression)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    print(json.dumps(report, indent=2))
+    if report.get("comparison", {}).get("regressions"):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
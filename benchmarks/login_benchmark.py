@@ -0,0 +1,111 @@
+"""
+Login throughput and event-loop lag under concurrent logins.
+
+Runs the app in-process against a throwaway SQLite database, fires
+`--requests` logins at `--concurrency`, and samples event-loop lag with a
+ticker task while they run. Prints a JSON report.
+
+    python -m benchmarks.login_benchmark --concurrency 32 --requests 256
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import tempfile
+import time
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    index = min(len(values) - 1, max(0, round(pct / 100 * len(values)) - 1))
+    return values[index]
+
+async def measure_loop_lag(stop: asyncio.Event, samples: list, interval: float = 0.01) -> None:
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        samples.append(max(0.0, time.perf_counter() - start - interval))
+
+async def run(concurrency: int, requests: int, users: int) -> dict:
+    import httpx
+    from app.db.session import async_engine
+    from app.models import user, video_job  # noqa: F401  (registers tables)
+    from app.models.base import Base
+    from main import app
+
+    async with async_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for i in range(users):
+            response = await client.post("/api/v1/auth/register", json={
+                "email": f"user{i}@example.com",
+                "username": f"user{i}",
+                "password": "correct horse battery staple",
+            })
+            response.raise_for_status()
+
+        semaphore = asyncio.Semaphore(concurrency)
+        latencies = []
+        errors = 0
+
+        async def login(i: int) -> None:
+            nonlocal errors
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.post("/api/v1/auth/login", data={
+                    "username": f"user{i % users}@example.com",
+                    "password": "correct horse battery staple",
+                })
+                latencies.append(time.perf_counter() - start)
+                if response.status_code != 200:
+                    errors += 1
+
+        lag_samples = []
+        stop = asyncio.Event()
+        ticker = asyncio.create_task(measure_loop_lag(stop, lag_samples))
+        start = time.perf_counter()
+        await asyncio.gather(*(login(i) for i in range(requests)))
+        elapsed = time.perf_counter() - start
+        stop.set()
+        await ticker
+
+    return {
+        "concurrency": concurrency,
+        "requests": requests,
+        "errors": errors,
+        "elapsed_s": elapsed,
+        "throughput_rps": requests / elapsed,
+        "latency_ms": {
+            "p50": percentile(latencies, 50) * 1000,
+            "p95": percentile(latencies, 95) * 1000,
+            "p99": percentile(latencies, 99) * 1000,
+        },
+        "loop_lag_ms": {
+            "mean": statistics.fmean(lag_samples) * 1000 if lag_samples else 0.0,
+            "p99": percentile(lag_samples, 99) * 1000,
+            "max": max(lag_samples, default=0.0) * 1000,
+        },
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=128)
+    parser.add_argument("--users", type=int, default=8)
+    parser.add_argument("--rounds", type=int, default=None, help="bcrypt cost (defaults to BCRYPT_ROUNDS)")
+    args = parser.parse_args()
+
+    db_dir = tempfile.mkdtemp(prefix="login-bench-")
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(db_dir, 'bench.db')}"
+    os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+    if args.rounds is not None:
+        os.environ["BCRYPT_ROUNDS"] = str(args.rounds)
+
+    report = asyncio.run(run(args.concurrency, args.requests, args.users))
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,41 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
+from fastapi.staticfiles import StaticFiles
+from app.api import metrics
 from app.api.api_v1.api import api_router
 from app.core.config import settings
+from app.core.metrics import MetricsMiddleware
+from app.core.tracing import configure_logging
+from app.db.session import async_engine
+from app.models import user, video_job  # noqa: F401  (registers tables)
+from app.models.base import Base
+from app.services.openai_service import openai_service
+from app.services.video_generation_service import video_generation_service
+from app.services.video_job_service import video_job_service
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    async with async_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    await openai_service.startup()
+    await video_generation_service.startup()
+    await video_job_service.startup()
+    try:
+        yield
+    finally:
+        await video_job_service.shutdown()
+        await video_generation_service.shutdown()
+        await openai_service.shutdown()
+        await async_engine.dispose()
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
-    openapi_url=f"{settings.API_V1_STR}/openapi.json"
+    openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    # Large script and video payloads serialize much faster with orjson
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
 # Set all CORS enabled origins
@@ -17,8 +47,20 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+    app.include_router(metrics.router)
+configure_logging()
+
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
+# Synthesized voiceovers, addressed by content digest
+app.mount(
+    settings.AUDIO_URL_PREFIX,
+    StaticFiles(directory=video_generation_service.audio_store.directory),
+    name="audio"
+)
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
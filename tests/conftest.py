@@ -0,0 +1,39 @@
+import asyncio
+import os
+import tempfile
+import pytest
+
+# Settings are read at import time, so the environment is set up before any
+# app module is imported; everything the app writes goes to a throwaway directory
+_work_dir = tempfile.mkdtemp(prefix="tests-")
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_work_dir, 'test.db')}"
+os.environ["EMBEDDINGS_CACHE_PATH"] = os.path.join(_work_dir, "embeddings_cache.db")
+os.environ["AUDIO_STORE_DIR"] = os.path.join(_work_dir, "audio")
+os.environ["VECTOR_INDEX_DIR"] = os.path.join(_work_dir, "vector_index")
+os.environ["VIDEO_JOB_WORKERS"] = "0"
+os.environ["BCRYPT_ROUNDS"] = "4"
+
+@pytest.fixture(scope="session")
+def run():
+    """
+    Run coroutines on one event loop shared by the whole session, since
+    service singletons hold loop-bound primitives
+    """
+    with asyncio.Runner() as runner:
+        yield runner.run
+
+@pytest.fixture(scope="session")
+def client(run):
+    """
+    An httpx client for the app, with its lifespan (and tables) started
+    """
+    import httpx
+    from main import app
+
+    lifespan = app.router.lifespan_context(app)
+    run(lifespan.__aenter__())
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+    yield client
+    run(client.aclose())
+    run(lifespan.__aexit__(None, None, None))
@@ -0,0 +1,42 @@
+import uuid
+from sqlalchemy import func, inspect, select
+from app.core.auth_cache import auth_cache
+from app.core.security import get_current_user
+from app.db.session import AsyncSessionLocal
+from app.models.user import User
+
+def login(client, run):
+    suffix = uuid.uuid4().hex[:8]
+    email = f"{suffix}@example.com"
+    response = run(client.post("/api/v1/users/", json={"email": email, "username": f"auth-{suffix}", "password": "secret"}))
+    assert response.status_code == 200, response.text
+    response = run(client.post("/api/v1/auth/login", data={"username": email, "password": "secret"}))
+    assert response.status_code == 200, response.text
+    return response.json()["access_token"]
+
+def test_hit_rates_are_reported(client, run):
+    token = login(client, run)
+    for _ in range(3):
+        response = run(client.post("/api/v1/auth/test-token", headers={"Authorization": f"Bearer {token}"}))
+        assert response.status_code == 200, response.text
+    stats = run(client.get("/api/v1/auth/cache-stats")).json()
+    assert stats["token_hit_rate"] > 0 and stats["user_hit_rate"] > 0
+    assert 'auth_cache_hit_ratio{kind="user"}' in run(client.get("/metrics")).text
+
+def test_cached_user_updates_instead_of_inserting(client, run):
+    token = login(client, run)
+
+    async def scenario():
+        async with AsyncSessionLocal() as db:
+            await get_current_user(db, token)
+        async with AsyncSessionLocal() as db:
+            user = await get_current_user(db, token)
+            assert auth_cache.user_hits and inspect(user).detached
+            users = await db.scalar(select(func.count()).select_from(User))
+            db.add(user)
+            user.is_active = False
+            await db.commit()
+            assert await db.scalar(select(func.count()).select_from(User)) == users
+            return await db.scalar(select(User.is_active).where(User.id == user.id))
+
+    assert run(scenario()) is False
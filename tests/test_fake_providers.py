@@ -0,0 +1,47 @@
+import httpx
+import orjson
+import pytest
+from openai import AsyncOpenAI
+from benchmarks.fake_providers import ProviderProfile, openai_app
+from app.services.openai_service import openai_service
+
+@pytest.fixture
+def fake_openai(monkeypatch):
+    client = AsyncOpenAI(
+        api_key="test",
+        base_url="http://fake-openai/v1",
+        max_retries=0,
+        http_client=httpx.AsyncClient(transport=httpx.ASGITransport(app=openai_app(ProviderProfile(median_ms=0)))),
+    )
+    monkeypatch.setattr(openai_service, "client", client)
+    return client
+
+def test_fake_streams_chunks_and_usage(run, fake_openai):
+    async def collect():
+        stream = await fake_openai.chat.completions.create(
+            model="gpt-4o", messages=[{"role": "user", "content": "Hello"}], max_tokens=20,
+            stream=True, stream_options={"include_usage": True},
+        )
+        return [chunk async for chunk in stream]
+
+    chunks = run(collect())
+    deltas = [chunk.choices[0].delta.content for chunk in chunks if chunk.choices]
+    assert len(deltas) > 2
+    assert "".join(d or "" for d in deltas) == " ".join(["lorem"] * 20)
+    assert chunks[-2].choices[0].finish_reason == "stop"
+    assert chunks[-1].choices == [] and chunks[-1].usage.total_tokens > 0
+
+def test_completion_streams_deltas(client, run, fake_openai):
+    response = run(client.post("/api/v1/ai/completion", json={"prompt": "Say hi", "max_tokens": 20, "stream": True}))
+    assert response.status_code == 200
+    events = [line.split(": ", 1)[1] for line in response.text.splitlines() if line.startswith("event: ")]
+    assert "delta" in events and events[-1] == "done"
+
+def test_video_script_stream_yields_sections(client, run, fake_openai):
+    body = {"product_name": "Lamp", "product_description": "A desk lamp", "variations_no": 2}
+    response = run(client.post("/api/v1/ai/video-script/stream", json=body))
+    assert response.status_code == 200
+    events = [orjson.loads(line) for line in response.text.splitlines()]
+    types = {event["type"] for event in events}
+    assert "variation_error" not in types and "error" not in types, events
+    assert "section" in types
@@ -0,0 +1,51 @@
+import json
+import pytest
+from app.core.json_stream import JSONArrayStreamParser, extract_json
+
+SECTIONS = [
+    {"voiceover": "Bright, \"clean\" light {at last}]", "scenes": [{"search_queries": ["desk [lamp]"]}]},
+    {"voiceover": "Second", "scenes": []},
+]
+REPLY = "Sure! Here it is:\n```json\n" + json.dumps(
+    {"title": "[not this]", "voiceover_sections": SECTIONS, "stock_footage_keywords": [{"x": 1}]}, indent=2
+) + "\n```"
+
+def test_stream_parser_yields_items_once_complete():
+    parser = JSONArrayStreamParser("voiceover_sections")
+    cut = REPLY.index('"Second"')
+    assert parser.feed(REPLY[:cut]) == SECTIONS[:1]
+    assert parser.feed(REPLY[cut:]) == SECTIONS[1:]
+    assert parser.feed("") == []
+
+def test_stream_parser_handles_any_chunk_boundary():
+    for size in (1, 2, 3, 7, 64):
+        parser = JSONArrayStreamParser("voiceover_sections")
+        items = []
+        for i in range(0, len(REPLY), size):
+            items.extend(parser.feed(REPLY[i:i + size]))
+        assert items == SECTIONS, size
+
+def test_stream_parser_ignores_other_and_nested_keys():
+    parser = JSONArrayStreamParser("scenes")
+    assert parser.feed(json.dumps({"voiceover_sections": SECTIONS, "scenes": [{"a": 1}]})) == [{"a": 1}]
+
+@pytest.mark.parametrize("text", [
+    '{"a": [1, 2]}',
+    '```json\n{"a": [1, 2]}\n```',
+    '```\n{"a": [1, 2]}\n```',
+    'Here you go [draft]:\n```json\n{"a": [1, 2]}\n```\nLet me know!',
+    'Result: {"a": [1, 2,],}',
+    '{"a": [1, 2]} and {"b": 3}',
+])
+def test_extract_json_finds_the_value(text):
+    assert extract_json(text) == {"a": [1, 2]}
+
+def test_extract_json_keeps_commas_inside_strings():
+    assert extract_json(r'Text: {"a": ["x,]", "y, }",], "b": "\\",}') == {"a": ["x,]", "y, }"], "b": "\\"}
+
+def test_extract_json_arrays_and_failures():
+    assert extract_json('Keywords:\n["one", "two",]') == ["one", "two"]
+    with pytest.raises(ValueError):
+        extract_json("No JSON here")
+    with pytest.raises(ValueError):
+        extract_json('{"a": [1, 2')
@@ -0,0 +1,103 @@
+import asyncio
+from types import SimpleNamespace
+import httpx
+from app.services.openai_service import OpenAIService
+
+class FakeStream:
+    def __init__(self, pieces=None):
+        self.pieces = pieces
+        self.sent = 0
+        self.closed = False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        await asyncio.sleep(0)
+        self.sent += 1
+        content = self.pieces(self.sent) if self.pieces else f"token{self.sent} "
+        delta = SimpleNamespace(content=content)
+        return SimpleNamespace(model="m", usage=None, choices=[SimpleNamespace(delta=delta)])
+
+    async def close(self):
+        self.closed = True
+
+def streaming_service(create):
+    service = OpenAIService()
+    service._semaphore = asyncio.Semaphore(1)
+    service.client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    return service
+
+def test_closing_a_completion_stream_closes_the_upstream_response(run):
+    stream = FakeStream()
+
+    async def create(**kwargs):
+        return stream
+
+    service = streaming_service(create)
+
+    async def scenario():
+        events = service.stream_completion("hi")
+        first = await events.__anext__()
+        await events.__anext__()
+        await events.aclose()
+        return first
+
+    assert run(scenario()) == {"type": "delta", "content": "token1 "}
+    assert stream.closed
+    assert not service._semaphore.locked()
+
+def test_concurrency_slot_is_not_held_during_retry_backoff(run, monkeypatch):
+    monkeypatch.setattr("app.core.resilience.random.uniform", lambda low, high: high)
+    stream = FakeStream()
+    calls = []
+
+    async def create(**kwargs):
+        calls.append(1)
+        if len(calls) == 1:
+            raise httpx.ConnectError("connection refused")
+        return stream
+
+    service = streaming_service(create)
+    service.resilience.base_delay = service.resilience.max_delay = 0.05
+
+    async def scenario():
+        events = service.stream_completion("hi")
+        first = asyncio.create_task(events.__anext__())
+        await asyncio.sleep(0.02)
+        backing_off = service._semaphore.locked()
+        await first
+        await events.aclose()
+        return backing_off
+
+    assert run(scenario()) is False
+    assert len(calls) == 2 and stream.closed
+
+def test_disconnecting_from_a_script_stream_closes_every_variation(run):
+    streams = []
+
+    def pieces(n):
+        # An endless array of sections
+        return '{"voiceover_sections": [' if n == 1 else '{"voiceover": "More", "scenes": []},'
+
+    async def create(**kwargs):
+        if kwargs.get("stream"):
+            streams.append(FakeStream(pieces))
+            return streams[-1]
+        message = SimpleNamespace(content='{"keywords": ["lamp"]}')
+        return SimpleNamespace(usage=None, choices=[SimpleNamespace(message=message)])
+
+    service = streaming_service(create)
+    service._semaphore = asyncio.Semaphore(10)
+
+    async def scenario():
+        events = service.stream_video_script("Lamp", "A desk lamp", variations_no=3)
+        while (await events.__anext__())["type"] != "section":
+            pass
+        await events.aclose()
+        # Closed by the time aclose() returns, not eventually
+        assert len(streams) == 3
+        assert all(stream.closed for stream in streams)
+        assert service._semaphore._value == 10
+
+    run(scenario())
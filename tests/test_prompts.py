@@ -0,0 +1,40 @@
+import pytest
+from app.core.config import settings
+from app.services.prompts import prompts
+
+FIELDS = dict(
+    product_name="Lamp", product_description="A desk lamp", duration="30 seconds",
+    target_audience="students", language="English", brand_name="Glow",
+    tone="playful", ad_type="product showcase",
+)
+
+@pytest.fixture
+def pinned(monkeypatch):
+    def pin(**versions):
+        monkeypatch.setattr(settings, "OPENAI_PROMPT_VERSIONS", versions)
+    return pin
+
+def test_every_template_compiles():
+    assert all(tokens >= 0 for tokens in prompts.compile().values())
+
+def test_latest_versions_use_json_mode():
+    for name in ("video_script", "video_keywords"):
+        assert prompts.get(name).request_options() == {"response_format": {"type": "json_object"}}
+
+@pytest.mark.parametrize("name, version", [
+    ("video_script", "1"), ("video_script", "2"), ("video_keywords", "1"), ("video_keywords", "2"),
+])
+def test_published_versions_keep_their_request_options(pinned, name, version):
+    pinned(**{name: version})
+    template = prompts.get(name)
+    assert template.id == f"{name}@{version}"
+    assert template.request_options() == {}
+
+def test_static_prefix_does_not_depend_on_request_fields(pinned):
+    pinned(video_script="2")
+    template = prompts.get("video_script")
+    first = template.messages(**FIELDS)
+    second = template.messages(**{**FIELDS, "product_name": "Chair"})
+    assert first[0] == second[0]
+    assert first[0]["role"] == "system"
+    assert "Chair" in second[1]["content"]
@@ -0,0 +1,65 @@
+import asyncio
+import time
+from types import SimpleNamespace
+import httpx
+import pytest
+from app.core.rate_limiter import PRIORITY_BATCH, PRIORITY_INTERACTIVE, RateScheduler
+from app.core.resilience import UpstreamUnavailableError
+from app.services.openai_service import OpenAIService
+
+def test_waiters_are_admitted_by_priority_then_arrival(run):
+    scheduler = RateScheduler(lambda model: (60, 1000))
+    order = []
+
+    async def scenario():
+        limiter = scheduler._limiter("m")
+        # Out of requests, so every call queues; refills within milliseconds
+        limiter.requests.level = 0
+        limiter.requests.rate = 1000.0
+
+        async def call(name, priority):
+            await scheduler.acquire("m", 1, priority)
+            order.append(name)
+
+        await asyncio.gather(
+            call("batch-1", PRIORITY_BATCH),
+            call("batch-2", PRIORITY_BATCH),
+            call("interactive", PRIORITY_INTERACTIVE),
+        )
+
+    run(scenario())
+    assert order == ["interactive", "batch-1", "batch-2"]
+
+def test_retries_are_charged_to_the_rate_budget(run):
+    service = OpenAIService()
+    service.resilience.base_delay = 0
+    service.resilience.max_attempts = 3
+    calls = []
+
+    async def create(**kwargs):
+        calls.append(kwargs)
+        if len(calls) < 3:
+            raise httpx.ConnectError("connection refused")
+        usage = SimpleNamespace(prompt_tokens=5, completion_tokens=5, total_tokens=10, prompt_tokens_details=None)
+        return SimpleNamespace(usage=usage, choices=[])
+
+    service.client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    run(service._chat(priority=PRIORITY_INTERACTIVE, model="m", messages=[{"role": "user", "content": "hi"}]))
+    assert len(calls) == 3
+    assert service.scheduler.stats()["m"]["granted"] == 3
+
+def test_open_breaker_fails_before_reserving_budget(run):
+    service = OpenAIService()
+    calls = []
+
+    async def create(**kwargs):
+        calls.append(kwargs)
+
+    service.client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    service.resilience.breaker.state = "open"
+    service.resilience.breaker.opened_at = time.monotonic()
+    with pytest.raises(UpstreamUnavailableError):
+        run(service._chat(priority=PRIORITY_INTERACTIVE, model="m", messages=[{"role": "user", "content": "hi"}]))
+    assert calls == []
+    assert service.scheduler.stats() == {}
+    assert service.resilience.stats()["rejected"] == 1
@@ -0,0 +1,87 @@
+import asyncio
+import pytest
+from app.core.resilience import CircuitBreaker, Resilience, UpstreamUnavailableError
+
+def make_resilience(**kwargs) -> Resilience:
+    options = dict(
+        max_attempts=1, base_delay=0, max_delay=0, hedge=False,
+        hedge_min_samples=1, failure_threshold=2, reset_timeout=0
+    )
+    options.update(kwargs)
+    return Resilience("test", **options)
+
+class Unavailable(Exception):
+    pass
+
+def test_breaker_opens_after_threshold_and_recovers_through_probe():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0)
+    breaker.record_failure()
+    assert breaker.state == "closed"
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+    assert breaker.allow()  # reset timeout elapsed: one probe
+    assert breaker.state == "half_open"
+    assert not breaker.allow()  # only one probe at a time
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.allow()
+
+def test_failed_probe_reopens_breaker():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+    breaker.record_failure()
+    breaker.opened_at -= 60
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+
+def test_open_breaker_rejects_without_calling():
+    resilience = make_resilience(failure_threshold=1, reset_timeout=60)
+    resilience.breaker.record_failure()
+    calls = []
+
+    async def fn():
+        calls.append(1)
+
+    with pytest.raises(UpstreamUnavailableError):
+        asyncio.run(resilience.call(fn))
+    assert calls == []
+
+def test_cancelled_probe_releases_half_open_slot():
+    resilience = make_resilience()
+    resilience.breaker.state = "half_open"
+
+    async def scenario():
+        task = asyncio.create_task(resilience.call(lambda: asyncio.sleep(10)))
+        await asyncio.sleep(0)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        async def ok():
+            return "ok"
+        return await resilience.call(ok)
+
+    assert asyncio.run(scenario()) == "ok"
+    assert resilience.breaker.state == "closed"
+
+def test_non_retryable_error_leaves_breaker_state_alone():
+    resilience = make_resilience()
+    resilience.breaker.state = "half_open"
+
+    async def broken():
+        raise TypeError("bug")
+
+    with pytest.raises(TypeError):
+        asyncio.run(resilience.call(broken))
+    assert resilience.breaker.state == "half_open"
+    # The probe slot is free again
+    assert resilience.breaker.allow()
+
+def test_check_does_not_claim_the_half_open_probe():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    breaker.record_failure()
+    assert not breaker.rejecting()
+    assert breaker.allow()
+    assert breaker.rejecting()
@@ -0,0 +1,43 @@
+import asyncio
+from app.core.singleflight import SingleFlight
+
+def test_waiters_share_one_call(run):
+    flight = SingleFlight()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "value"
+
+    async def scenario():
+        return await asyncio.gather(*(flight.do("k", fetch) for _ in range(5)))
+
+    assert run(scenario()) == ["value"] * 5
+    assert len(calls) == 1 and flight.stats()["shared"] == 4
+
+def test_call_survives_until_last_waiter_is_cancelled(run):
+    flight = SingleFlight()
+    finished = []
+
+    async def fetch():
+        await asyncio.sleep(0.05)
+        finished.append(1)
+        return "value"
+
+    async def scenario():
+        first = asyncio.create_task(flight.do("k", fetch))
+        second = asyncio.create_task(flight.do("k", fetch))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        assert await second == "value"
+
+        third = asyncio.create_task(flight.do("k", fetch))
+        await asyncio.sleep(0.01)
+        third.cancel()
+        await asyncio.gather(third, return_exceptions=True)
+        await asyncio.sleep(0.1)
+
+    run(scenario())
+    assert finished == [1]
+    assert flight.stats() == {"in_flight": 0, "leaders": 2, "shared": 1, "cancelled": 1}
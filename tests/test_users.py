@@ -0,0 +1,90 @@
+import asyncio
+import uuid
+
+def new_user(client, run, **overrides):
+    suffix = uuid.uuid4().hex[:8]
+    body = {"email": f"{suffix}@example.com", "username": f"user-{suffix}", "password": "secret"}
+    body.update(overrides)
+    response = run(client.post("/api/v1/users/", json=body))
+    assert response.status_code == 200, response.text
+    return response.json()
+
+def test_create_rejects_taken_email(client, run):
+    user = new_user(client, run)
+    response = run(client.post("/api/v1/users/", json={
+        "email": user["email"], "username": "someone-else", "password": "secret",
+    }))
+    assert response.status_code == 400
+
+def test_update_rejects_email_owned_by_another_user(client, run):
+    first = new_user(client, run)
+    second = new_user(client, run)
+    response = run(client.put(f"/api/v1/users/{second['id']}", json={
+        "email": first["email"], "username": second["username"],
+    }))
+    assert response.status_code == 400
+    assert run(client.get(f"/api/v1/users/{second['id']}")).json()["email"] == second["email"]
+
+def test_update_keeps_own_email_and_username(client, run):
+    user = new_user(client, run)
+    response = run(client.put(f"/api/v1/users/{user['id']}", json={
+        "email": user["email"], "username": user["username"], "is_active": False,
+    }))
+    assert response.status_code == 200, response.text
+    assert response.json()["is_active"] is False
+
+def test_cursor_pagination_visits_every_user_once(client, run):
+    created = {new_user(client, run)["id"] for _ in range(5)}
+    seen = []
+    cursor = None
+    while True:
+        params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+        page = run(client.get("/api/v1/users/", params=params)).json()
+        seen.extend(user["id"] for user in page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert seen == sorted(seen)
+    assert len(seen) == len(set(seen))
+    assert created <= set(seen)
+
+def test_invalid_cursor_is_rejected(client, run):
+    response = run(client.get("/api/v1/users/", params={"cursor": "not-a-cursor"}))
+    assert response.status_code == 400
+
+def test_bulk_create_is_all_or_nothing_when_a_user_is_taken_concurrently(client, run, monkeypatch):
+    from app.services.user_service import user_service
+    taken = new_user(client, run)
+    suffix = uuid.uuid4().hex[:8]
+    users = [
+        {"email": f"{suffix}-{i}@example.com", "username": f"bulk-{suffix}-{i}", "password": "secret"}
+        for i in range(5)
+    ] + [{"email": taken["email"], "username": f"bulk-{suffix}-late", "password": "secret"}]
+    check = user_service.find_conflicts
+    calls = []
+
+    async def racy_find_conflicts(db, objs_in, **kwargs):
+        # The check passes, as if `taken` were registered just after it
+        calls.append(1)
+        return [] if len(calls) == 1 else await check(db, objs_in, **kwargs)
+
+    monkeypatch.setattr(user_service, "find_conflicts", racy_find_conflicts)
+    monkeypatch.setattr("app.core.config.settings.USERS_BULK_BATCH_SIZE", 2)
+    response = run(client.post("/api/v1/users/bulk", json={"users": users}))
+    assert response.status_code == 400, response.text
+    assert response.json()["detail"]["conflicts"] == [taken["email"]]
+    page = run(client.get("/api/v1/users/", params={"limit": 1000})).json()
+    assert not [user for user in page["items"] if user["username"].startswith(f"bulk-{suffix}")]
+
+def test_bulk_hashing_leaves_the_login_pool_free(run):
+    from app.core.security import get_password_hashes_bulk, password_hash_executor, pwd_context
+
+    async def scenario():
+        hashing = asyncio.ensure_future(get_password_hashes_bulk(["secret"] * 20))
+        await asyncio.sleep(0)
+        queued = password_hash_executor._work_queue.qsize()
+        return queued, await hashing
+
+    queued, hashes = run(scenario())
+    assert queued == 0
+    assert len(hashes) == 20 and pwd_context.verify("secret", hashes[-1])
@@ -0,0 +1,37 @@
+import uuid
+import pytest
+
+@pytest.fixture
+def collection(client, run):
+    name = f"test-{uuid.uuid4().hex[:8]}"
+    response = run(client.post(f"/api/v1/vectors/{name}/upsert", json={"items": [
+        {"id": "x", "vector": [1.0, 0.0, 0.0]},
+        {"id": "y", "vector": [0.0, 1.0, 0.0]},
+        {"id": "xy", "vector": [1.0, 1.0, 0.0], "metadata": {"tag": "both"}},
+    ]}))
+    assert response.status_code == 200, response.text
+    return name
+
+def query(client, run, collection, **body):
+    return run(client.post(f"/api/v1/vectors/{collection}/query", json=body))
+
+def test_query_ranks_by_cosine_similarity(client, run, collection):
+    response = query(client, run, collection, vectors=[[1.0, 0.1, 0.0]], top_k=2)
+    assert response.status_code == 200, response.text
+    assert [hit["id"] for hit in response.json()["results"][0]] == ["x", "xy"]
+
+@pytest.mark.parametrize("top_k", [0, -3])
+def test_non_positive_top_k_is_rejected(client, run, collection, top_k):
+    assert query(client, run, collection, vectors=[[1.0, 0.0, 0.0]], top_k=top_k).status_code == 422
+
+def test_wrong_query_dimension_is_a_clear_400(client, run, collection):
+    response = query(client, run, collection, vectors=[[1.0] * 10])
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Expected query vectors of dimension 3, got 10"
+
+def test_ragged_upsert_is_a_clear_400(client, run, collection):
+    response = run(client.post(f"/api/v1/vectors/{collection}/upsert", json={"items": [
+        {"id": "a", "vector": [1.0, 0.0, 0.0]}, {"id": "b", "vector": [1.0]},
+    ]}))
+    assert response.status_code == 400
+    assert response.json()["detail"] == "All vectors must have the same dimension"
@@ -0,0 +1,76 @@
+import asyncio
+from app.services.video_generation_service import VideoGenerationService
+
+SCRIPT = {
+    "voiceover_sections": [
+        {"voiceover": "One", "scenes": [
+            {"search_queries": ["City Skyline", "city  skyline", "sunset"]},
+            {"search_queries": ["city skyline", "ocean waves"]},
+        ]},
+        {"voiceover": "Two", "scenes": [
+            {"search_queries": ["  Empty ", "sunset", "forest"]},
+            {"search_queries": ["empty", "desert", ""]},
+        ]},
+    ],
+    "stock_footage_keywords": [],
+}
+
+def fake_service(delays=None):
+    service = VideoGenerationService()
+    service.getty_api_key = "test"
+    service.footage_cache = None
+    searched = []
+    finished = []
+
+    async def search_getty(params):
+        phrase = params["phrase"]
+        searched.append(phrase)
+        await asyncio.sleep((delays or {}).get(phrase, 0.01))
+        finished.append(phrase)
+        if phrase == "empty":
+            return []
+        return [{"id": f"{phrase}-{i}", "title": phrase, "preview_url": "", "download_url": ""} for i in range(2)]
+
+    async def voiceover(text):
+        return {"audio_url": None}
+
+    service._search_getty = search_getty
+    service._voiceover = voiceover
+    return service, searched, finished
+
+def footage_ids(result):
+    return [scene["footage"]["id"] for section in result["enhanced_script"]["voiceover_sections"]
+            for scene in section["scenes"]]
+
+def test_plan_normalizes_and_dedupes_queries():
+    scenes = [scene for section in SCRIPT["voiceover_sections"] for scene in section["scenes"]]
+    assert VideoGenerationService._plan_searches(scenes) == [
+        ["city skyline", "sunset"],
+        ["city skyline", "ocean waves"],
+        ["empty", "sunset", "forest"],
+        ["empty", "desert"],
+    ]
+
+def test_unique_queries_are_searched_once_and_fallbacks_only_when_unfilled(run):
+    service, searched, _ = fake_service()
+    service.query_hedge_delay = None
+    result = run(service.generate_video_content(SCRIPT))
+
+    # "ocean waves" and "forest" are never needed
+    assert sorted(searched) == ["city skyline", "desert", "empty", "sunset"]
+    assert footage_ids(result) == ["city skyline-0", "city skyline-1", "sunset-0", "desert-0"]
+
+def test_losing_hedges_are_cancelled(run):
+    service, searched, finished = fake_service(delays={"slow": 0.1, "fast": 0.01, "spare": 0.3})
+    service.query_hedge_delay = 0.02
+    script = {"voiceover_sections": [{"voiceover": "One", "scenes": [
+        {"search_queries": ["slow", "fast", "spare"]},
+    ]}], "stock_footage_keywords": []}
+
+    result = run(service.generate_video_content(script))
+    run(asyncio.sleep(0.4))
+
+    # The best query wins once it answers; the hedge still running is cancelled
+    assert footage_ids(result) == ["slow-0"]
+    assert searched == ["slow", "fast", "spare"]
+    assert sorted(finished) == ["fast", "slow"]
@@ -0,0 +1,35 @@
+import asyncio
+from app.services.video_job_service import VideoJobService
+
+SCRIPT = {"voiceover_sections": [{"voiceover": "Hello", "scenes": [{"search_queries": ["x"]}]}], "stock_footage_keywords": []}
+
+def test_waiting_on_unknown_jobs_registers_nothing(client, run):
+    service = VideoJobService()
+    for i in range(20):
+        assert run(service.wait(f"missing-{i}", timeout=0.01)) is None
+    assert service._changed == {}
+
+def test_worker_survives_crash_and_marks_job_failed(client, run):
+    service = VideoJobService()
+    service.workers = 1
+
+    def broken_start(job_id):
+        raise RuntimeError("database unavailable")
+
+    service._start = broken_start
+
+    async def scenario():
+        await service.startup()
+        try:
+            first = await service.submit(SCRIPT)
+            second = await service.submit(SCRIPT)
+            await asyncio.wait_for(service._queue.join(), 5)
+            assert not service._tasks[0].done()
+            return await service.get(first["id"]), await service.get(second["id"])
+        finally:
+            await service.shutdown()
+
+    for job in run(scenario()):
+        assert job["status"] == "failed"
+        assert job["error"] == "database unavailable"
+    assert service._changed == {}
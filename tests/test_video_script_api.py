@@ -0,0 +1,13 @@
+import pytest
+from app.core.config import settings
+
+@pytest.mark.parametrize("variations_no", [0, -1, settings.OPENAI_SCRIPT_MAX_VARIATIONS + 1])
+@pytest.mark.parametrize("mode", ["parallel", "multi_choice"])
+def test_out_of_range_variations_are_rejected_before_any_work(client, run, variations_no, mode):
+    body = {
+        "product_name": "Lamp", "product_description": "A desk lamp",
+        "variations_no": variations_no, "generation_mode": mode,
+    }
+    for url in ("/api/v1/ai/video-script", "/api/v1/ai/video-script/stream"):
+        response = run(client.post(url, json=body))
+        assert response.status_code == 422, response.text